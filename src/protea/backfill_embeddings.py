@@ -6,7 +6,7 @@ import sys
 
 from protea.config import settings
 from protea.db.connection import Database
-from protea.services import embedding_service
+from protea.services import embedding_service, vector_index
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger("protea.backfill")
@@ -69,6 +69,7 @@ def backfill_embeddings(force: bool = False, batch_size: int = 100) -> int:
                 "UPDATE items SET embedding = ? WHERE id = ?",
                 (embedding_blob, item_id),
             )
+            vector_index.sync(db, conn)
 
         processed += 1
         if processed % batch_size == 0:
@@ -33,6 +33,10 @@ class Settings(BaseSettings):
     # Web UI settings
     web_port: int = 8080
     web_host: str = "0.0.0.0"
+    web_page_cache_seconds: int = 30  # TTL for cached page data (keys change on writes), 0 disables
+    web_debug: bool = False  # Reload edited templates without a restart
+    # Internal nginx location (e.g. "/_static/") that serves /static via X-Accel-Redirect
+    web_static_accel_prefix: str | None = None
 
     # MCP SSE settings
     mcp_sse_port: int = 8081
@@ -69,6 +73,10 @@ class AuthSettings(BaseSettings):
     # Rate limiting for auth endpoints (attempts per minute)
     auth_rate_limit: int = 10  # PROTEA_AUTH_RATE_LIMIT
 
+    # How long the SSE server trusts an API key check, 0 disables caching.
+    # Revoked keys keep working on open SSE servers for up to this long.
+    api_key_cache_seconds: int = 30  # PROTEA_API_KEY_CACHE_SECONDS
+
     model_config = SettingsConfigDict(env_prefix="PROTEA_")
 
 
@@ -1,13 +1,53 @@
 """SQLite database connection management for protea."""
 
+import importlib.util
 import logging
 import sqlite3
+import threading
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator
+from types import ModuleType
+from typing import Generator, Iterator
 
 logger = logging.getLogger("protea")
 
+try:
+    import sqlite_vec
+except ImportError:
+    sqlite_vec = None
+
+
+# Per-connection read/write tuning; WAL makes synchronous=NORMAL crash-safe.
+# Connections are kept per thread, so the page cache (16 MB) survives calls.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+    "PRAGMA cache_size = -16384",
+)
+
+
+def _load_sqlite_vec(conn: sqlite3.Connection) -> bool:
+    """Load the sqlite-vec extension into a connection if possible."""
+    if sqlite_vec is None or not hasattr(conn, "enable_load_extension"):
+        return False
+    try:
+        conn.enable_load_extension(True)
+        sqlite_vec.load(conn)
+        conn.enable_load_extension(False)
+        return True
+    except sqlite3.Error as e:
+        logger.warning(f"sqlite-vec extension could not be loaded: {e}")
+        return False
+
+
+def _load_migration(path: Path) -> ModuleType:
+    """Import a Python migration module from the migrations directory."""
+    spec = importlib.util.spec_from_file_location(f"protea_migration_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
 
 class Database:
     """SQLite database manager with migration support."""
@@ -20,32 +60,96 @@ class Database:
         """
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.vec_enabled = False
+        # One long-lived connection per thread, reused by connection()
+        self._local = threading.local()
+        self._connections: set[sqlite3.Connection] = set()
+        self._connections_lock = threading.Lock()
 
         # Enable foreign keys and WAL mode
         self._init_connection()
 
     def _init_connection(self) -> None:
         """Initialize database with required settings."""
-        with self.connection() as conn:
+        conn = self._open_connection()
+        try:
             conn.execute("PRAGMA foreign_keys = ON")
             conn.execute("PRAGMA journal_mode = WAL")
+            # Optional KNN index support for vector search
+            self.vec_enabled = _load_sqlite_vec(conn)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _open_connection(self, check_same_thread: bool = True) -> sqlite3.Connection:
+        """Open and configure a new SQLite connection."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=check_same_thread)
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        if self.vec_enabled:
+            _load_sqlite_vec(conn)
+        return conn
+
+    def _thread_connection(self) -> sqlite3.Connection:
+        """Open the calling thread's long-lived connection and track it for close()."""
+        # Only the owning thread uses it; close() may run on another thread
+        conn = self._open_connection(check_same_thread=False)
+        with self._connections_lock:
+            self._connections.add(conn)
+        return conn
 
     @contextmanager
     def connection(self) -> Generator[sqlite3.Connection, None, None]:
         """Context manager for database connections.
 
+        Each thread reuses one connection, which skips the connect, pragma and
+        schema-load cost on every call. Only the outermost block commits or
+        rolls back; nested blocks run in a savepoint, so an exception caught
+        around a nested block discards that block's writes and nothing else.
+
         Yields:
             sqlite3.Connection with row factory set to sqlite3.Row
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is None or conn not in self._connections:
+            conn = local.conn = self._thread_connection()
+            local.depth = 0
+
+        local.depth += 1
+        savepoint = None
+        if local.depth > 1:
+            # Savepoints outside a transaction commit on release, so make
+            # sure the outer block's transaction is open first
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            savepoint = f"nested_{local.depth}"
+            conn.execute(f"SAVEPOINT {savepoint}")
         try:
             yield conn
-            conn.commit()
-        except Exception:
-            conn.rollback()
+            if savepoint:
+                conn.execute(f"RELEASE {savepoint}")
+            else:
+                conn.commit()
+        except BaseException:
+            if savepoint and conn.in_transaction:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            elif not savepoint:
+                conn.rollback()
             raise
         finally:
+            local.depth -= 1
+
+    def close(self) -> None:
+        """Close the connections opened by every thread.
+
+        A thread that uses the database again afterwards opens a new one.
+        """
+        with self._connections_lock:
+            connections, self._connections = self._connections, set()
+        for conn in connections:
             conn.close()
 
     def run_migrations(self) -> None:
@@ -67,15 +171,25 @@ class Database:
             ).fetchone()
             current_version = result["version"] or 0
 
-            # Find and run pending migrations
+            # Find and run pending migrations. SQL files record their own
+            # version; Python data migrations define migrate(conn) and are
+            # recorded here.
             if migrations_dir.exists():
-                migration_files = sorted(migrations_dir.glob("*.sql"))
+                migration_files = sorted(
+                    [*migrations_dir.glob("*.sql"), *migrations_dir.glob("[0-9]*.py")],
+                    key=lambda path: int(path.stem.split("_")[0]),
+                )
                 for migration_file in migration_files:
                     version = int(migration_file.stem.split("_")[0])
                     if version > current_version:
                         logger.info(f"Running migration {migration_file.name}")
-                        sql = migration_file.read_text()
-                        conn.executescript(sql)
+                        if migration_file.suffix == ".sql":
+                            conn.executescript(migration_file.read_text())
+                        else:
+                            _load_migration(migration_file).migrate(conn)
+                            conn.execute(
+                                "INSERT INTO schema_version (version) VALUES (?)", (version,)
+                            )
                         logger.info(f"Migration {migration_file.name} completed")
 
     def execute(
@@ -94,6 +208,28 @@ class Database:
             cursor = conn.execute(query, params)
             return cursor.fetchall()
 
+    def iterate(
+        self, query: str, params: tuple = ()
+    ) -> Iterator[sqlite3.Row]:
+        """Execute a query and yield results as they are fetched.
+
+        Uses its own connection, which stays open until the iterator is
+        exhausted or closed, so a half-consumed iterator never holds the
+        thread's shared connection inside a transaction.
+
+        Args:
+            query: SQL query to execute
+            params: Query parameters
+
+        Yields:
+            Row objects
+        """
+        conn = self._open_connection()
+        try:
+            yield from conn.execute(query, params)
+        finally:
+            conn.close()
+
     def execute_one(
         self, query: str, params: tuple = ()
     ) -> sqlite3.Row | None:
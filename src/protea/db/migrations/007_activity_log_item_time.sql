@@ -0,0 +1,7 @@
+-- Migration 007: Composite index for per-item activity history
+-- Lets get_item_history read an item's log already ordered by time
+
+CREATE INDEX IF NOT EXISTS idx_activity_log_item_time ON activity_log(item_id, created_at DESC);
+
+-- Record migration
+INSERT INTO schema_version (version) VALUES (7);
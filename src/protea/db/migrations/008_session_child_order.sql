@@ -0,0 +1,15 @@
+-- Migration 008: Composite indexes for session workflow queries
+-- Session images and pending items are always read per session in creation
+-- order, and pending sessions are listed oldest first. These indexes serve
+-- the filter and the ORDER BY without a separate sort. The new child indexes
+-- lead with session_id, so they replace the single-column ones.
+
+DROP INDEX IF EXISTS idx_pending_items_session;
+DROP INDEX IF EXISTS idx_session_images_session;
+
+CREATE INDEX IF NOT EXISTS idx_pending_items_session_created ON pending_items(session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_session_images_session_created ON session_images(session_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_status_created ON sessions(status, created_at);
+
+-- Record migration
+INSERT INTO schema_version (version) VALUES (8);
@@ -0,0 +1,33 @@
+-- Migration 009: Change queue for the optional sqlite-vec KNN index
+-- The vec0 index only exists where the sqlite-vec extension is installed, so
+-- plain triggers record which items need re-indexing instead of writing the
+-- index directly. Every write path is covered (including processes without
+-- the extension); vector_index drains the queue into the index. Nothing is
+-- queued until an index has been built and its marker stored.
+
+CREATE TABLE IF NOT EXISTS vec_index_pending (
+    item_rowid INTEGER PRIMARY KEY
+);
+
+CREATE TRIGGER IF NOT EXISTS items_vec_ai AFTER INSERT ON items
+WHEN NEW.embedding IS NOT NULL
+    AND EXISTS (SELECT 1 FROM system_settings WHERE key = 'vector_index')
+BEGIN
+    INSERT OR IGNORE INTO vec_index_pending (item_rowid) VALUES (NEW.rowid);
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_vec_au AFTER UPDATE OF embedding ON items
+WHEN EXISTS (SELECT 1 FROM system_settings WHERE key = 'vector_index')
+BEGIN
+    INSERT OR IGNORE INTO vec_index_pending (item_rowid) VALUES (NEW.rowid);
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_vec_ad AFTER DELETE ON items
+WHEN OLD.embedding IS NOT NULL
+    AND EXISTS (SELECT 1 FROM system_settings WHERE key = 'vector_index')
+BEGIN
+    INSERT OR IGNORE INTO vec_index_pending (item_rowid) VALUES (OLD.rowid);
+END;
+
+-- Record migration
+INSERT INTO schema_version (version) VALUES (9);
@@ -0,0 +1,88 @@
+-- Migration 010: Database-wide change counter for cached web pages
+-- The web UI caches page data and answers revalidations with ETags. Keying
+-- both on this counter makes writes from any process (web, MCP stdio, MCP
+-- SSE) invalidate them; clearing an in-process cache only covered the web
+-- process's own requests. Triggers bump it on every write to the tables the
+-- cached pages read.
+
+CREATE TABLE IF NOT EXISTS data_generation (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    value INTEGER NOT NULL
+);
+
+INSERT OR IGNORE INTO data_generation (id, value) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS locations_gen_ai AFTER INSERT ON locations BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS locations_gen_au AFTER UPDATE ON locations BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS locations_gen_ad AFTER DELETE ON locations BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS bins_gen_ai AFTER INSERT ON bins BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS bins_gen_au AFTER UPDATE ON bins BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS bins_gen_ad AFTER DELETE ON bins BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_gen_ai AFTER INSERT ON items BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_gen_au AFTER UPDATE ON items BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS items_gen_ad AFTER DELETE ON items BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS item_aliases_gen_ai AFTER INSERT ON item_aliases BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS item_aliases_gen_au AFTER UPDATE ON item_aliases BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS item_aliases_gen_ad AFTER DELETE ON item_aliases BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_gen_ai AFTER INSERT ON categories BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_gen_au AFTER UPDATE ON categories BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS categories_gen_ad AFTER DELETE ON categories BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS activity_log_gen_ai AFTER INSERT ON activity_log BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS activity_log_gen_au AFTER UPDATE ON activity_log BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS activity_log_gen_ad AFTER DELETE ON activity_log BEGIN
+    UPDATE data_generation SET value = value + 1 WHERE id = 1;
+END;
+
+-- Record migration
+INSERT INTO schema_version (version) VALUES (10);
@@ -0,0 +1,27 @@
+"""Migration 011: Convert legacy float32 item embeddings to the int8 format.
+
+Embeddings written before int8 quantization are stored as raw float32 blobs.
+Converting them once keeps every stored embedding in one layout, so vector
+search always decodes the whole table with a single np.frombuffer call.
+"""
+
+import sqlite3
+
+from protea.services import embedding_service
+
+
+def migrate(conn: sqlite3.Connection) -> None:
+    rows = conn.execute("SELECT id, embedding FROM items WHERE embedding IS NOT NULL").fetchall()
+    conn.executemany(
+        "UPDATE items SET embedding = ? WHERE id = ?",
+        [
+            (
+                embedding_service.quantize_embedding(
+                    embedding_service.normalize(embedding_service.bytes_to_embedding(blob))
+                ),
+                item_id,
+            )
+            for item_id, blob in rows
+            if not embedding_service.is_quantized(blob)
+        ],
+    )
@@ -3,6 +3,7 @@
 import uuid
 from datetime import datetime, timezone
 from enum import Enum
+from functools import cached_property
 from typing import Optional
 
 from pydantic import BaseModel, Field
@@ -278,6 +279,11 @@ class SessionDetail(Session):
     is_stale: bool = False
     stale_duration_minutes: Optional[int] = None
 
+    @cached_property
+    def images_by_id(self) -> dict[str, SessionImage]:
+        """Session images keyed by ID, built on first access."""
+        return {image.id: image for image in self.images}
+
 
 class ActiveSessionInfo(BaseModel):
     """Summary info about an active session."""
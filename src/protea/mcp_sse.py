@@ -1,14 +1,23 @@
 """MCP Server with SSE transport for remote connections."""
 
+import asyncio
+import hashlib
+import hmac
 import logging
+import time
+from collections import OrderedDict
 
+import orjson
 import uvicorn
 from mcp.server.sse import SseServerTransport
 from starlette.applications import Starlette
-from starlette.responses import JSONResponse, Response
+from starlette.middleware import Middleware
+from starlette.responses import Response
 from starlette.routing import Mount, Route
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from protea.config import auth_settings, settings
+from protea.db.models import User
 from protea.server import server, db
 from protea.tools import admin, auth as auth_tools
 
@@ -16,62 +25,223 @@ from protea.tools import admin, auth as auth_tools
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("protea.sse")
 
+# Recent API key checks: token digest -> (expires_at, (key_id, user) or None).
+# Failures are kept apart from valid keys, so a client spraying random tokens
+# only churns _API_KEY_MISSES; each evicts its oldest entry when full.
+_API_KEY_CACHE: OrderedDict[bytes, tuple[float, tuple[str, User]]] = OrderedDict()
+_API_KEY_MISSES: OrderedDict[bytes, tuple[float, None]] = OrderedDict()
+_API_KEY_CACHE_MAX = 1024
+# Database lookups in progress, shared by concurrent checks of the same token
+_API_KEY_INFLIGHT: dict[bytes, asyncio.Task] = {}
+# last_used_at is written at most once per key per interval, off the auth path
+_API_KEY_TOUCH_SECONDS = 60
+_API_KEY_TOUCHED: dict[str, float] = {}
+# Strong references to fire-and-forget tasks until they finish
+_BACKGROUND_TASKS: set[asyncio.Task] = set()
 
-def create_sse_app() -> Starlette:
-    """Create Starlette app with MCP SSE endpoint."""
-    # Create SSE transport
-    sse = SseServerTransport("/messages/")
 
-    async def handle_sse(request):
-        """Handle SSE connection with API key authentication."""
-        # Check if auth is required
-        if auth_settings.auth_required:
-            # Get Authorization header
-            auth_header = request.headers.get("authorization", "")
-
-            if not auth_header.startswith("Bearer "):
-                return JSONResponse(
-                    {"error": "Missing or invalid Authorization header. Use: Bearer <api_key>"},
-                    status_code=401,
-                )
-
-            token = auth_header[7:]  # Remove "Bearer " prefix
-
-            # Check legacy single-key mode first
-            if auth_settings.api_key and token == auth_settings.api_key:
-                logger.debug("Authenticated via legacy PROTEA_API_KEY")
-            else:
-                # Validate against database API keys
-                user = auth_tools.validate_api_key(db, token)
-                if not user:
-                    return JSONResponse(
-                        {"error": "Invalid API key"},
-                        status_code=401,
-                    )
-                logger.debug(f"Authenticated as user: {user.username}")
+def _store_api_key_result(key: bytes, ttl: int, task: asyncio.Task) -> None:
+    """Finish an in-flight lookup, caching its result for ttl seconds."""
+    _API_KEY_INFLIGHT.pop(key, None)
+    if task.cancelled() or task.exception() is not None or ttl <= 0:
+        return
+
+    found = task.result()
+    cache = _API_KEY_CACHE if found is not None else _API_KEY_MISSES
+    cache[key] = (time.monotonic() + ttl, found)
+    cache.move_to_end(key)
+    if len(cache) > _API_KEY_CACHE_MAX:
+        cache.popitem(last=False)
+
+
+def _touch_api_key_later(key_id: str) -> None:
+    """Record API key use in the background, at most once per touch interval."""
+    now = time.monotonic()
+    if now - _API_KEY_TOUCHED.get(key_id, float("-inf")) < _API_KEY_TOUCH_SECONDS:
+        return
+    _API_KEY_TOUCHED[key_id] = now
+    task = asyncio.ensure_future(asyncio.to_thread(auth_tools.touch_api_key, db, key_id))
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+
+async def _validate_api_key_cached(token: str) -> User | None:
+    """Validate an API key, reusing results for auth_settings.api_key_cache_seconds.
+
+    Failed lookups are cached too, so repeated probes with a bad key do not
+    reach the database. Misses run in a worker thread to keep the event loop
+    free, and concurrent checks of the same token (a reconnect storm) share
+    one lookup. The dicts are only touched on the event loop, so no lock.
+    """
+    ttl = auth_settings.api_key_cache_seconds
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    cached = (_API_KEY_CACHE.get(key) or _API_KEY_MISSES.get(key)) if ttl > 0 else None
+    if cached is not None and cached[0] > time.monotonic():
+        found = cached[1]
+    else:
+        task = _API_KEY_INFLIGHT.get(key)
+        if task is None:
+            task = asyncio.ensure_future(asyncio.to_thread(auth_tools.lookup_api_key, db, token))
+            _API_KEY_INFLIGHT[key] = task
+            task.add_done_callback(lambda done: _store_api_key_result(key, ttl, done))
+        # Shielded so one client disconnecting does not cancel the shared lookup
+        found = await asyncio.shield(task)
+
+    if found is None:
+        return None
+    key_id, user = found
+    _touch_api_key_later(key_id)
+    return user
+
+
+# Prebuilt bodies for the health probe and the unauthenticated (most probed) path
+_HEALTH_BODY = orjson.dumps({"status": "ok", "service": "protea-sse"})
+_ERR_MISSING_AUTH = orjson.dumps(
+    {"error": "Missing or invalid Authorization header. Use: Bearer <api_key>"}
+)
+_ERR_INVALID_KEY = orjson.dumps({"error": "Invalid API key"})
+
+# Complete ASGI messages for the health probe
+_HEALTH_START = {
+    "type": "http.response.start",
+    "status": 200,
+    "headers": [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(_HEALTH_BODY)).encode()),
+    ],
+}
+_HEALTH_RESPONSE = {"type": "http.response.body", "body": _HEALTH_BODY}
+_HEALTH_HEAD = {"type": "http.response.body", "body": b""}
+
+
+async def _send_json_error(send: Send, status: int, body: bytes) -> None:
+    """Send a prebuilt JSON error body as a complete ASGI response."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class HealthCheckMiddleware:
+    """ASGI middleware answering GET/HEAD /health before route matching.
+
+    Liveness probes are the most frequent request, so they get the prebuilt
+    body without going through the router; other methods fall through to
+    the /health route (and its 405 handling).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] == "http"
+            and scope["path"] == "/health"
+            and scope["method"] in ("GET", "HEAD")
+        ):
+            await send(_HEALTH_START)
+            await send(_HEALTH_HEAD if scope["method"] == "HEAD" else _HEALTH_RESPONSE)
+            return
+        await self.app(scope, receive, send)
+
+
+class BearerAuthMiddleware:
+    """ASGI middleware that rejects requests without a valid API key.
+
+    Reads the Authorization header straight from the ASGI scope, so rejected
+    requests never build a Request or reach the SSE handler.
+    """
+
+    def __init__(self, app: ASGIApp, legacy_key: bytes | None = None):
+        self.app = app
+        # Legacy single-key mode (PROTEA_API_KEY), compared in constant time
+        self.legacy_key = legacy_key
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        auth_header = b""
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value
+                break
+
+        if not auth_header.startswith(b"Bearer "):
+            await _send_json_error(send, 401, _ERR_MISSING_AUTH)
+            return
+
+        token = auth_header[7:]  # Remove "Bearer " prefix
+
+        # Check legacy single-key mode first
+        if self.legacy_key is not None and hmac.compare_digest(token, self.legacy_key):
+            logger.debug("Authenticated via legacy PROTEA_API_KEY")
+        else:
+            # Validate against database API keys
+            user = await _validate_api_key_cached(token.decode("latin-1"))
+            if not user:
+                await _send_json_error(send, 401, _ERR_INVALID_KEY)
+                return
+            logger.debug("Authenticated as user: %s", user.username)
+
+        await self.app(scope, receive, send)
+
+
+class SseEndpoint:
+    """Raw ASGI endpoint that runs an MCP session over an SSE connection.
+
+    Being a class instance rather than a function, Starlette mounts it as a
+    plain ASGI app, so no Request object is built per handshake.
+    """
+
+    def __init__(self, transport: SseServerTransport):
+        self.transport = transport
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         try:
-            async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
+            async with self.transport.connect_sse(scope, receive, send) as streams:
                 await server.run(streams[0], streams[1], server.create_initialization_options())
         except Exception as e:
-            logger.error(f"SSE connection error: {e}", exc_info=True)
-            return JSONResponse(
-                {"error": f"SSE connection error: {str(e)}"},
-                status_code=500,
-            )
+            logger.error("SSE connection error: %s", e, exc_info=True)
+            body = orjson.dumps({"error": f"SSE connection error: {str(e)}"})
+            await _send_json_error(send, 500, body)
+
 
-        # Return empty response when SSE connection closes normally
-        return Response(status_code=200)
+def create_sse_app() -> Starlette:
+    """Create Starlette app with MCP SSE endpoint."""
+    # Create SSE transport
+    sse = SseServerTransport("/messages/")
+
+    # Only wrap /sse in auth when it is required, so open deployments skip it
+    # entirely; the legacy key is encoded once for constant-time comparison
+    sse_middleware = []
+    if auth_settings.auth_required:
+        legacy_key = auth_settings.api_key.encode() if auth_settings.api_key else None
+        sse_middleware.append(Middleware(BearerAuthMiddleware, legacy_key=legacy_key))
 
     # Health check endpoint (no auth required)
     async def health(request):
-        return JSONResponse({"status": "ok", "service": "protea-sse"})
+        return Response(_HEALTH_BODY, media_type="application/json")
 
     app = Starlette(
         debug=False,
+        middleware=[Middleware(HealthCheckMiddleware)],
         routes=[
             Route("/health", health),
-            Route("/sse", endpoint=handle_sse),
+            Route(
+                "/sse",
+                endpoint=SseEndpoint(sse),
+                methods=["GET"],
+                middleware=sse_middleware,
+            ),
             Mount("/messages/", app=sse.handle_post_message),
         ],
     )
@@ -1,6 +1,6 @@
 """Services package for protea."""
 
 from .image_store import ImageStore
-from . import embedding_service
+from . import embedding_service, vector_index
 
-__all__ = ["ImageStore", "embedding_service"]
+__all__ = ["ImageStore", "embedding_service", "vector_index"]
@@ -13,6 +13,13 @@ logger = logging.getLogger("protea")
 _model = None
 _model_load_attempted = False
 
+# Stored embeddings are int8-quantized: a 4-byte marker, a float32 scale, then
+# one signed byte per dimension. The marker is a float32 NaN, which can never
+# begin a legacy float32 embedding. Migration 011 converts legacy rows; they
+# still decode, for rows written by an older process mid-upgrade.
+_INT8_MARKER = np.array([np.nan], dtype=np.float32).tobytes()
+_INT8_HEADER_SIZE = 8
+
 
 def _load_model():
     """Load the sentence transformer model (lazy initialization)."""
@@ -81,7 +88,7 @@ def generate_embedding(text: str) -> Optional[bytes]:
 
     try:
         embedding = model.encode(text, convert_to_numpy=True)
-        return embedding_to_bytes(embedding)
+        return quantize_embedding(normalize(embedding))
     except Exception as e:
         logger.error(f"Failed to generate embedding: {e}")
         return None
@@ -94,19 +101,33 @@ def generate_query_embedding(query: str) -> Optional[np.ndarray]:
         query: Search query text
 
     Returns:
-        Embedding as numpy array, or None if unavailable
+        L2-normalized embedding as numpy array, or None if unavailable
     """
     model = _load_model()
     if model is None:
         return None
 
     try:
-        return model.encode(query, convert_to_numpy=True)
+        return normalize(model.encode(query, convert_to_numpy=True))
     except Exception as e:
         logger.error(f"Failed to generate query embedding: {e}")
         return None
 
 
+def normalize(embedding: np.ndarray) -> np.ndarray:
+    """Scale an embedding to unit length so cosine similarity is a dot product.
+
+    Args:
+        embedding: Numpy array of floats
+
+    Returns:
+        Unit-length float32 array (zero vectors are returned unchanged)
+    """
+    embedding = embedding.astype(np.float32)
+    norm = np.linalg.norm(embedding)
+    return embedding / norm if norm > 0 else embedding
+
+
 def embedding_to_bytes(embedding: np.ndarray) -> bytes:
     """Convert numpy array to bytes for SQLite BLOB storage.
 
@@ -119,18 +140,117 @@ def embedding_to_bytes(embedding: np.ndarray) -> bytes:
     return embedding.astype(np.float32).tobytes()
 
 
+def quantize_embedding(embedding: np.ndarray) -> bytes:
+    """Convert numpy array to int8-quantized bytes for SQLite BLOB storage.
+
+    Uses symmetric per-vector scaling, so storage is a quarter of float32
+    while cosine similarity is unaffected by the scale factor.
+
+    Args:
+        embedding: Numpy array of floats
+
+    Returns:
+        Bytes representation (marker + scale + int8 values)
+    """
+    embedding = embedding.astype(np.float32)
+    max_abs = float(np.abs(embedding).max()) if embedding.size else 0.0
+    scale = max_abs / 127.0 if max_abs > 0 else 1.0
+    quantized = np.clip(np.rint(embedding / scale), -127, 127).astype(np.int8)
+    return _INT8_MARKER + np.float32(scale).tobytes() + quantized.tobytes()
+
+
+def is_quantized(data: bytes) -> bool:
+    """Check whether a stored embedding uses the int8 format."""
+    return data[:4] == _INT8_MARKER
+
+
 def bytes_to_embedding(data: bytes) -> np.ndarray:
     """Convert SQLite BLOB bytes back to numpy array.
 
+    Handles both int8-quantized blobs and legacy float32 blobs.
+
     Args:
         data: Bytes from database
 
     Returns:
         Numpy array of floats
     """
+    if is_quantized(data):
+        scale = np.frombuffer(data, dtype=np.float32, count=1, offset=4)[0]
+        quantized = np.frombuffer(data, dtype=np.int8, offset=_INT8_HEADER_SIZE)
+        return quantized.astype(np.float32) * scale
     return np.frombuffer(data, dtype=np.float32)
 
 
+def bytes_to_embedding_matrix(blobs: list[bytes]) -> np.ndarray:
+    """Decode many stored embeddings into one (n, dimensions) matrix.
+
+    When every blob shares a layout, they are joined and decoded with a single
+    np.frombuffer call instead of one small array per row.
+
+    Args:
+        blobs: Bytes from database
+
+    Returns:
+        2-D numpy array of floats, one row per blob
+    """
+    if not blobs:
+        return np.empty((0, 0), dtype=np.float32)
+
+    size = len(blobs[0])
+    quantized = is_quantized(blobs[0])
+    if any(len(b) != size or is_quantized(b) != quantized for b in blobs):
+        # Mixed formats or dimensions (e.g. mid-regeneration): decode per row
+        return np.vstack([bytes_to_embedding(b) for b in blobs])
+
+    raw = np.frombuffer(b"".join(blobs), dtype=np.uint8).reshape(len(blobs), size)
+    if not quantized:
+        return raw.view(np.float32)
+
+    scales = raw[:, 4:_INT8_HEADER_SIZE].copy().view(np.float32)
+    return raw[:, _INT8_HEADER_SIZE:].view(np.int8).astype(np.float32) * scales
+
+
+def normalized_embedding_matrix(blobs: list[bytes]) -> np.ndarray:
+    """Decode stored embeddings into a matrix of unit-length rows.
+
+    Quantized blobs are written from normalized vectors, so only legacy
+    float32 rows need their norms computed here.
+
+    Args:
+        blobs: Bytes from database
+
+    Returns:
+        2-D numpy array of floats, one unit-length row per blob
+    """
+    matrix = bytes_to_embedding_matrix(blobs)
+    legacy = np.array([not is_quantized(b) for b in blobs], dtype=bool)
+    if legacy.any():
+        matrix = np.array(matrix, dtype=np.float32)
+        norms = np.linalg.norm(matrix[legacy], axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        matrix[legacy] /= norms
+    return matrix
+
+
+def batch_dot_similarity(query_embedding: np.ndarray, matrix: np.ndarray) -> list[float]:
+    """Compute similarity for unit-length embeddings as a plain dot product.
+
+    Equivalent to batch_cosine_similarity when the query and every row of
+    the matrix are already L2-normalized, without the per-row norms.
+
+    Args:
+        query_embedding: Normalized query vector
+        matrix: Normalized embeddings, one per row
+
+    Returns:
+        List of similarity scores
+    """
+    if len(matrix) == 0:
+        return []
+    return (matrix @ query_embedding).tolist()
+
+
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     """Compute cosine similarity between two embeddings.
 
@@ -151,21 +271,23 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return float(dot_product / (norm_a * norm_b))
 
 
-def batch_cosine_similarity(query_embedding: np.ndarray, embeddings: list[np.ndarray]) -> list[float]:
+def batch_cosine_similarity(
+    query_embedding: np.ndarray, embeddings: list[np.ndarray] | np.ndarray
+) -> list[float]:
     """Compute cosine similarity between query and multiple embeddings.
 
     Args:
         query_embedding: Query vector
-        embeddings: List of embedding vectors to compare
+        embeddings: List of embedding vectors, or a 2-D matrix with one per row
 
     Returns:
         List of similarity scores
     """
-    if not embeddings:
+    if len(embeddings) == 0:
         return []
 
     # Stack embeddings into matrix for efficient computation
-    matrix = np.vstack(embeddings)
+    matrix = embeddings if isinstance(embeddings, np.ndarray) else np.vstack(embeddings)
 
     # Normalize query
     query_norm = query_embedding / np.linalg.norm(query_embedding)
@@ -202,14 +202,31 @@ class ImageStore:
             image_base64: Base64-encoded image data
             image_id: UUID for the image
 
+        Returns:
+            ImageMetadata with paths and dimensions
+        """
+        return self.save_bin_image_bytes(bin_id, base64.b64decode(image_base64), image_id)
+
+    def save_bin_image_bytes(
+        self,
+        bin_id: str,
+        image_bytes: bytes,
+        image_id: str,
+    ) -> ImageMetadata:
+        """Save raw image bytes directly to bin directory.
+
+        Args:
+            bin_id: Bin UUID
+            image_bytes: Raw image file contents
+            image_id: UUID for the image
+
         Returns:
             ImageMetadata with paths and dimensions
         """
         bin_dir = self.base_path / "bins" / bin_id
         bin_dir.mkdir(parents=True, exist_ok=True)
 
-        # Decode and validate image
-        image_bytes = base64.b64decode(image_base64)
+        # Validate image
         img = self._validate_image_data(image_bytes)
 
         # Convert to RGB if necessary
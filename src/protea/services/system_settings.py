@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 from typing import Optional
 
 from protea.db.connection import Database
-from protea.services import embedding_service
+from protea.services import embedding_service, vector_index
 
 logger = logging.getLogger("protea")
 
@@ -172,6 +172,7 @@ def _regenerate_embeddings_background(db_path, model_name: str) -> None:
                     "UPDATE items SET embedding = ? WHERE id = ?",
                     (embedding_blob, item_id),
                 )
+                vector_index.sync(db, conn)
 
             processed += 1
 
@@ -0,0 +1,154 @@
+"""Optional sqlite-vec KNN index for item embeddings.
+
+When the sqlite-vec extension is available, item embeddings are mirrored into
+a vec0 virtual table so vector search can run as an indexed KNN query instead
+of scanning every embedding in Python. Triggers queue changed items and sync()
+applies the queue inside each write transaction. Every function here is a
+no-op when the extension is missing, and callers fall back to the brute-force
+scan.
+"""
+
+import logging
+import sqlite3
+
+from protea.db.connection import Database
+from protea.services import embedding_service
+
+logger = logging.getLogger("protea")
+
+TABLE_PREFIX = "vec_items_"
+
+# Bump to force a rebuild when the index layout changes. The marker row in
+# system_settings holds "<version>:<dimension>" for the built index and also
+# switches on the change-queue triggers (migration 009).
+INDEX_VERSION = 1
+MARKER_KEY = "vector_index"
+
+
+def _table_name(dimension: int) -> str:
+    """vec0 tables have a fixed dimension, so one table exists per dimension."""
+    return f"{TABLE_PREFIX}{int(dimension)}"
+
+
+def _existing_tables(conn: sqlite3.Connection) -> list[str]:
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+        (f"{TABLE_PREFIX}[0-9]*",),
+    ).fetchall()
+    return [row["name"] for row in rows if row["name"][len(TABLE_PREFIX) :].isdigit()]
+
+
+def _create_table(conn: sqlite3.Connection, table: str, dimension: int) -> None:
+    conn.execute(
+        f"CREATE VIRTUAL TABLE {table} USING vec0(embedding float[{int(dimension)}] "
+        "distance_metric=cosine)"
+    )
+
+
+def _indexed_dimension(conn: sqlite3.Connection) -> int | None:
+    """Return the dimension of the current index, or None if it must be (re)built."""
+    row = conn.execute("SELECT value FROM system_settings WHERE key = ?", (MARKER_KEY,)).fetchone()
+    if row is None:
+        return None
+    version, _, dimension = row["value"].partition(":")
+    if version != str(INDEX_VERSION) or not dimension.isdigit():
+        return None
+    return int(dimension)
+
+
+def _rebuild(conn: sqlite3.Connection, dimension: int) -> None:
+    """(Re)create the index for a dimension and fill it from the items table."""
+    for name in _existing_tables(conn):
+        conn.execute(f"DROP TABLE {name}")
+
+    table = _table_name(dimension)
+    _create_table(conn, table, dimension)
+
+    rows = conn.execute("SELECT rowid, embedding FROM items WHERE embedding IS NOT NULL")
+    for row in rows:
+        vector = embedding_service.bytes_to_embedding(row["embedding"])
+        if vector.shape[0] == dimension:
+            conn.execute(
+                f"INSERT INTO {table}(rowid, embedding) VALUES (?, ?)",
+                (row["rowid"], vector.tobytes()),
+            )
+
+    # The index now reflects every item, so queued changes are obsolete
+    conn.execute("DELETE FROM vec_index_pending")
+    conn.execute(
+        """
+        INSERT INTO system_settings (key, value) VALUES (?, ?)
+        ON CONFLICT(key) DO UPDATE SET value = excluded.value
+        """,
+        (MARKER_KEY, f"{INDEX_VERSION}:{int(dimension)}"),
+    )
+    logger.info(f"Rebuilt vector index {table}")
+
+
+def _apply_pending(conn: sqlite3.Connection, dimension: int) -> None:
+    """Re-index the items queued by the items_vec_* triggers."""
+    rows = conn.execute(
+        """
+        SELECT p.item_rowid, i.embedding
+        FROM vec_index_pending p
+        LEFT JOIN items i ON i.rowid = p.item_rowid
+        """
+    ).fetchall()
+    if not rows:
+        return
+
+    table = _table_name(dimension)
+    for row in rows:
+        conn.execute(f"DELETE FROM {table} WHERE rowid = ?", (row["item_rowid"],))
+        if row["embedding"] is None:
+            continue
+        vector = embedding_service.bytes_to_embedding(row["embedding"])
+        if vector.shape[0] == dimension:
+            conn.execute(
+                f"INSERT INTO {table}(rowid, embedding) VALUES (?, ?)",
+                (row["item_rowid"], vector.tobytes()),
+            )
+    conn.executemany(
+        "DELETE FROM vec_index_pending WHERE item_rowid = ?",
+        [(row["item_rowid"],) for row in rows],
+    )
+
+
+def ensure_index(db: Database, dimension: int) -> str | None:
+    """Return the KNN table for a dimension, building it if needed.
+
+    The index is built once, when it is missing or was built for another
+    dimension or INDEX_VERSION. After that, writers keep it in sync through
+    sync(); only changes queued by processes without the extension are
+    applied here.
+
+    Returns:
+        Table name, or None if sqlite-vec is unavailable
+    """
+    if not db.vec_enabled:
+        return None
+
+    try:
+        with db.connection() as conn:
+            if _indexed_dimension(conn) != dimension:
+                _rebuild(conn, dimension)
+            elif conn.execute("SELECT 1 FROM vec_index_pending LIMIT 1").fetchone():
+                _apply_pending(conn, dimension)
+        return _table_name(dimension)
+    except sqlite3.Error as e:
+        logger.warning(f"Vector index unavailable, falling back to scan: {e}")
+        return None
+
+
+def sync(db: Database, conn: sqlite3.Connection) -> None:
+    """Apply queued item changes to the KNN index within an open transaction.
+
+    Call after writing items. Inserts, embedding updates and deletes are
+    queued by triggers, so cascades and bulk statements are covered too.
+    """
+    if not db.vec_enabled:
+        return
+
+    dimension = _indexed_dimension(conn)
+    if dimension is not None:
+        _apply_pending(conn, dimension)
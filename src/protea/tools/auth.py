@@ -4,7 +4,7 @@ import hashlib
 import re
 import secrets
 import string
-from datetime import datetime, timedelta, timezone
+from datetime import UTC, datetime, timedelta
 from typing import Optional
 
 import bcrypt
@@ -159,7 +159,7 @@ def create_user(
                 "error_code": "DUPLICATE_EMAIL",
             }
 
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
     user = User(
         id=generate_id(),
         username=username,
@@ -314,7 +314,7 @@ def update_user_password(
     if isinstance(user, dict):
         return user
 
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
     password_hash = hash_password(new_password)
 
     db.execute(
@@ -401,7 +401,7 @@ def create_session(
     """
     token = generate_session_token()
     token_hash = _hash_token(token)
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
     expires_at = now + timedelta(hours=session_hours)
 
     session = AuthSession(
@@ -445,7 +445,7 @@ def validate_session(db: Database, token: str) -> User | None:
         User object or None if invalid/expired
     """
     token_hash = _hash_token(token)
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
 
     row = db.execute_one(
         """
@@ -508,7 +508,7 @@ def cleanup_expired_sessions(db: Database) -> int:
     Returns:
         Number of sessions cleaned up
     """
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
     return db.execute_update("DELETE FROM auth_sessions WHERE expires_at <= ?", (now,))
 
 
@@ -546,7 +546,7 @@ def create_api_key(
 
     plaintext_key = generate_api_key()
     key_hash = _hash_token(plaintext_key)
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
 
     api_key = ApiKey(
         id=generate_id(),
@@ -589,20 +589,18 @@ def create_api_key(
     )
 
 
-def validate_api_key(db: Database, key: str) -> User | None:
-    """Validate an API key and return the associated user.
-
-    Also updates the last_used_at timestamp.
+def lookup_api_key(db: Database, key: str) -> tuple[str, User] | None:
+    """Find the active API key matching a plaintext key, without recording use.
 
     Args:
         db: Database connection
         key: Plain text API key
 
     Returns:
-        User object or None if invalid/expired/inactive
+        Tuple of (api key ID, owning User) or None if invalid/expired/inactive
     """
     key_hash = _hash_token(key)
-    now = datetime.now(timezone.utc)
+    now = datetime.now(UTC)
 
     row = db.execute_one(
         """
@@ -618,13 +616,7 @@ def validate_api_key(db: Database, key: str) -> User | None:
     if not row:
         return None
 
-    # Update last_used_at
-    db.execute(
-        "UPDATE api_keys SET last_used_at = ? WHERE id = ?",
-        (now, row["id"]),
-    )
-
-    return User(
+    user = User(
         id=row["user_id"],
         username=row["username"],
         email=row["email"],
@@ -634,6 +626,41 @@ def validate_api_key(db: Database, key: str) -> User | None:
         created_at=row["created_at"],
         updated_at=row["updated_at"],
     )
+    return row["id"], user
+
+
+def touch_api_key(db: Database, key_id: str) -> None:
+    """Record that an API key was just used.
+
+    Args:
+        db: Database connection
+        key_id: API key UUID
+    """
+    db.execute(
+        "UPDATE api_keys SET last_used_at = ? WHERE id = ?",
+        (datetime.now(UTC), key_id),
+    )
+
+
+def validate_api_key(db: Database, key: str) -> User | None:
+    """Validate an API key and return the associated user.
+
+    Also updates the last_used_at timestamp.
+
+    Args:
+        db: Database connection
+        key: Plain text API key
+
+    Returns:
+        User object or None if invalid/expired/inactive
+    """
+    found = lookup_api_key(db, key)
+    if found is None:
+        return None
+
+    key_id, user = found
+    touch_api_key(db, key_id)
+    return user
 
 
 def get_user_api_keys(db: Database, user_id: str) -> list[ApiKeyPublic]:
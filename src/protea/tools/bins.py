@@ -1,7 +1,9 @@
 """Bin management tools for protea."""
 
+import base64
 from datetime import datetime, timezone
 
+from protea.config import settings
 from protea.db.connection import Database
 from protea.db.models import (
     Bin,
@@ -18,33 +20,37 @@ from protea.services.image_store import ImageStore
 # --- Helper Functions for Nested Bins ---
 
 
+# Walks parent links in one statement; the depth cap guards against cycles
+_ANCESTORS_SQL = """
+    WITH RECURSIVE ancestors(id, depth) AS (
+        SELECT parent_bin_id, 1 FROM bins WHERE id = ? AND parent_bin_id IS NOT NULL
+        UNION ALL
+        SELECT b.parent_bin_id, a.depth + 1
+        FROM bins b
+        JOIN ancestors a ON b.id = a.id
+        WHERE b.parent_bin_id IS NOT NULL AND a.depth < 64
+    )
+    SELECT b.*
+    FROM ancestors a
+    JOIN bins b ON b.id = a.id
+    ORDER BY a.depth
+"""
+
+
 def _get_bin_ancestors(db: Database, bin_id: str) -> list[Bin]:
     """Get all ancestor bins from root to immediate parent.
 
     Returns list ordered from root ancestor to immediate parent.
     """
     ancestors = []
-    current_id = bin_id
     visited = set()  # Prevent infinite loops
 
-    # First get the bin's parent_bin_id
-    row = db.execute_one("SELECT parent_bin_id FROM bins WHERE id = ?", (current_id,))
-    if not row or not row["parent_bin_id"]:
-        return ancestors
-
-    current_id = row["parent_bin_id"]
-
-    while current_id:
-        if current_id in visited:
+    # Rows arrive nearest parent first
+    for parent_row in db.execute(_ANCESTORS_SQL, (bin_id,)):
+        if parent_row["id"] in visited:
             break  # Circular reference protection
-        visited.add(current_id)
-
-        parent_row = db.execute_one("SELECT * FROM bins WHERE id = ?", (current_id,))
-        if not parent_row:
-            break
-
-        ancestors.insert(
-            0,
+        visited.add(parent_row["id"])
+        ancestors.append(
             Bin(
                 id=parent_row["id"],
                 name=parent_row["name"],
@@ -53,10 +59,10 @@ def _get_bin_ancestors(db: Database, bin_id: str) -> list[Bin]:
                 description=parent_row["description"],
                 created_at=parent_row["created_at"],
                 updated_at=parent_row["updated_at"],
-            ),
+            )
         )
-        current_id = parent_row["parent_bin_id"]
 
+    ancestors.reverse()
     return ancestors
 
 
@@ -277,6 +283,97 @@ def get_bin_tree(
     return {"bins": bins}
 
 
+def get_location_bin_trees(db: Database, max_depth: int = 10) -> dict[str, list[dict]]:
+    """Get nested bin trees for every location in a single query.
+
+    Nodes have the same shape as get_bin_tree's, but all bins and their item
+    counts are read up front and the trees are assembled in memory.
+
+    Args:
+        db: Database connection
+        max_depth: Maximum nesting depth to include
+
+    Returns:
+        Dict mapping location_id to its list of root bin nodes
+    """
+    # Per-bin counts are index lookups on idx_items_bin
+    rows = db.execute(
+        """
+        SELECT b.id, b.name, b.description, b.parent_bin_id, b.location_id,
+               (SELECT COUNT(*) FROM items i WHERE i.bin_id = b.id) as item_count
+        FROM bins b
+        ORDER BY b.name
+        """
+    )
+
+    children_by_parent: dict[str | None, list] = {}
+    for row in rows:
+        children_by_parent.setdefault(row["parent_bin_id"], []).append(row)
+
+    def build_node(bin_row, depth: int) -> dict:
+        children = []
+        if depth + 1 < max_depth:
+            children = [
+                build_node(child, depth + 1)
+                for child in children_by_parent.get(bin_row["id"], [])
+            ]
+        return {
+            "id": bin_row["id"],
+            "name": bin_row["name"],
+            "description": bin_row["description"],
+            "parent_bin_id": bin_row["parent_bin_id"],
+            "item_count": bin_row["item_count"],
+            "child_count": len(children),
+            "children": children,
+        }
+
+    trees: dict[str, list[dict]] = {}
+    for row in children_by_parent.get(None, []):
+        trees.setdefault(row["location_id"], []).append(build_node(row, 0))
+    return trees
+
+
+def count_bins_by_location(db: Database) -> dict[str, int]:
+    """Count all bins (at any nesting depth) in each location.
+
+    Args:
+        db: Database connection
+
+    Returns:
+        Dict mapping location_id to its bin count; empty locations are absent
+    """
+    rows = db.execute("SELECT location_id, COUNT(*) as bin_count FROM bins GROUP BY location_id")
+    return {row["location_id"]: row["bin_count"] for row in rows}
+
+
+def get_location_bin_counts(db: Database, location_id: str) -> list[dict]:
+    """List a location's bins with their item and child-bin counts.
+
+    Counts come from correlated subqueries on idx_items_bin and
+    idx_bins_parent, so the whole listing is a single query.
+
+    Args:
+        db: Database connection
+        location_id: Location UUID
+
+    Returns:
+        List of dicts with id, name, description, item_count and child_count,
+        ordered by bin name
+    """
+    rows = db.execute(
+        """
+        SELECT b.id, b.name, b.description,
+               (SELECT COUNT(*) FROM items i WHERE i.bin_id = b.id) as item_count,
+               (SELECT COUNT(*) FROM bins c WHERE c.parent_bin_id = b.id) as child_count
+        FROM bins b
+        WHERE b.location_id = ?
+        ORDER BY b.name
+        """,
+        (location_id,),
+    )
+    return [dict(row) for row in rows]
+
+
 def get_bins(
     db: Database,
     location_id: str | None = None,
@@ -344,6 +441,32 @@ def get_bins(
     ]
 
 
+def get_all_bins_with_location(db: Database) -> list[dict]:
+    """List every bin with its location name in a single query.
+
+    Lighter than get_bins() for building selection lists such as the
+    move-item dropdown.
+
+    Args:
+        db: Database connection
+
+    Returns:
+        List of dicts with id, name and location_name, ordered by location then bin
+    """
+    rows = db.execute(
+        """
+        SELECT b.id, b.name, l.name as location_name
+        FROM bins b
+        JOIN locations l ON b.location_id = l.id
+        ORDER BY l.name, l.id, b.name
+        """
+    )
+    return [
+        {"id": row["id"], "name": row["name"], "location_name": row["location_name"]}
+        for row in rows
+    ]
+
+
 def get_bin(
     db: Database,
     bin_id: str | None = None,
@@ -455,15 +578,21 @@ def get_bin(
             for r in image_rows
         ]
 
-    # Get counts
-    item_count = db.execute_one(
-        "SELECT COUNT(*) as cnt FROM items WHERE bin_id = ?",
-        (row["id"],),
-    )
-    image_count = db.execute_one(
-        "SELECT COUNT(*) as cnt FROM bin_images WHERE bin_id = ?",
-        (row["id"],),
-    )
+    # Get counts, reusing the lists already loaded above
+    if include_items:
+        item_count = len(items)
+    else:
+        item_count = db.execute_one(
+            "SELECT COUNT(*) as cnt FROM items WHERE bin_id = ?",
+            (row["id"],),
+        )["cnt"]
+    if include_images:
+        image_count = len(images)
+    else:
+        image_count = db.execute_one(
+            "SELECT COUNT(*) as cnt FROM bin_images WHERE bin_id = ?",
+            (row["id"],),
+        )["cnt"]
 
     # Get parent bin if nested
     parent_bin = None
@@ -522,8 +651,8 @@ def get_bin(
         location=location,
         items=items,
         images=images,
-        item_count=item_count["cnt"] if item_count else 0,
-        image_count=image_count["cnt"] if image_count else 0,
+        item_count=item_count,
+        image_count=image_count,
         parent_bin=parent_bin,
         child_bins=child_bins,
         path=path,
@@ -907,6 +1036,52 @@ def add_bin_image(
         caption: Optional caption
         is_primary: Set as primary image
 
+    Returns:
+        Created BinImage or error dict
+    """
+    # Reject oversized payloads before decoding them
+    if len(image_base64) * 3 // 4 > settings.max_image_size_bytes:
+        return _image_too_large_error()
+
+    try:
+        image_bytes = base64.b64decode(image_base64)
+    except ValueError as e:
+        return {
+            "error": f"Failed to save image: {e}",
+            "error_code": "INTERNAL_ERROR",
+        }
+
+    return add_bin_image_bytes(db, image_store, bin_id, image_bytes, caption, is_primary)
+
+
+def _image_too_large_error() -> dict:
+    """Build the error returned for images over the configured size limit."""
+    return {
+        "error": f"Image too large. Maximum size is {settings.max_image_size_bytes // (1024*1024)}MB",
+        "error_code": "IMAGE_TOO_LARGE",
+    }
+
+
+def add_bin_image_bytes(
+    db: Database,
+    image_store: ImageStore,
+    bin_id: str,
+    image_bytes: bytes,
+    caption: str | None = None,
+    is_primary: bool = False,
+) -> BinImage | dict:
+    """Add raw image bytes to a bin directly.
+
+    Used by the web UI so uploads skip a base64 encode/decode round trip.
+
+    Args:
+        db: Database connection
+        image_store: Image storage service
+        bin_id: Bin UUID
+        image_bytes: Raw image file contents
+        caption: Optional caption
+        is_primary: Set as primary image
+
     Returns:
         Created BinImage or error dict
     """
@@ -919,21 +1094,14 @@ def add_bin_image(
             "details": {"bin_id": bin_id},
         }
 
-    # Check image size
-    from protea.config import settings
-
-    image_bytes = len(image_base64) * 3 // 4  # Approximate decoded size
-    if image_bytes > settings.max_image_size_bytes:
-        return {
-            "error": f"Image too large. Maximum size is {settings.max_image_size_bytes // (1024*1024)}MB",
-            "error_code": "IMAGE_TOO_LARGE",
-        }
+    if len(image_bytes) > settings.max_image_size_bytes:
+        return _image_too_large_error()
 
     # Save image
     image = BinImage(bin_id=bin_id, file_path="", caption=caption, is_primary=is_primary)
 
     try:
-        metadata = image_store.save_bin_image(bin_id, image_base64, image.id)
+        metadata = image_store.save_bin_image_bytes(bin_id, image_bytes, image.id)
     except Exception as e:
         return {
             "error": f"Failed to save image: {str(e)}",
@@ -1,7 +1,8 @@
 """Item management tools for protea."""
 
 import json
-from datetime import datetime, timezone
+import sqlite3
+from datetime import UTC, datetime
 
 from protea.db.connection import Database
 from protea.db.models import (
@@ -15,7 +16,7 @@ from protea.db.models import (
     Location,
     QuantityType,
 )
-from protea.services import embedding_service
+from protea.services import embedding_service, vector_index
 from protea.tools.bins import _build_bin_path, _get_bin_ancestors
 
 
@@ -83,6 +84,12 @@ def _get_item_with_location(db: Database, item_id: str) -> ItemWithLocation | No
     )
 
 
+_INSERT_ACTIVITY_SQL = """
+    INSERT INTO activity_log (id, item_id, action, quantity_change, from_bin_id, to_bin_id, notes, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
 def _log_activity(
     db: Database,
     item_id: str,
@@ -91,8 +98,12 @@ def _log_activity(
     from_bin_id: str | None = None,
     to_bin_id: str | None = None,
     notes: str | None = None,
+    conn: sqlite3.Connection | None = None,
 ) -> None:
-    """Log an activity for an item."""
+    """Log an activity for an item.
+
+    Pass ``conn`` to write the entry in the caller's open transaction.
+    """
     log = ActivityLog(
         item_id=item_id,
         action=action,
@@ -101,23 +112,21 @@ def _log_activity(
         to_bin_id=to_bin_id,
         notes=notes,
     )
-    with db.connection() as conn:
-        conn.execute(
-            """
-            INSERT INTO activity_log (id, item_id, action, quantity_change, from_bin_id, to_bin_id, notes, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                log.id,
-                log.item_id,
-                log.action.value,
-                log.quantity_change,
-                log.from_bin_id,
-                log.to_bin_id,
-                log.notes,
-                log.created_at.isoformat(),
-            ),
-        )
+    params = (
+        log.id,
+        log.item_id,
+        log.action.value,
+        log.quantity_change,
+        log.from_bin_id,
+        log.to_bin_id,
+        log.notes,
+        log.created_at.isoformat(),
+    )
+    if conn is not None:
+        conn.execute(_INSERT_ACTIVITY_SQL, params)
+        return
+    with db.connection() as own_conn:
+        own_conn.execute(_INSERT_ACTIVITY_SQL, params)
 
 
 def get_item(db: Database, item_id: str) -> ItemWithLocation | dict:
@@ -259,6 +268,7 @@ def add_item(
                 embedding_blob,
             ),
         )
+        vector_index.sync(db, conn)
 
     # Log activity
     _log_activity(db, item.id, ActivityAction.ADDED, quantity_change=quantity_value)
@@ -370,7 +380,7 @@ def update_item(
     new_quantity_label = quantity_label if quantity_label is not None else row["quantity_label"]
     new_description = description if description is not None else row["description"]
     new_notes = notes if notes is not None else row["notes"]
-    updated_at = datetime.now(timezone.utc)
+    updated_at = datetime.now(UTC)
 
     # Check if text fields changed - if so, regenerate embedding
     text_changed = (
@@ -406,6 +416,7 @@ def update_item(
                     item_id,
                 ),
             )
+            vector_index.sync(db, conn)
         else:
             conn.execute(
                 """
@@ -485,6 +496,7 @@ def remove_item(
         conn.execute("DELETE FROM item_aliases WHERE item_id = ?", (item_id,))
         # Activity log has ON DELETE CASCADE
         conn.execute("DELETE FROM items WHERE id = ?", (item_id,))
+        vector_index.sync(db, conn)
 
     return {
         "success": True,
@@ -551,7 +563,7 @@ def use_item(
 
     current_qty = row["quantity_value"] or 0
     new_qty = max(0, current_qty - quantity)
-    updated_at = datetime.now(timezone.utc)
+    updated_at = datetime.now(UTC)
 
     with db.connection() as conn:
         conn.execute(
@@ -586,6 +598,51 @@ def use_item(
     )
 
 
+def increment_quantity(
+    db: Database,
+    item_id: str,
+    delta: int,
+    notes: str | None = None,
+) -> int | dict:
+    """Atomically add to an item's quantity and log the addition.
+
+    Args:
+        db: Database connection
+        item_id: Item UUID
+        delta: Amount to add (an unset quantity counts as 0)
+        notes: Optional notes for the activity log
+
+    Returns:
+        New quantity value or error dict
+    """
+    with db.connection() as conn:
+        row = conn.execute(
+            """
+            UPDATE items SET quantity_value = COALESCE(quantity_value, 0) + ?, updated_at = ?
+            WHERE id = ?
+            RETURNING quantity_value
+            """,
+            (delta, datetime.now(UTC).isoformat(), item_id),
+        ).fetchone()
+        if row is None:
+            return {
+                "error": "Item not found",
+                "error_code": "NOT_FOUND",
+                "details": {"item_id": item_id},
+            }
+
+        _log_activity(
+            db,
+            item_id,
+            ActivityAction.ADDED,
+            quantity_change=delta,
+            notes=notes,
+            conn=conn,
+        )
+
+    return row["quantity_value"]
+
+
 def move_items_bulk(
     db: Database,
     moves: list[dict],
@@ -637,7 +694,7 @@ def move_items_bulk(
         items_by_id = {row["id"]: row for row in rows}
 
     # Process moves using a single connection for all updates
-    updated_at = datetime.now(timezone.utc)
+    updated_at = datetime.now(UTC)
 
     with db.connection() as conn:
         for move in moves:
@@ -757,7 +814,7 @@ def move_item(
 
     from_bin_id = row["bin_id"]
     current_qty = row["quantity_value"] or 1
-    updated_at = datetime.now(timezone.utc)
+    updated_at = datetime.now(UTC)
 
     # Determine if splitting
     if quantity is not None and quantity < current_qty:
@@ -824,6 +881,7 @@ def move_item(
                     embedding_blob,
                 ),
             )
+            vector_index.sync(db, conn)
 
         # Log activity with split info
         split_notes = json.dumps({"split": True, "new_item_id": new_item.id})
@@ -1,5 +1,11 @@
 """Search and query tools for protea."""
 
+from collections.abc import Iterator
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+
 from protea.config import settings
 from protea.db.connection import Database
 from protea.db.models import (
@@ -7,109 +13,183 @@ from protea.db.models import (
     ActivityLog,
     Bin,
     Item,
+    ItemSource,
     ItemWithLocation,
     Location,
+    QuantityType,
     SearchResult,
 )
-from protea.services import embedding_service
+from protea.services import embedding_service, vector_index
 from protea.tools.bins import _build_bin_path
 
+# Nearest neighbours fetched from the sqlite-vec index for unfiltered searches
+VECTOR_KNN_LIMIT = 200
+
+# Statement templates. Filters only come in a handful of shapes, so the
+# formatted SQL is cached per shape and sqlite3 can reuse its prepared
+# statement for identical text instead of re-parsing a fresh string.
+_FTS_SQL = """
+    SELECT i.*, b.name as bin_name, b.description as bin_desc,
+           b.parent_bin_id as bin_parent_id,
+           b.created_at as bin_created, b.updated_at as bin_updated,
+           l.id as loc_id, l.name as loc_name, l.description as loc_desc,
+           l.created_at as loc_created, l.updated_at as loc_updated,
+           fts.rank as fts_score
+    FROM items i
+    JOIN bins b ON i.bin_id = b.id
+    JOIN locations l ON b.location_id = l.id
+    JOIN items_fts fts ON i.rowid = fts.rowid
+    WHERE items_fts MATCH ?
+    {filter_sql}
+    LIMIT 100
+"""
+
+_ALIAS_SQL = """
+    SELECT i.*, b.name as bin_name, b.description as bin_desc,
+           b.parent_bin_id as bin_parent_id,
+           b.created_at as bin_created, b.updated_at as bin_updated,
+           l.id as loc_id, l.name as loc_name, l.description as loc_desc,
+           l.created_at as loc_created, l.updated_at as loc_updated,
+           fts.rank as fts_score
+    FROM items i
+    JOIN bins b ON i.bin_id = b.id
+    JOIN locations l ON b.location_id = l.id
+    JOIN item_aliases a ON i.id = a.item_id
+    JOIN aliases_fts fts ON a.rowid = fts.rowid
+    WHERE aliases_fts MATCH ?
+    {filter_sql}
+    LIMIT 100
+"""
+
+_VECTOR_SCAN_SQL = """
+    SELECT i.*, b.name as bin_name, b.description as bin_desc,
+           b.parent_bin_id as bin_parent_id,
+           b.created_at as bin_created, b.updated_at as bin_updated,
+           l.id as loc_id, l.name as loc_name, l.description as loc_desc,
+           l.created_at as loc_created, l.updated_at as loc_updated,
+           i.embedding
+    FROM items i
+    JOIN bins b ON i.bin_id = b.id
+    JOIN locations l ON b.location_id = l.id
+    WHERE i.embedding IS NOT NULL
+    {filter_sql}
+"""
+
+_VECTOR_KNN_SQL = """
+    WITH knn AS (
+        SELECT rowid, distance
+        FROM {vec_table}
+        WHERE embedding MATCH ? AND k = ?
+    )
+    SELECT i.*, b.name as bin_name, b.description as bin_desc,
+           b.parent_bin_id as bin_parent_id,
+           b.created_at as bin_created, b.updated_at as bin_updated,
+           l.id as loc_id, l.name as loc_name, l.description as loc_desc,
+           l.created_at as loc_created, l.updated_at as loc_updated,
+           knn.distance
+    FROM knn
+    JOIN items i ON i.rowid = knn.rowid
+    JOIN bins b ON i.bin_id = b.id
+    JOIN locations l ON b.location_id = l.id
+    WHERE i.embedding IS NOT NULL
+"""
+
+_LIST_ITEMS_SQL = """
+    SELECT i.*, b.name as bin_name, b.description as bin_desc,
+           b.created_at as bin_created, b.updated_at as bin_updated,
+           l.id as loc_id, l.name as loc_name, l.description as loc_desc,
+           l.created_at as loc_created, l.updated_at as loc_updated
+    FROM items i
+    JOIN bins b ON i.bin_id = b.id
+    JOIN locations l ON b.location_id = l.id
+    {filter_sql}
+    ORDER BY l.name, b.name, i.name
+"""
+
+
+def _ts(value):
+    """Parse a stored timestamp without going through model validation."""
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
 
 def _row_to_search_result(db: Database, row, score: float) -> SearchResult:
-    """Convert a database row to a SearchResult."""
+    """Convert a database row to a SearchResult.
+
+    Rows come straight from our own tables, so models are built with
+    model_construct() to skip validation on the search hot path.
+    """
     bin_path = _build_bin_path(db, row["bin_id"], include_location=True)
-    return SearchResult(
-        item=Item(
+    return SearchResult.model_construct(
+        item=Item.model_construct(
             id=row["id"],
             name=row["name"],
             description=row["description"],
             category_id=row["category_id"],
             bin_id=row["bin_id"],
-            quantity_type=row["quantity_type"],
+            quantity_type=QuantityType(row["quantity_type"]),
             quantity_value=row["quantity_value"],
             quantity_label=row["quantity_label"],
-            source=row["source"],
+            source=ItemSource(row["source"]),
             source_reference=row["source_reference"],
             photo_url=row["photo_url"],
             notes=row["notes"],
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
+            created_at=_ts(row["created_at"]),
+            updated_at=_ts(row["updated_at"]),
         ),
-        bin=Bin(
+        bin=Bin.model_construct(
             id=row["bin_id"],
             name=row["bin_name"],
             location_id=row["loc_id"],
             parent_bin_id=row["bin_parent_id"],
             description=row["bin_desc"],
-            created_at=row["bin_created"],
-            updated_at=row["bin_updated"],
+            created_at=_ts(row["bin_created"]),
+            updated_at=_ts(row["bin_updated"]),
         ),
-        location=Location(
+        location=Location.model_construct(
             id=row["loc_id"],
             name=row["loc_name"],
             description=row["loc_desc"],
-            created_at=row["loc_created"],
-            updated_at=row["loc_updated"],
+            created_at=_ts(row["loc_created"]),
+            updated_at=_ts(row["loc_updated"]),
         ),
         match_score=score,
         bin_path=bin_path,
     )
 
 
+@lru_cache(maxsize=1024)
+def _build_fts_query(query: str) -> str:
+    """Turn a free-text query into an FTS5 prefix-match expression.
+
+    Each term is quoted, so punctuation and keywords in user input (``-``,
+    ``:``, ``(``, ``NOT``) are matched as text instead of parsed as FTS5
+    syntax. Typeahead repeats the same prefixes, so results are cached.
+    """
+    terms = (term.replace('"', "") for term in query.split())
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+
 def _fts_search(
     db: Database,
-    query: str,
+    fts_query: str,
     filter_sql: str,
     params: list,
 ) -> dict[str, tuple]:
     """Run FTS search and return dict of item_id -> (row, fts_score)."""
-    fts_query = " ".join(f"{term}*" for term in query.split())
-
-    sql = f"""
-        SELECT i.*, b.name as bin_name, b.description as bin_desc,
-               b.parent_bin_id as bin_parent_id,
-               b.created_at as bin_created, b.updated_at as bin_updated,
-               l.id as loc_id, l.name as loc_name, l.description as loc_desc,
-               l.created_at as loc_created, l.updated_at as loc_updated,
-               fts.rank as fts_score
-        FROM items i
-        JOIN bins b ON i.bin_id = b.id
-        JOIN locations l ON b.location_id = l.id
-        JOIN items_fts fts ON i.rowid = fts.rowid
-        WHERE items_fts MATCH ?
-        {filter_sql}
-        LIMIT 100
-    """
+    sql = _FTS_SQL.format(filter_sql=filter_sql)
     rows = db.execute(sql, (fts_query, *params))
     return {row["id"]: (row, abs(row["fts_score"]) if row["fts_score"] else 1.0) for row in rows}
 
 
 def _alias_search(
     db: Database,
-    query: str,
+    fts_query: str,
     filter_sql: str,
     params: list,
     exclude_ids: set[str],
 ) -> dict[str, tuple]:
     """Run alias FTS search and return dict of item_id -> (row, fts_score)."""
-    fts_query = " ".join(f"{term}*" for term in query.split())
-
-    alias_sql = f"""
-        SELECT i.*, b.name as bin_name, b.description as bin_desc,
-               b.parent_bin_id as bin_parent_id,
-               b.created_at as bin_created, b.updated_at as bin_updated,
-               l.id as loc_id, l.name as loc_name, l.description as loc_desc,
-               l.created_at as loc_created, l.updated_at as loc_updated,
-               fts.rank as fts_score
-        FROM items i
-        JOIN bins b ON i.bin_id = b.id
-        JOIN locations l ON b.location_id = l.id
-        JOIN item_aliases a ON i.id = a.item_id
-        JOIN aliases_fts fts ON a.rowid = fts.rowid
-        WHERE aliases_fts MATCH ?
-        {filter_sql}
-        LIMIT 100
-    """
+    alias_sql = _ALIAS_SQL.format(filter_sql=filter_sql)
     rows = db.execute(alias_sql, (fts_query, *params))
     results = {}
     for row in rows:
@@ -133,38 +213,28 @@ def _vector_search(
     if query_embedding is None:
         return {}
 
+    # Use the sqlite-vec KNN index when available instead of scanning everything.
+    # vec0 can only filter after picking the top k, which would drop matches
+    # outside the global nearest set, so filtered searches always scan.
+    if not filter_sql:
+        vec_table = vector_index.ensure_index(db, query_embedding.shape[0])
+        if vec_table:
+            return _vector_knn_search(db, vec_table, query_embedding)
+
     # Fetch items with embeddings
-    sql = f"""
-        SELECT i.*, b.name as bin_name, b.description as bin_desc,
-               b.parent_bin_id as bin_parent_id,
-               b.created_at as bin_created, b.updated_at as bin_updated,
-               l.id as loc_id, l.name as loc_name, l.description as loc_desc,
-               l.created_at as loc_created, l.updated_at as loc_updated,
-               i.embedding
-        FROM items i
-        JOIN bins b ON i.bin_id = b.id
-        JOIN locations l ON b.location_id = l.id
-        WHERE i.embedding IS NOT NULL
-        {filter_sql}
-    """
+    sql = _VECTOR_SCAN_SQL.format(filter_sql=filter_sql)
     rows = db.execute(sql, tuple(params))
 
     if not rows:
         return {}
 
-    # Compute similarities
+    # Decode all embeddings in one pass; with unit-length vectors on both
+    # sides, cosine similarity is just a matrix-vector product
     results = {}
-    embeddings = []
-    row_list = []
-
-    for row in rows:
-        embedding = embedding_service.bytes_to_embedding(row["embedding"])
-        embeddings.append(embedding)
-        row_list.append(row)
-
-    similarities = embedding_service.batch_cosine_similarity(query_embedding, embeddings)
+    matrix = embedding_service.normalized_embedding_matrix([row["embedding"] for row in rows])
+    similarities = embedding_service.batch_dot_similarity(query_embedding, matrix)
 
-    for row, similarity in zip(row_list, similarities):
+    for row, similarity in zip(rows, similarities):
         # Only include items with reasonable similarity (threshold 0.2)
         # Note: 0.3 was too aggressive and filtered valid semantic matches
         # like "fastener" -> "bolts" (0.35) or "electronic component" -> "resistors" (0.21)
@@ -174,6 +244,69 @@ def _vector_search(
     return results
 
 
+def _vector_knn_search(
+    db: Database,
+    vec_table: str,
+    query_embedding,
+) -> dict[str, tuple]:
+    """Run an unfiltered indexed KNN query and return dict of item_id -> (row, similarity)."""
+    sql = _VECTOR_KNN_SQL.format(vec_table=vec_table)
+    query_bytes = query_embedding.astype("float32").tobytes()
+    rows = db.execute(sql, (query_bytes, VECTOR_KNN_LIMIT))
+
+    results = {}
+    for row in rows:
+        # Cosine distance -> similarity, same 0.2 threshold as the scan path
+        similarity = 1.0 - row["distance"]
+        if similarity >= 0.2:
+            results[row["id"]] = (row, similarity)
+    return results
+
+
+def _combine_scores(
+    fts_results: dict[str, tuple],
+    alias_results: dict[str, tuple],
+    vector_results: dict[str, tuple],
+    limit: int,
+) -> list[tuple]:
+    """Merge FTS, alias and vector hits into the top (row, combined_score) pairs.
+
+    Scores are computed as numpy arrays over the union of candidates rather
+    than per item in Python. Ties keep FTS, then alias, then vector order.
+    """
+    # Text matches: FTS hits win over alias hits for the same item
+    text_results = dict(fts_results)
+    for item_id, entry in alias_results.items():
+        text_results.setdefault(item_id, entry)
+
+    rows = {item_id: row for item_id, (row, _) in text_results.items()}
+    for item_id, (row, _) in vector_results.items():
+        rows.setdefault(item_id, row)
+    if not rows:
+        return []
+
+    item_ids = list(rows)
+    text_raw = np.array([text_results.get(i, (None, 0.0))[1] for i in item_ids], dtype=float)
+    vector_raw = np.array([vector_results.get(i, (None, 0.0))[1] for i in item_ids], dtype=float)
+    has_text = np.array([i in text_results for i in item_ids], dtype=bool)
+
+    # Normalize FTS score (FTS rank is negative, closer to 0 is better)
+    # Convert to 0-1 scale where higher is better, capped at 1.0
+    normalized_fts = np.where(has_text, np.minimum(1.0, text_raw / 10.0), 0.0)
+    combined = (
+        normalized_fts * settings.fts_search_weight + vector_raw * settings.vector_search_weight
+    )
+
+    # Vector-only matches need reasonable similarity on their own.
+    # Lowered from 0.4 to 0.25 to allow abstract queries like
+    # "fastener" to find "M6 Hex Bolts" (similarity ~0.25)
+    candidates = np.flatnonzero(has_text | (vector_raw >= 0.25))
+
+    # Highest first; stable sort keeps insertion order for equal scores
+    order = candidates[np.argsort(-combined[candidates], kind="stable")[:limit]]
+    return [(rows[item_ids[i]], float(combined[i])) for i in order]
+
+
 def search_items(
     db: Database,
     query: str,
@@ -214,60 +347,24 @@ def search_items(
     if filter_clauses:
         filter_sql = "AND " + " AND ".join(filter_clauses)
 
-    # Run FTS search
-    fts_results = _fts_search(db, query, filter_sql, params)
+    # Both FTS passes share the same prefix-match expression
+    fts_query = _build_fts_query(query)
+
+    # Run FTS search (an empty MATCH expression is an FTS5 syntax error)
+    fts_results = _fts_search(db, fts_query, filter_sql, params) if fts_query else {}
 
     # Run alias search (excluding items already in FTS results)
-    alias_results = _alias_search(db, query, filter_sql, params, set(fts_results.keys()))
+    alias_results = {}
+    if fts_query:
+        alias_results = _alias_search(db, fts_query, filter_sql, params, set(fts_results.keys()))
 
     # Run vector search
     vector_results = _vector_search(db, query, filter_sql, params)
 
-    # Combine results with weighted scoring
-    fts_weight = settings.fts_search_weight
-    vector_weight = settings.vector_search_weight
-
-    # Track all unique items and their combined scores
-    combined_scores: dict[str, tuple] = {}  # item_id -> (row, combined_score)
-
-    # Process FTS results
-    for item_id, (row, fts_score) in fts_results.items():
-        vector_score = vector_results.get(item_id, (None, 0.0))[1]
-        # Normalize FTS score (FTS rank is negative, closer to 0 is better)
-        # Convert to 0-1 scale where higher is better
-        normalized_fts = min(1.0, fts_score / 10.0)  # Cap at 1.0
-        combined = (normalized_fts * fts_weight) + (vector_score * vector_weight)
-        combined_scores[item_id] = (row, combined)
-
-    # Process alias results
-    for item_id, (row, fts_score) in alias_results.items():
-        if item_id not in combined_scores:
-            vector_score = vector_results.get(item_id, (None, 0.0))[1]
-            normalized_fts = min(1.0, fts_score / 10.0)
-            combined = (normalized_fts * fts_weight) + (vector_score * vector_weight)
-            combined_scores[item_id] = (row, combined)
-
-    # Add vector-only results (items not found by FTS but similar semantically)
-    for item_id, (row, vector_score) in vector_results.items():
-        if item_id not in combined_scores:
-            # No FTS match, only vector similarity
-            combined = vector_score * vector_weight
-            # Require reasonable similarity for vector-only matches
-            # Lowered from 0.4 to 0.25 to allow abstract queries like
-            # "fastener" to find "M6 Hex Bolts" (similarity ~0.25)
-            if vector_score >= 0.25:
-                combined_scores[item_id] = (row, combined)
-
-    # Convert to SearchResult objects
-    results = []
-    for item_id, (row, score) in combined_scores.items():
-        results.append(_row_to_search_result(db, row, score))
-
-    # Sort by combined score (highest first)
-    results.sort(key=lambda r: r.match_score, reverse=True)
-
-    # Limit results
-    return results[:50]
+    # Combine results with weighted scoring and keep the best 50
+    top = _combine_scores(fts_results, alias_results, vector_results, limit=50)
+
+    return [_row_to_search_result(db, row, score) for row, score in top]
 
 
 def find_item(db: Database, query: str) -> list[SearchResult]:
@@ -285,46 +382,30 @@ def find_item(db: Database, query: str) -> list[SearchResult]:
     return search_items(db, query)
 
 
-def list_items(
-    db: Database,
-    bin_id: str | None = None,
-    location_id: str | None = None,
-    category_id: str | None = None,
-    include_children: bool = True,
-) -> list[ItemWithLocation]:
-    """List items with filters.
-
-    Args:
-        db: Database connection
-        bin_id: Filter by bin
-        location_id: Filter by location
-        category_id: Filter by category
-        include_children: Include items in child bins and subcategories
-
-    Returns:
-        List of items with their locations
-    """
+def _list_items_query(
+    bin_id: str | None,
+    location_id: str | None,
+    category_id: str | None,
+    include_children: bool,
+) -> tuple[str, tuple]:
+    """Build the list_items statement and parameters for a set of filters."""
     params = []
     filter_clauses = []
 
     if bin_id:
         if include_children:
-            # Get all child bin IDs recursively
-            def get_child_bin_ids(parent_id: str) -> list[str]:
-                children = db.execute(
-                    "SELECT id FROM bins WHERE parent_bin_id = ?",
-                    (parent_id,),
-                )
-                child_ids = [row["id"] for row in children]
-                all_ids = list(child_ids)
-                for child_id in child_ids:
-                    all_ids.extend(get_child_bin_ids(child_id))
-                return all_ids
-
-            all_bin_ids = [bin_id] + get_child_bin_ids(bin_id)
-            placeholders = ",".join("?" * len(all_bin_ids))
-            filter_clauses.append(f"i.bin_id IN ({placeholders})")
-            params.extend(all_bin_ids)
+            # Resolve the bin subtree in SQL so the statement shape stays fixed
+            filter_clauses.append(
+                """i.bin_id IN (
+                    WITH RECURSIVE subtree(id) AS (
+                        SELECT ?
+                        UNION
+                        SELECT b2.id FROM bins b2 JOIN subtree s ON b2.parent_bin_id = s.id
+                    )
+                    SELECT id FROM subtree
+                )"""
+            )
+            params.append(bin_id)
         else:
             filter_clauses.append("i.bin_id = ?")
             params.append(bin_id)
@@ -335,22 +416,18 @@ def list_items(
 
     if category_id:
         if include_children:
-            # Get all child category IDs
-            def get_child_ids(cat_id: str) -> list[str]:
-                children = db.execute(
-                    "SELECT id FROM categories WHERE parent_id = ?",
-                    (cat_id,),
-                )
-                child_ids = [row["id"] for row in children]
-                all_ids = list(child_ids)
-                for child_id in child_ids:
-                    all_ids.extend(get_child_ids(child_id))
-                return all_ids
-
-            all_category_ids = [category_id] + get_child_ids(category_id)
-            placeholders = ",".join("?" * len(all_category_ids))
-            filter_clauses.append(f"i.category_id IN ({placeholders})")
-            params.extend(all_category_ids)
+            # Resolve the category subtree in SQL rather than one query per node
+            filter_clauses.append(
+                """i.category_id IN (
+                    WITH RECURSIVE subtree(id) AS (
+                        SELECT ?
+                        UNION
+                        SELECT c.id FROM categories c JOIN subtree s ON c.parent_id = s.id
+                    )
+                    SELECT id FROM subtree
+                )"""
+            )
+            params.append(category_id)
         else:
             filter_clauses.append("i.category_id = ?")
             params.append(category_id)
@@ -359,54 +436,87 @@ def list_items(
     if filter_clauses:
         filter_sql = "WHERE " + " AND ".join(filter_clauses)
 
-    sql = f"""
-        SELECT i.*, b.name as bin_name, b.description as bin_desc,
-               b.created_at as bin_created, b.updated_at as bin_updated,
-               l.id as loc_id, l.name as loc_name, l.description as loc_desc,
-               l.created_at as loc_created, l.updated_at as loc_updated
-        FROM items i
-        JOIN bins b ON i.bin_id = b.id
-        JOIN locations l ON b.location_id = l.id
-        {filter_sql}
-        ORDER BY l.name, b.name, i.name
+    return _LIST_ITEMS_SQL.format(filter_sql=filter_sql), tuple(params)
+
+
+def _row_to_item_with_location(row) -> ItemWithLocation:
+    """Build an ItemWithLocation from a _LIST_ITEMS_SQL row."""
+    return ItemWithLocation.model_construct(
+        id=row["id"],
+        name=row["name"],
+        description=row["description"],
+        category_id=row["category_id"],
+        bin_id=row["bin_id"],
+        quantity_type=QuantityType(row["quantity_type"]),
+        quantity_value=row["quantity_value"],
+        quantity_label=row["quantity_label"],
+        source=ItemSource(row["source"]),
+        source_reference=row["source_reference"],
+        photo_url=row["photo_url"],
+        notes=row["notes"],
+        created_at=_ts(row["created_at"]),
+        updated_at=_ts(row["updated_at"]),
+        bin=Bin.model_construct(
+            id=row["bin_id"],
+            name=row["bin_name"],
+            location_id=row["loc_id"],
+            description=row["bin_desc"],
+            created_at=_ts(row["bin_created"]),
+            updated_at=_ts(row["bin_updated"]),
+        ),
+        location=Location.model_construct(
+            id=row["loc_id"],
+            name=row["loc_name"],
+            description=row["loc_desc"],
+            created_at=_ts(row["loc_created"]),
+            updated_at=_ts(row["loc_updated"]),
+        ),
+    )
+
+
+def list_items(
+    db: Database,
+    bin_id: str | None = None,
+    location_id: str | None = None,
+    category_id: str | None = None,
+    include_children: bool = True,
+) -> list[ItemWithLocation]:
+    """List items with filters.
+
+    Args:
+        db: Database connection
+        bin_id: Filter by bin
+        location_id: Filter by location
+        category_id: Filter by category
+        include_children: Include items in child bins and subcategories
+
+    Returns:
+        List of items with their locations
     """
+    sql, params = _list_items_query(bin_id, location_id, category_id, include_children)
+    return [_row_to_item_with_location(row) for row in db.execute(sql, params)]
 
-    rows = db.execute(sql, tuple(params))
 
-    return [
-        ItemWithLocation(
-            id=row["id"],
-            name=row["name"],
-            description=row["description"],
-            category_id=row["category_id"],
-            bin_id=row["bin_id"],
-            quantity_type=row["quantity_type"],
-            quantity_value=row["quantity_value"],
-            quantity_label=row["quantity_label"],
-            source=row["source"],
-            source_reference=row["source_reference"],
-            photo_url=row["photo_url"],
-            notes=row["notes"],
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
-            bin=Bin(
-                id=row["bin_id"],
-                name=row["bin_name"],
-                location_id=row["loc_id"],
-                description=row["bin_desc"],
-                created_at=row["bin_created"],
-                updated_at=row["bin_updated"],
-            ),
-            location=Location(
-                id=row["loc_id"],
-                name=row["loc_name"],
-                description=row["loc_desc"],
-                created_at=row["loc_created"],
-                updated_at=row["loc_updated"],
-            ),
-        )
-        for row in rows
-    ]
+def list_items_iter(
+    db: Database,
+    bin_id: str | None = None,
+    location_id: str | None = None,
+    category_id: str | None = None,
+    include_children: bool = True,
+) -> Iterator[ItemWithLocation]:
+    """Stream items with filters straight from the database cursor.
+
+    Same filters as list_items, but models are built one row at a time so
+    callers that consume lazily never hold the full result set in memory.
+    Each call opens its own connection, so callers that want a list should
+    use list_items instead.
+
+    Yields:
+        Items with their locations, ordered by location, bin and name
+    """
+    sql, params = _list_items_query(bin_id, location_id, category_id, include_children)
+    for row in db.iterate(sql, params):
+        yield _row_to_item_with_location(row)
 
 
 def get_item_history(db: Database, item_id: str) -> list[ActivityLog] | dict:
@@ -419,25 +529,40 @@ def get_item_history(db: Database, item_id: str) -> list[ActivityLog] | dict:
     Returns:
         List of ActivityLog entries or error dict
     """
-    # Verify item exists (or existed - check activity log too)
-    item = db.execute_one("SELECT id FROM items WHERE id = ?", (item_id,))
-    has_history = db.execute_one(
-        "SELECT id FROM activity_log WHERE item_id = ? LIMIT 1",
-        (item_id,),
-    )
+    history = list_item_history(db, item_id)
+
+    # Any history means the item exists (or existed); only check items otherwise
+    if not history:
+        item = db.execute_one("SELECT 1 FROM items WHERE id = ?", (item_id,))
+        if not item:
+            return {
+                "error": "Item not found and has no history",
+                "error_code": "NOT_FOUND",
+                "details": {"item_id": item_id},
+            }
+
+    return history
+
 
-    if not item and not has_history:
-        return {
-            "error": "Item not found and has no history",
-            "error_code": "NOT_FOUND",
-            "details": {"item_id": item_id},
-        }
+def list_item_history(db: Database, item_id: str) -> list[ActivityLog]:
+    """List activity history for an item, newest first.
 
+    Unlike get_item_history, this does not check that the item exists, so
+    callers that already loaded the item avoid the extra lookup and the
+    error-dict branch.
+
+    Args:
+        db: Database connection
+        item_id: Item UUID
+
+    Returns:
+        List of ActivityLog entries (empty if none)
+    """
+    # Ordered by idx_activity_log_item_time, so no separate sort step
     rows = db.execute(
         "SELECT * FROM activity_log WHERE item_id = ? ORDER BY created_at DESC",
         (item_id,),
     )
-
     return [
         ActivityLog(
             id=row["id"],
@@ -1,12 +1,19 @@
 """Session workflow tools for protea."""
 
-import json
+import contextlib
+import sqlite3
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
+import orjson
+
 from protea.config import settings
 from protea.db.connection import Database
 from protea.db.models import (
     ActiveSessionInfo,
+    ActivityAction,
+    ActivityLog,
     BinImage,
     Item,
     ItemSource,
@@ -18,24 +25,120 @@ from protea.db.models import (
     SessionImage,
     SessionStatus,
 )
+from protea.services import embedding_service, vector_index
 from protea.services.image_store import ImageStore
 
+_PENDING = SessionStatus.PENDING.value
+# Upper bound on concurrent image copies during commit
+_COPY_WORKERS = 8
+
+# Shared statements. Identical SQL text lets sqlite3 reuse its prepared
+# statement instead of parsing a new one on every call.
+_SESSION_SQL = "SELECT * FROM sessions WHERE id = ?"
+_TOUCH_SESSION_SQL = "UPDATE sessions SET updated_at = ? WHERE id = ?"
+# Column order matches the positional unpacking in the row factories below
+_SESSION_IMAGES_SQL = """
+    SELECT id, session_id, file_path, thumbnail_path, original_filename,
+           width, height, file_size_bytes, extracted_data, created_at
+    FROM session_images WHERE session_id = ? ORDER BY created_at
+"""
+_PENDING_ITEM_COLUMNS = """
+    id, session_id, source_image_id, name, quantity_type, quantity_value,
+    quantity_label, category_id, confidence, source, created_at, updated_at
+"""
+_PENDING_ITEMS_SQL = f"""
+    SELECT {_PENDING_ITEM_COLUMNS}
+    FROM pending_items WHERE session_id = ? ORDER BY created_at
+"""
+# NULL arguments keep the current value
+_UPDATE_PENDING_ITEM_SQL = f"""
+    UPDATE pending_items
+    SET name = COALESCE(?, name),
+        quantity_type = COALESCE(?, quantity_type),
+        quantity_value = COALESCE(?, quantity_value),
+        quantity_label = COALESCE(?, quantity_label),
+        category_id = COALESCE(?, category_id),
+        updated_at = ?
+    WHERE id = ? AND session_id = ?
+    RETURNING {_PENDING_ITEM_COLUMNS}
+"""
+_HISTORY_SQL_TEMPLATE = """
+    SELECT * FROM sessions
+    WHERE {bin_filter}{status_filter}
+    ORDER BY updated_at DESC
+    LIMIT ?
+"""
+# get_session_history only has four filter shapes, so build them all up front
+_HISTORY_SQL = {
+    (by_bin, by_status): _HISTORY_SQL_TEMPLATE.format(
+        bin_filter="target_bin_id = ? AND " if by_bin else "",
+        status_filter="status = ?" if by_status else "status IN (?, ?)",
+    )
+    for by_bin in (False, True)
+    for by_status in (False, True)
+}
+
 
 def _calculate_staleness(session: Session) -> tuple[bool, int | None]:
     """Calculate if session is stale and duration."""
     if session.status != SessionStatus.PENDING:
         return False, None
 
-    now = datetime.now(timezone.utc)
-    updated = session.updated_at
-    if isinstance(updated, str):
-        updated = datetime.fromisoformat(updated)
-
-    delta_minutes = int((now - updated).total_seconds() / 60)
+    # Session timestamps are parsed to datetime when the model is built
+    delta_minutes = int((datetime.now(timezone.utc) - session.updated_at).total_seconds() / 60)
     is_stale = delta_minutes >= settings.session_stale_minutes
     return is_stale, delta_minutes if is_stale else None
 
 
+def _row_to_session(row: sqlite3.Row) -> Session:
+    """Build a Session from a sessions table row."""
+    return Session(
+        id=row["id"],
+        status=SessionStatus(row["status"]),
+        target_bin_id=row["target_bin_id"],
+        target_location_id=row["target_location_id"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+        committed_at=row["committed_at"],
+        cancelled_at=row["cancelled_at"],
+        commit_summary=orjson.loads(row["commit_summary"]) if row["commit_summary"] else None,
+    )
+
+
+def _check_targets(db: Database, bin_id: str | None, location_id: str | None) -> sqlite3.Row:
+    """Look up bin/location existence and pending sessions in one query.
+
+    Also reports whether any pending session exists at all, so callers can
+    skip the stale-session scan in the common case where there are none.
+    """
+    return db.execute_one(
+        """
+        SELECT
+            EXISTS(SELECT 1 FROM bins WHERE id = ?) as bin_ok,
+            (SELECT id FROM sessions WHERE target_bin_id = ? AND status = ?) as existing_session_id,
+            EXISTS(SELECT 1 FROM locations WHERE id = ?) as location_ok,
+            EXISTS(SELECT 1 FROM sessions WHERE status = ?) as has_pending
+        """,
+        (bin_id, bin_id, _PENDING, location_id, _PENDING),
+    )
+
+
+def _get_stale_sessions(db: Database) -> list[sqlite3.Row]:
+    """Find stale pending sessions, computing idle minutes in SQL."""
+    return db.execute(
+        """
+        SELECT s.id, s.created_at,
+            CAST((julianday('now') - julianday(s.updated_at)) * 1440 AS INTEGER) as stale_minutes,
+            (SELECT COUNT(*) FROM pending_items WHERE session_id = s.id) as pending_items
+        FROM sessions s
+        WHERE s.status = ?
+          AND (julianday('now') - julianday(s.updated_at)) * 1440 >= ?
+        ORDER BY s.created_at
+        """,
+        (_PENDING, settings.session_stale_minutes),
+    )
+
+
 def get_active_sessions(db: Database) -> list[ActiveSessionInfo]:
     """Get all pending sessions with staleness indicator.
 
@@ -43,41 +146,28 @@ def get_active_sessions(db: Database) -> list[ActiveSessionInfo]:
         List of active session summaries
     """
     rows = db.execute(
-        "SELECT * FROM sessions WHERE status = ? ORDER BY created_at",
-        (SessionStatus.PENDING.value,),
+        """
+        SELECT s.*,
+            (SELECT COUNT(*) FROM pending_items WHERE session_id = s.id) as pending_count,
+            (SELECT COUNT(*) FROM session_images WHERE session_id = s.id) as image_count
+        FROM sessions s
+        WHERE s.status = ?
+        ORDER BY s.created_at
+        """,
+        (_PENDING,),
     )
 
     results = []
     for row in rows:
-        session = Session(
-            id=row["id"],
-            status=SessionStatus(row["status"]),
-            target_bin_id=row["target_bin_id"],
-            target_location_id=row["target_location_id"],
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
-            committed_at=row["committed_at"],
-            cancelled_at=row["cancelled_at"],
-            commit_summary=json.loads(row["commit_summary"]) if row["commit_summary"] else None,
-        )
-
-        # Get counts
-        pending_count = db.execute_one(
-            "SELECT COUNT(*) as cnt FROM pending_items WHERE session_id = ?",
-            (session.id,),
-        )
-        image_count = db.execute_one(
-            "SELECT COUNT(*) as cnt FROM session_images WHERE session_id = ?",
-            (session.id,),
-        )
+        session = _row_to_session(row)
 
         is_stale, stale_duration = _calculate_staleness(session)
 
         results.append(
             ActiveSessionInfo(
                 session=session,
-                pending_item_count=pending_count["cnt"] if pending_count else 0,
-                image_count=image_count["cnt"] if image_count else 0,
+                pending_item_count=row["pending_count"],
+                image_count=row["image_count"],
                 is_stale=is_stale,
                 stale_duration_minutes=stale_duration,
             )
@@ -101,9 +191,10 @@ def create_session(
     Returns:
         Created Session or error dict
     """
-    # Check for stale sessions
-    active = get_active_sessions(db)
-    stale_sessions = [s for s in active if s.is_stale]
+    targets = _check_targets(db, bin_id, location_id)
+
+    # Check for stale sessions, only when something is pending
+    stale_sessions = _get_stale_sessions(db) if targets["has_pending"] else []
 
     if stale_sessions:
         return {
@@ -111,52 +202,45 @@ def create_session(
             "error_code": "SESSION_BLOCKED",
             "stale_sessions": [
                 {
-                    "id": s.session.id,
-                    "created_at": s.session.created_at.isoformat()
-                    if isinstance(s.session.created_at, datetime)
-                    else s.session.created_at,
-                    "stale_minutes": s.stale_duration_minutes,
-                    "pending_items": s.pending_item_count,
+                    "id": row["id"],
+                    "created_at": row["created_at"],
+                    "stale_minutes": row["stale_minutes"],
+                    "pending_items": row["pending_items"],
                 }
-                for s in stale_sessions
+                for row in stale_sessions
             ],
         }
 
-    # Verify bin exists if provided
-    if bin_id:
-        bin_row = db.execute_one("SELECT id FROM bins WHERE id = ?", (bin_id,))
-        if not bin_row:
-            return {
-                "error": "Bin not found",
-                "error_code": "NOT_FOUND",
-                "details": {"bin_id": bin_id},
-            }
+    # Verify bin/location exist and the bin is free
+    if bin_id and not targets["bin_ok"]:
+        return {
+            "error": "Bin not found",
+            "error_code": "NOT_FOUND",
+            "details": {"bin_id": bin_id},
+        }
 
-        # Warn if another pending session targets this bin
-        existing = db.execute_one(
-            "SELECT id FROM sessions WHERE target_bin_id = ? AND status = ?",
-            (bin_id, SessionStatus.PENDING.value),
-        )
-        if existing:
-            return {
-                "error": "Another pending session targets this bin",
-                "error_code": "SESSION_BLOCKED",
-                "details": {"existing_session_id": existing["id"]},
-            }
+    # Warn if another pending session targets this bin
+    if targets["existing_session_id"]:
+        return {
+            "error": "Another pending session targets this bin",
+            "error_code": "SESSION_BLOCKED",
+            "details": {"existing_session_id": targets["existing_session_id"]},
+        }
 
-    # Verify location exists if provided
-    if location_id:
-        loc_row = db.execute_one("SELECT id FROM locations WHERE id = ?", (location_id,))
-        if not loc_row:
-            return {
-                "error": "Location not found",
-                "error_code": "NOT_FOUND",
-                "details": {"location_id": location_id},
-            }
+    if location_id and not targets["location_ok"]:
+        return {
+            "error": "Location not found",
+            "error_code": "NOT_FOUND",
+            "details": {"location_id": location_id},
+        }
 
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
     session = Session(
         target_bin_id=bin_id,
         target_location_id=location_id,
+        created_at=now,
+        updated_at=now,
     )
 
     with db.connection() as conn:
@@ -170,87 +254,88 @@ def create_session(
                 session.status.value,
                 session.target_bin_id,
                 session.target_location_id,
-                session.created_at.isoformat(),
-                session.updated_at.isoformat(),
+                now_iso,
+                now_iso,
             ),
         )
 
     return session
 
 
-def get_session(db: Database, session_id: str) -> SessionDetail | dict:
-    """Get session with all images and pending items.
-
-    Args:
-        db: Database connection
-        session_id: Session UUID
+def _session_image_factory(cursor: sqlite3.Cursor, row: tuple) -> SessionImage:
+    """Row factory building a SessionImage from _SESSION_IMAGES_SQL columns."""
+    (
+        image_id,
+        session_id,
+        file_path,
+        thumbnail_path,
+        original_filename,
+        width,
+        height,
+        file_size_bytes,
+        extracted_data,
+        created_at,
+    ) = row
+    return SessionImage.model_construct(
+        id=image_id,
+        session_id=session_id,
+        file_path=file_path,
+        thumbnail_path=thumbnail_path,
+        original_filename=original_filename,
+        width=width,
+        height=height,
+        file_size_bytes=file_size_bytes,
+        extracted_data=orjson.loads(extracted_data) if extracted_data else None,
+        created_at=datetime.fromisoformat(created_at),
+    )
 
-    Returns:
-        SessionDetail or error dict
-    """
-    row = db.execute_one("SELECT * FROM sessions WHERE id = ?", (session_id,))
-    if not row:
-        return {
-            "error": "Session not found",
-            "error_code": "NOT_FOUND",
-            "details": {"session_id": session_id},
-        }
 
-    session = Session(
-        id=row["id"],
-        status=SessionStatus(row["status"]),
-        target_bin_id=row["target_bin_id"],
-        target_location_id=row["target_location_id"],
-        created_at=row["created_at"],
-        updated_at=row["updated_at"],
-        committed_at=row["committed_at"],
-        cancelled_at=row["cancelled_at"],
-        commit_summary=json.loads(row["commit_summary"]) if row["commit_summary"] else None,
+def _pending_item_factory(cursor: sqlite3.Cursor, row: tuple) -> PendingItem:
+    """Row factory building a PendingItem from _PENDING_ITEMS_SQL columns."""
+    (
+        pending_id,
+        session_id,
+        source_image_id,
+        name,
+        quantity_type,
+        quantity_value,
+        quantity_label,
+        category_id,
+        confidence,
+        source,
+        created_at,
+        updated_at,
+    ) = row
+    return PendingItem.model_construct(
+        id=pending_id,
+        session_id=session_id,
+        source_image_id=source_image_id,
+        name=name,
+        quantity_type=QuantityType(quantity_type),
+        quantity_value=quantity_value,
+        quantity_label=quantity_label,
+        category_id=category_id,
+        confidence=confidence,
+        source=PendingItemSource(source),
+        created_at=datetime.fromisoformat(created_at),
+        updated_at=datetime.fromisoformat(updated_at),
     )
 
-    # Get images
-    image_rows = db.execute(
-        "SELECT * FROM session_images WHERE session_id = ? ORDER BY created_at",
-        (session_id,),
-    )
-    images = [
-        SessionImage(
-            id=r["id"],
-            session_id=r["session_id"],
-            file_path=r["file_path"],
-            thumbnail_path=r["thumbnail_path"],
-            original_filename=r["original_filename"],
-            width=r["width"],
-            height=r["height"],
-            file_size_bytes=r["file_size_bytes"],
-            extracted_data=json.loads(r["extracted_data"]) if r["extracted_data"] else None,
-            created_at=r["created_at"],
-        )
-        for r in image_rows
-    ]
 
-    # Get pending items
-    pending_rows = db.execute(
-        "SELECT * FROM pending_items WHERE session_id = ? ORDER BY created_at",
-        (session_id,),
-    )
-    pending_items = [
-        PendingItem(
-            id=r["id"],
-            session_id=r["session_id"],
-            source_image_id=r["source_image_id"],
-            name=r["name"],
-            quantity_type=QuantityType(r["quantity_type"]),
-            quantity_value=r["quantity_value"],
-            quantity_label=r["quantity_label"],
-            category_id=r["category_id"],
-            confidence=r["confidence"],
-            source=PendingItemSource(r["source"]),
-            created_at=r["created_at"],
-            updated_at=r["updated_at"],
-        )
-        for r in pending_rows
-    ]
+def _load_session_detail(conn: sqlite3.Connection, session_id: str) -> SessionDetail | None:
+    """Read a session with its images and pending items on an open connection."""
+    row = conn.execute(_SESSION_SQL, (session_id,)).fetchone()
+    if not row:
+        return None
+
+    session = _row_to_session(row)
+
+    # Rows are built straight into models by the cursor's row factory
+    cursor = conn.cursor()
+    cursor.row_factory = _session_image_factory
+    images = cursor.execute(_SESSION_IMAGES_SQL, (session_id,)).fetchall()
+    cursor.row_factory = _pending_item_factory
+    pending_items = cursor.execute(_PENDING_ITEMS_SQL, (session_id,)).fetchall()
 
     is_stale, stale_duration = _calculate_staleness(session)
 
@@ -271,6 +356,29 @@ def get_session(db: Database, session_id: str) -> SessionDetail | dict:
     )
 
 
+def get_session(db: Database, session_id: str) -> SessionDetail | dict:
+    """Get session with all images and pending items.
+
+    Args:
+        db: Database connection
+        session_id: Session UUID
+
+    Returns:
+        SessionDetail or error dict
+    """
+    with db.connection() as conn:
+        detail = _load_session_detail(conn, session_id)
+
+    if detail is None:
+        return {
+            "error": "Session not found",
+            "error_code": "NOT_FOUND",
+            "details": {"session_id": session_id},
+        }
+
+    return detail
+
+
 def add_image_to_session(
     db: Database,
     image_store: ImageStore,
@@ -290,11 +398,17 @@ def add_image_to_session(
     Returns:
         Dict with session_image
     """
+    # Reject oversized payloads before touching the database. The bound is the
+    # longest padded base64 string that decodes to at most max_image_size_bytes.
+    max_bytes = settings.max_image_size_bytes
+    if len(image_base64) > (max_bytes + 2) // 3 * 4:
+        return {
+            "error": f"Image too large. Maximum size is {max_bytes // (1024 * 1024)}MB",
+            "error_code": "IMAGE_TOO_LARGE",
+        }
+
     # Verify session exists and is pending
-    session = db.execute_one(
-        "SELECT * FROM sessions WHERE id = ?",
-        (session_id,),
-    )
+    session = db.execute_one(_SESSION_SQL, (session_id,))
     if not session:
         return {
             "error": "Session not found",
@@ -302,21 +416,13 @@ def add_image_to_session(
             "details": {"session_id": session_id},
         }
 
-    if session["status"] != SessionStatus.PENDING.value:
+    if session["status"] != _PENDING:
         return {
             "error": "Session is not pending",
             "error_code": "INVALID_INPUT",
             "details": {"status": session["status"]},
         }
 
-    # Check image size
-    image_bytes = len(image_base64) * 3 // 4
-    if image_bytes > settings.max_image_size_bytes:
-        return {
-            "error": f"Image too large. Maximum size is {settings.max_image_size_bytes // (1024*1024)}MB",
-            "error_code": "IMAGE_TOO_LARGE",
-        }
-
     # Save image
     session_image = SessionImage(
         session_id=session_id,
@@ -342,6 +448,7 @@ def add_image_to_session(
     session_image.width = metadata["width"]
     session_image.height = metadata["height"]
     session_image.file_size_bytes = metadata["file_size_bytes"]
+    now_iso = session_image.created_at.isoformat()
 
     with db.connection() as conn:
         conn.execute(
@@ -359,14 +466,14 @@ def add_image_to_session(
                 session_image.width,
                 session_image.height,
                 session_image.file_size_bytes,
-                session_image.created_at.isoformat(),
+                now_iso,
             ),
         )
 
         # Update session updated_at
         conn.execute(
-            "UPDATE sessions SET updated_at = ? WHERE id = ?",
-            (datetime.now(timezone.utc).isoformat(), session_id),
+            _TOUCH_SESSION_SQL,
+            (now_iso, session_id),
         )
 
     return {
@@ -404,17 +511,14 @@ def add_pending_item(
         Created PendingItem or error dict
     """
     # Verify session exists and is pending
-    session = db.execute_one(
-        "SELECT * FROM sessions WHERE id = ?",
-        (session_id,),
-    )
+    session = db.execute_one(_SESSION_SQL, (session_id,))
     if not session:
         return {
             "error": "Session not found",
             "error_code": "NOT_FOUND",
         }
 
-    if session["status"] != SessionStatus.PENDING.value:
+    if session["status"] != _PENDING:
         return {
             "error": "Session is not pending",
             "error_code": "INVALID_INPUT",
@@ -426,6 +530,8 @@ def add_pending_item(
     if qt == QuantityType.BOOLEAN:
         quantity_value = 1
 
+    now = datetime.now(timezone.utc)
+    now_iso = now.isoformat()
     pending = PendingItem(
         session_id=session_id,
         source_image_id=source_image_id,
@@ -436,6 +542,8 @@ def add_pending_item(
         category_id=category_id,
         confidence=confidence,
         source=src,
+        created_at=now,
+        updated_at=now,
     )
 
     with db.connection() as conn:
@@ -457,15 +565,15 @@ def add_pending_item(
                 pending.category_id,
                 pending.confidence,
                 pending.source.value,
-                pending.created_at.isoformat(),
-                pending.updated_at.isoformat(),
+                now_iso,
+                now_iso,
             ),
         )
 
         # Update session
         conn.execute(
-            "UPDATE sessions SET updated_at = ? WHERE id = ?",
-            (datetime.now(timezone.utc).isoformat(), session_id),
+            _TOUCH_SESSION_SQL,
+            (now_iso, session_id),
         )
 
     return pending
@@ -496,61 +604,47 @@ def update_pending_item(
     Returns:
         Updated PendingItem or error dict
     """
-    row = db.execute_one(
-        "SELECT * FROM pending_items WHERE id = ? AND session_id = ?",
-        (pending_id, session_id),
-    )
-    if not row:
-        return {
-            "error": "Pending item not found in this session",
-            "error_code": "NOT_FOUND",
-        }
+    if quantity_type is not None:
+        try:
+            quantity_type = QuantityType(quantity_type).value
+        except ValueError:
+            return {
+                "error": f"Invalid quantity_type: {quantity_type}",
+                "error_code": "INVALID_INPUT",
+                "details": {"valid_values": ["exact", "approximate", "boolean"]},
+            }
 
-    new_name = name if name is not None else row["name"]
-    new_quantity_type = quantity_type if quantity_type is not None else row["quantity_type"]
-    new_quantity_value = quantity_value if quantity_value is not None else row["quantity_value"]
-    new_quantity_label = quantity_label if quantity_label is not None else row["quantity_label"]
-    new_category_id = category_id if category_id is not None else row["category_id"]
     updated_at = datetime.now(timezone.utc)
+    updated_iso = updated_at.isoformat()
 
     with db.connection() as conn:
-        conn.execute(
-            """
-            UPDATE pending_items
-            SET name = ?, quantity_type = ?, quantity_value = ?, quantity_label = ?,
-                category_id = ?, updated_at = ?
-            WHERE id = ?
-            """,
+        cursor = conn.cursor()
+        cursor.row_factory = _pending_item_factory
+        pending = cursor.execute(
+            _UPDATE_PENDING_ITEM_SQL,
             (
-                new_name,
-                new_quantity_type,
-                new_quantity_value,
-                new_quantity_label,
-                new_category_id,
-                updated_at.isoformat(),
+                name,
+                quantity_type,
+                quantity_value,
+                quantity_label,
+                category_id,
+                updated_iso,
                 pending_id,
+                session_id,
             ),
-        )
+        ).fetchone()
+        if not pending:
+            return {
+                "error": "Pending item not found in this session",
+                "error_code": "NOT_FOUND",
+            }
 
         conn.execute(
-            "UPDATE sessions SET updated_at = ? WHERE id = ?",
-            (updated_at.isoformat(), session_id),
+            _TOUCH_SESSION_SQL,
+            (updated_iso, session_id),
         )
 
-    return PendingItem(
-        id=pending_id,
-        session_id=session_id,
-        source_image_id=row["source_image_id"],
-        name=new_name,
-        quantity_type=QuantityType(new_quantity_type),
-        quantity_value=new_quantity_value,
-        quantity_label=new_quantity_label,
-        category_id=new_category_id,
-        confidence=row["confidence"],
-        source=PendingItemSource(row["source"]),
-        created_at=row["created_at"],
-        updated_at=updated_at,
-    )
+    return pending
 
 
 def remove_pending_item(
@@ -581,7 +675,7 @@ def remove_pending_item(
     with db.connection() as conn:
         conn.execute("DELETE FROM pending_items WHERE id = ?", (pending_id,))
         conn.execute(
-            "UPDATE sessions SET updated_at = ? WHERE id = ?",
+            _TOUCH_SESSION_SQL,
             (datetime.now(timezone.utc).isoformat(), session_id),
         )
 
@@ -605,31 +699,29 @@ def set_session_target(
     Returns:
         Updated Session or error dict
     """
-    row = db.execute_one("SELECT * FROM sessions WHERE id = ?", (session_id,))
+    row = db.execute_one(_SESSION_SQL, (session_id,))
     if not row:
         return {
             "error": "Session not found",
             "error_code": "NOT_FOUND",
         }
 
-    if row["status"] != SessionStatus.PENDING.value:
+    if row["status"] != _PENDING:
         return {
             "error": "Session is not pending",
             "error_code": "INVALID_INPUT",
         }
 
     # Verify bin/location exist
-    if bin_id:
-        bin_row = db.execute_one("SELECT id FROM bins WHERE id = ?", (bin_id,))
-        if not bin_row:
+    if bin_id or location_id:
+        targets = _check_targets(db, bin_id, location_id)
+        if bin_id and not targets["bin_ok"]:
             return {
                 "error": "Bin not found",
                 "error_code": "NOT_FOUND",
             }
 
-    if location_id:
-        loc_row = db.execute_one("SELECT id FROM locations WHERE id = ?", (location_id,))
-        if not loc_row:
+        if location_id and not targets["location_ok"]:
             return {
                 "error": "Location not found",
                 "error_code": "NOT_FOUND",
@@ -638,25 +730,24 @@ def set_session_target(
     updated_at = datetime.now(timezone.utc)
 
     with db.connection() as conn:
-        conn.execute(
+        updated = conn.execute(
             """
             UPDATE sessions
             SET target_bin_id = ?, target_location_id = ?, updated_at = ?
             WHERE id = ?
+            RETURNING *
             """,
             (bin_id, location_id, updated_at.isoformat(), session_id),
-        )
+        ).fetchone()
+
+    return _row_to_session(updated)
 
-    return Session(
-        id=session_id,
-        status=SessionStatus(row["status"]),
-        target_bin_id=bin_id,
-        target_location_id=location_id,
-        created_at=row["created_at"],
-        updated_at=updated_at,
-        committed_at=row["committed_at"],
-        cancelled_at=row["cancelled_at"],
-    )
+
+def _discard_copies(image_store: ImageStore, images: list[BinImage]) -> None:
+    """Delete bin image files copied for a commit that did not go through."""
+    for image in images:
+        with contextlib.suppress(OSError):
+            image_store.delete_image(image.file_path)
 
 
 def commit_session(
@@ -676,9 +767,14 @@ def commit_session(
     Returns:
         Result dict with items_added, images_saved, bin_created
     """
-    session_detail = get_session(db, session_id)
-    if isinstance(session_detail, dict) and "error" in session_detail:
-        return session_detail
+    with db.connection() as conn:
+        session_detail = _load_session_detail(conn, session_id)
+    if session_detail is None:
+        return {
+            "error": "Session not found",
+            "error_code": "NOT_FOUND",
+            "details": {"session_id": session_id},
+        }
 
     if session_detail.status != SessionStatus.PENDING:
         return {
@@ -719,133 +815,229 @@ def commit_session(
                 "error_code": "NO_TARGET",
             }
 
-    # Create items from pending items
-    from protea.tools.items import add_item
-
-    items_added = []
-    for pending in session_detail.pending_items:
-        # Determine photo_url from source image
-        photo_url = None
-        if pending.source_image_id:
-            img = next(
-                (i for i in session_detail.images if i.id == pending.source_image_id),
-                None,
-            )
-            if img:
-                photo_url = img.file_path
-
-        result = add_item(
-            db=db,
-            name=pending.name,
-            bin_id=target_bin_id,
-            category_id=pending.category_id,
-            quantity_type=pending.quantity_type.value,
-            quantity_value=pending.quantity_value,
-            quantity_label=pending.quantity_label,
-            source=ItemSource.VISION.value
-            if pending.source == PendingItemSource.VISION
-            else ItemSource.MANUAL.value,
-            source_reference=session_id,
-        )
+    committed_at = datetime.now(timezone.utc)
+    now_iso = committed_at.isoformat()
 
-        if isinstance(result, Item):
-            # Update photo_url
-            if photo_url:
-                with db.connection() as conn:
-                    conn.execute(
-                        "UPDATE items SET photo_url = ? WHERE id = ?",
-                        (photo_url, result.id),
-                    )
-                result.photo_url = photo_url
-            items_added.append(result)
+    # Everything below runs on one connection. Reads and image copies happen
+    # before the first write, so the write transaction only covers the inserts
+    # and the status change and commits once.
+    with db.connection() as conn:
+        bin_row = conn.execute("SELECT id FROM bins WHERE id = ?", (target_bin_id,)).fetchone()
+        if not bin_row:
+            return {
+                "error": "Bin not found",
+                "error_code": "NOT_FOUND",
+                "details": {"bin_id": target_bin_id},
+            }
 
-    # Copy session images to bin
-    images_saved = []
-    for session_image in session_detail.images:
-        try:
-            metadata = image_store.copy_to_bin(
-                session_image.file_path,
-                target_bin_id,
-                session_image.id + "_bin",
-            )
+        # Pending items whose category has since been deleted are skipped
+        category_ids = list({p.category_id for p in session_detail.pending_items if p.category_id})
+        valid_category_ids = set()
+        if category_ids:
+            placeholders = ",".join("?" * len(category_ids))
+            valid_category_ids = {
+                r["id"]
+                for r in conn.execute(
+                    f"SELECT id FROM categories WHERE id IN ({placeholders})", tuple(category_ids)
+                )
+            }
+
+        # Build all item and activity rows up front so they insert as one batch
+        embeddings_enabled = embedding_service.is_available()
+        items_added = []
+        item_rows = []
+        activity_rows = []
+        for pending in session_detail.pending_items:
+            if pending.category_id and pending.category_id not in valid_category_ids:
+                continue
+
+            source_image = session_detail.images_by_id.get(pending.source_image_id)
 
-            bin_image = BinImage(
+            item = Item(
+                name=pending.name,
                 bin_id=target_bin_id,
-                file_path=metadata["file_path"],
-                thumbnail_path=metadata["thumbnail_path"],
-                source_session_id=session_id,
-                source_session_image_id=session_image.id,
-                width=metadata["width"],
-                height=metadata["height"],
-                file_size_bytes=metadata["file_size_bytes"],
+                category_id=pending.category_id,
+                quantity_type=pending.quantity_type,
+                quantity_value=1
+                if pending.quantity_type == QuantityType.BOOLEAN
+                else pending.quantity_value,
+                quantity_label=pending.quantity_label,
+                source=ItemSource.VISION
+                if pending.source == PendingItemSource.VISION
+                else ItemSource.MANUAL,
+                source_reference=session_id,
+                photo_url=source_image.file_path if source_image else None,
+                created_at=committed_at,
+                updated_at=committed_at,
+            )
+            embedding_blob = None
+            if embeddings_enabled:
+                embedding_blob = embedding_service.generate_embedding(
+                    embedding_service.build_item_text(item.name)
+                )
+            log = ActivityLog(
+                item_id=item.id,
+                action=ActivityAction.ADDED,
+                quantity_change=item.quantity_value,
+                created_at=committed_at,
             )
 
-            with db.connection() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO bin_images
-                    (id, bin_id, file_path, thumbnail_path, source_session_id, source_session_image_id,
-                     width, height, file_size_bytes, created_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        bin_image.id,
-                        bin_image.bin_id,
-                        bin_image.file_path,
-                        bin_image.thumbnail_path,
-                        bin_image.source_session_id,
-                        bin_image.source_session_image_id,
-                        bin_image.width,
-                        bin_image.height,
-                        bin_image.file_size_bytes,
-                        bin_image.created_at.isoformat(),
-                    ),
+            items_added.append(item)
+            item_rows.append(
+                (
+                    item.id,
+                    item.name,
+                    item.description,
+                    item.category_id,
+                    item.bin_id,
+                    item.quantity_type.value,
+                    item.quantity_value,
+                    item.quantity_label,
+                    item.source.value,
+                    item.source_reference,
+                    item.photo_url,
+                    item.notes,
+                    now_iso,
+                    now_iso,
+                    embedding_blob,
                 )
+            )
+            activity_rows.append(
+                (
+                    log.id,
+                    log.item_id,
+                    log.action.value,
+                    log.quantity_change,
+                    log.from_bin_id,
+                    log.to_bin_id,
+                    log.notes,
+                    now_iso,
+                )
+            )
 
-            images_saved.append(bin_image)
-        except Exception:
-            # Continue on image copy errors
-            pass
+        # Copy session images to bin in parallel; each copy is file I/O bound.
+        # Names are unique per attempt, so a commit that loses the claim below
+        # can delete its copies without touching the winner's.
+        attempt = uuid.uuid4().hex[:8]
+        images_saved = []
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(_COPY_WORKERS, len(session_detail.images)))
+        ) as executor:
+            copies = [
+                executor.submit(
+                    image_store.copy_to_bin,
+                    session_image.file_path,
+                    target_bin_id,
+                    f"{session_image.id}_bin_{attempt}",
+                )
+                for session_image in session_detail.images
+            ]
+
+        for session_image, copy in zip(session_detail.images, copies):
+            if copy.exception() is not None:
+                # Continue on image copy errors
+                continue
+            metadata = copy.result()
+
+            images_saved.append(
+                BinImage(
+                    bin_id=target_bin_id,
+                    file_path=metadata["file_path"],
+                    thumbnail_path=metadata["thumbnail_path"],
+                    source_session_id=session_id,
+                    source_session_image_id=session_image.id,
+                    width=metadata["width"],
+                    height=metadata["height"],
+                    file_size_bytes=metadata["file_size_bytes"],
+                    created_at=committed_at,
+                )
+            )
 
-    # Update session status
-    committed_at = datetime.now(timezone.utc)
-    commit_summary = {
-        "items_added": len(items_added),
-        "images_saved": len(images_saved),
-        "target_bin_id": target_bin_id,
-    }
+        commit_summary = {
+            "items_added": len(items_added),
+            "images_saved": len(images_saved),
+            "target_bin_id": target_bin_id,
+        }
 
-    with db.connection() as conn:
-        conn.execute(
+        # Claim the session first so a concurrent commit cannot add items twice
+        updated = conn.execute(
             """
             UPDATE sessions
-            SET status = ?, committed_at = ?, commit_summary = ?, updated_at = ?
-            WHERE id = ?
+            SET status = ?, target_bin_id = ?, committed_at = ?, commit_summary = ?, updated_at = ?
+            WHERE id = ? AND status = ?
+            RETURNING *
             """,
             (
                 SessionStatus.COMMITTED.value,
-                committed_at.isoformat(),
-                json.dumps(commit_summary),
-                committed_at.isoformat(),
+                target_bin_id,
+                now_iso,
+                orjson.dumps(commit_summary).decode(),
+                now_iso,
                 session_id,
+                _PENDING,
             ),
-        )
+        ).fetchone()
+        if not updated:
+            # Lost the claim to a concurrent commit; its copies are the ones kept
+            _discard_copies(image_store, images_saved)
+            return {
+                "error": "Session is not pending",
+                "error_code": "INVALID_INPUT",
+            }
+
+        try:
+            conn.executemany(
+                """
+                INSERT INTO items
+                (id, name, description, category_id, bin_id, quantity_type, quantity_value,
+                 quantity_label, source, source_reference, photo_url, notes, created_at, updated_at, embedding)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                item_rows,
+            )
+            conn.executemany(
+                """
+                INSERT INTO activity_log (id, item_id, action, quantity_change, from_bin_id, to_bin_id, notes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                activity_rows,
+            )
+            vector_index.sync(db, conn)
+
+            conn.executemany(
+                """
+                INSERT INTO bin_images
+                (id, bin_id, file_path, thumbnail_path, source_session_id, source_session_image_id,
+                 width, height, file_size_bytes, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                [
+                    (
+                        bin_image.id,
+                        bin_image.bin_id,
+                        bin_image.file_path,
+                        bin_image.thumbnail_path,
+                        bin_image.source_session_id,
+                        bin_image.source_session_image_id,
+                        bin_image.width,
+                        bin_image.height,
+                        bin_image.file_size_bytes,
+                        now_iso,
+                    )
+                    for bin_image in images_saved
+                ],
+            )
+        except BaseException:
+            # The transaction rolls back, so the copies would be orphaned
+            _discard_copies(image_store, images_saved)
+            raise
 
     return {
         "success": True,
         "items_added": items_added,
         "images_saved": images_saved,
         "bin_created": created_bin,
-        "session": Session(
-            id=session_id,
-            status=SessionStatus.COMMITTED,
-            target_bin_id=target_bin_id,
-            target_location_id=session_detail.target_location_id,
-            created_at=session_detail.created_at,
-            updated_at=committed_at,
-            committed_at=committed_at,
-            commit_summary=commit_summary,
-        ),
+        "session": _row_to_session(updated),
     }
 
 
@@ -868,14 +1060,14 @@ def cancel_session(
     Returns:
         Cancelled Session or error dict
     """
-    row = db.execute_one("SELECT * FROM sessions WHERE id = ?", (session_id,))
+    row = db.execute_one(_SESSION_SQL, (session_id,))
     if not row:
         return {
             "error": "Session not found",
             "error_code": "NOT_FOUND",
         }
 
-    if row["status"] != SessionStatus.PENDING.value:
+    if row["status"] != _PENDING:
         return {
             "error": "Session is not pending",
             "error_code": "INVALID_INPUT",
@@ -885,32 +1077,26 @@ def cancel_session(
     image_store.delete_session_images(session_id)
 
     cancelled_at = datetime.now(timezone.utc)
+    cancelled_iso = cancelled_at.isoformat()
 
     with db.connection() as conn:
-        conn.execute(
+        updated = conn.execute(
             """
             UPDATE sessions
             SET status = ?, cancelled_at = ?, updated_at = ?, commit_summary = ?
             WHERE id = ?
+            RETURNING *
             """,
             (
                 SessionStatus.CANCELLED.value,
-                cancelled_at.isoformat(),
-                cancelled_at.isoformat(),
-                json.dumps({"reason": reason}) if reason else None,
+                cancelled_iso,
+                cancelled_iso,
+                orjson.dumps({"reason": reason}).decode() if reason else None,
                 session_id,
             ),
-        )
+        ).fetchone()
 
-    return Session(
-        id=session_id,
-        status=SessionStatus.CANCELLED,
-        target_bin_id=row["target_bin_id"],
-        target_location_id=row["target_location_id"],
-        created_at=row["created_at"],
-        updated_at=cancelled_at,
-        cancelled_at=cancelled_at,
-    )
+    return _row_to_session(updated)
 
 
 def get_session_history(
@@ -930,43 +1116,12 @@ def get_session_history(
     Returns:
         List of sessions
     """
-    params = []
-    filter_clauses = []
-
-    if bin_id:
-        filter_clauses.append("target_bin_id = ?")
-        params.append(bin_id)
-
+    params = [bin_id] if bin_id else []
     if status:
-        filter_clauses.append("status = ?")
         params.append(status)
     else:
-        filter_clauses.append("status IN (?, ?)")
         params.extend([SessionStatus.COMMITTED.value, SessionStatus.CANCELLED.value])
 
-    filter_sql = "WHERE " + " AND ".join(filter_clauses)
+    rows = db.execute(_HISTORY_SQL[bool(bin_id), bool(status)], (*params, limit))
 
-    rows = db.execute(
-        f"""
-        SELECT * FROM sessions
-        {filter_sql}
-        ORDER BY updated_at DESC
-        LIMIT ?
-        """,
-        (*params, limit),
-    )
-
-    return [
-        Session(
-            id=row["id"],
-            status=SessionStatus(row["status"]),
-            target_bin_id=row["target_bin_id"],
-            target_location_id=row["target_location_id"],
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
-            committed_at=row["committed_at"],
-            cancelled_at=row["cancelled_at"],
-            commit_summary=json.loads(row["commit_summary"]) if row["commit_summary"] else None,
-        )
-        for row in rows
-    ]
+    return [_row_to_session(row) for row in rows]
@@ -1,18 +1,23 @@
 """FastAPI application factory for Inventory Web UI."""
 
 import logging
+import secrets
 from contextlib import asynccontextmanager
+from datetime import date
 from pathlib import Path
 
 from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse, HTMLResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 
 from protea import __version__
 from protea.config import settings
 from protea.db.connection import Database
 from protea.services.image_store import ImageStore
 from protea.tools import admin
+from protea.web.responses import OrjsonResponse
 from protea.web.security import CSRFMiddleware, get_csrf_token
 
 logger = logging.getLogger("protea.web")
@@ -25,6 +30,48 @@ STATIC_DIR = WEB_DIR / "static"
 # Global templates instance
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 templates.env.globals["app_version"] = __version__
+# Skip per-render template stat checks and reuse compiled bytecode across restarts
+templates.env.auto_reload = settings.web_debug
+templates.env.cache_size = 400
+templates.env.bytecode_cache = FileSystemBytecodeCache()
+
+
+def render_template(
+    request: Request, name: str, context: dict, status_code: int = 200
+) -> HTMLResponse:
+    """Render a template straight into an HTMLResponse.
+
+    Lighter than templates.TemplateResponse: the compiled template comes
+    from the environment cache (no stat outside debug mode) and the render
+    skips the context-processor and debug-extension plumbing.
+
+    Args:
+        request: Current request, exposed to the template as ``request``
+        name: Template name relative to the templates directory
+        context: Template variables
+        status_code: HTTP status code
+
+    Returns:
+        HTMLResponse with the rendered page
+    """
+    template = templates.get_template(name)
+    return HTMLResponse(template.render({"request": request, **context}), status_code=status_code)
+
+
+def iso_date_label(value: str) -> str:
+    """Format the date part of an ISO timestamp as e.g. 'Monday, January 05, 2026'."""
+    return date.fromisoformat(value[:10]).strftime("%A, %B %d, %Y")
+
+
+def iso_clock_time(value: str) -> str:
+    """Format the time part of an ISO timestamp as a 12-hour clock, e.g. '02:05 PM'."""
+    hour = int(value[11:13])
+    return f"{hour % 12 or 12:02d}:{value[14:16]} {'PM' if hour >= 12 else 'AM'}"
+
+
+# Format raw ISO timestamps without building datetime objects per row
+templates.env.filters["iso_date_label"] = iso_date_label
+templates.env.filters["iso_clock_time"] = iso_clock_time
 
 
 def csrf_token_input(request: Request) -> str:
@@ -37,6 +84,27 @@ def csrf_token_input(request: Request) -> str:
 templates.env.globals["csrf_token_input"] = csrf_token_input
 
 
+class AccelRedirectStaticFiles(StaticFiles):
+    """StaticFiles that can hand file delivery off to a fronting nginx.
+
+    When ``accel_prefix`` is set, resolved files are answered with an empty
+    response carrying ``X-Accel-Redirect`` so nginx serves the bytes with
+    sendfile instead of streaming them through the event loop. Path
+    validation, 404s and conditional 304s are still handled here.
+    """
+
+    def __init__(self, *, accel_prefix: str | None = None, **kwargs):
+        super().__init__(**kwargs)
+        self.accel_prefix = accel_prefix
+
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if self.accel_prefix and isinstance(response, FileResponse):
+            target = self.accel_prefix.rstrip("/") + "/" + path
+            return Response(headers={"X-Accel-Redirect": target})
+        return response
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan - initialize shared resources."""
@@ -68,8 +136,13 @@ def create_app() -> FastAPI:
         description="Web interface for inventory management",
         version="1.0.0",
         lifespan=lifespan,
+        default_response_class=OrjsonResponse,
     )
 
+    # Page ETags include this so a restart (e.g. a deploy with new templates)
+    # never revalidates HTML rendered by a previous process
+    app.state.boot_id = secrets.token_hex(4)
+
     # Add CSRF protection middleware
     # Exempt paths: image uploads, partials (htmx fragments)
     app.add_middleware(
@@ -78,7 +151,15 @@ def create_app() -> FastAPI:
     )
 
     # Mount static files
-    app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+    app.mount(
+        "/static",
+        AccelRedirectStaticFiles(
+            directory=str(STATIC_DIR),
+            check_dir=False,
+            accel_prefix=settings.web_static_accel_prefix,
+        ),
+        name="static",
+    )
 
     # Register routes
     from protea.web.routes import auth, images, pages, partials, settings as settings_routes
@@ -0,0 +1,83 @@
+"""Short-lived in-process cache for read-heavy web pages."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any
+
+from protea.config import settings
+from protea.db.connection import Database
+
+
+class PageCache:
+    """Thread-safe TTL cache for computed page data.
+
+    Entries expire after ``ttl`` seconds and the least recently stored entry
+    is evicted once ``maxsize`` is reached. A ``ttl`` of 0 disables caching.
+    Entries are never invalidated explicitly: keys from data_key change with
+    every database write, and stale entries age out.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 128):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss.
+
+        Args:
+            key: Cache key (build it with data_key so writes invalidate it)
+            compute: Zero-argument callable producing the value
+
+        Returns:
+            The cached or freshly computed value
+        """
+        now = time.monotonic()
+        if self.ttl > 0:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    return entry[1]
+
+        value = compute()
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+def data_generation(db: Database) -> int:
+    """Return the database's change counter.
+
+    Triggers (migration 010) bump it on every write to the tables cached
+    pages read, whichever process makes the write.
+    """
+    return db.execute_one("SELECT value FROM data_generation WHERE id = 1")["value"]
+
+
+def data_key(db: Database, *parts: Hashable) -> tuple:
+    """Build a cache key that changes whenever the database is written.
+
+    The counter is read before the value is computed, so data computed
+    concurrently with a write is never stored under the post-write key.
+    """
+    return (str(db.db_path), data_generation(db), *parts)
+
+
+# Shared cache for browse/history page data; keyed with data_key
+page_cache = PageCache(ttl=settings.web_page_cache_seconds)
+
+# Search results keyed on the query, so typeahead keystrokes that revisit a
+# query (delete then retype) skip the search; also keyed with data_key
+search_cache = PageCache(ttl=min(5, settings.web_page_cache_seconds), maxsize=256)
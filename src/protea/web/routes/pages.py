@@ -1,69 +1,104 @@
-"""Page routes for web UI."""
+"""Page routes for web UI.
 
-import base64
+Handlers are plain ``def`` functions so FastAPI runs their blocking SQLite
+queries, image processing and template rendering in its threadpool rather
+than on the event loop.
+"""
+
+import hashlib
 import io
-import re
+import os
+import time
 import zipfile
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import groupby
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, Form, Request, UploadFile
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
 
 from protea.config import settings
 from protea.db.connection import Database
-from protea.db.models import User
-from protea.services.image_store import ImageStore
+from protea.db.models import Location, User
+from protea.services.image_store import ImageStore, InvalidImageError
 from protea.tools import bins as bins_tools
 from protea.tools import items as items_tools
 from protea.tools import locations as locations_tools
 from protea.tools import search as search_tools
-from protea.services.image_store import InvalidImageError
-from protea.web.app import templates
+from protea.web.app import render_template
+from protea.web.cache import data_key, page_cache, search_cache
 from protea.web.dependencies import get_db, get_image_store, require_auth, validate_uuid
+from protea.web.responses import OrjsonResponse
+from protea.web.security import get_csrf_token
 
 router = APIRouter()
 
+# Streamed zip downloads read images this many entries ahead of the writer
+_ZIP_READ_WORKERS = 4
+_ZIP_PREFETCH = 8
+# Larger files are not prefetched; the writer streams them in chunks, which
+# bounds prefetch memory to about (_ZIP_PREFETCH + workers) * this size
+_ZIP_PREFETCH_MAX_BYTES = 1024 * 1024
+_ZIP_CHUNK_BYTES = 64 * 1024
 
-@router.get("/", response_class=HTMLResponse)
-async def search_page(
-    request: Request,
-    q: str = "",
-    db: Database = Depends(get_db),
-    user: User = Depends(require_auth),
-):
-    """Render search page with optional results."""
-    results = []
-    if q.strip():
-        results = search_tools.search_items(db, q.strip())
 
-    return templates.TemplateResponse(
-        request=request,
-        name="search.html",
-        context={
-            "query": q,
-            "results": results,
-            "active_nav": "search",
-            "user": user,
-        },
+def _page_etag(request: Request, user: User, key: tuple) -> str:
+    """Build a weak ETag for a page rendered from data cached under key.
+
+    Keys from data_key carry the database change counter, so the tag changes
+    with the data whichever process wrote it. The app's boot id covers
+    template and asset changes across restarts, and the viewer and CSRF token
+    are part of the rendered HTML, so all three are folded into the tag too.
+    """
+    boot_id = request.app.state.boot_id
+    digest = hashlib.sha256(
+        f"{boot_id}:{key}:{user.id}:{get_csrf_token(request)}".encode()
+    ).hexdigest()
+    return f'W/"{key[1]}-{digest[:16]}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header already has etag."""
+    header = request.headers.get("if-none-match")
+    return header is not None and etag in (tag.strip() for tag in header.split(","))
+
+
+def _with_etag(response: Response, etag: str) -> Response:
+    """Attach an ETag and require revalidation before the page is reused."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _cached_locations(db: Database) -> list[Location]:
+    """Return all locations, reusing the list until the database changes."""
+    return page_cache.get_or_compute(
+        data_key(db, "locations"), lambda: locations_tools.get_locations(db)
     )
 
 
+@router.get("/", response_class=HTMLResponse)
 @router.get("/search", response_class=HTMLResponse)
-async def search_results_page(
+def search_page(
     request: Request,
     q: str = "",
     db: Database = Depends(get_db),
     user: User = Depends(require_auth),
 ):
-    """Search results page (full page reload version)."""
+    """Render search page with optional results (served at "/" and "/search")."""
+    query = q.strip()
     results = []
-    if q.strip():
-        results = search_tools.search_items(db, q.strip())
+    if query:
+        results = search_cache.get_or_compute(
+            data_key(db, query), lambda: search_tools.search_items(db, query)
+        )
 
-    return templates.TemplateResponse(
-        request=request,
-        name="search.html",
-        context={
+    return render_template(
+        request,
+        "search.html",
+        {
             "query": q,
             "results": results,
             "active_nav": "search",
@@ -73,7 +108,7 @@ async def search_results_page(
 
 
 @router.get("/item/{item_id}", response_class=HTMLResponse)
-async def item_detail_page(
+def item_detail_page(
     request: Request,
     item_id: str,
     db: Database = Depends(get_db),
@@ -87,10 +122,10 @@ async def item_detail_page(
 
     # Check if error
     if isinstance(result, dict) and "error" in result:
-        return templates.TemplateResponse(
-            request=request,
-            name="item.html",
-            context={
+        return render_template(
+            request,
+            "item.html",
+            {
                 "error": result["error"],
                 "item": None,
                 "active_nav": "search",
@@ -99,30 +134,19 @@ async def item_detail_page(
             status_code=404,
         )
 
-    # Get item history
-    history = search_tools.get_item_history(db, item_id)
-    if isinstance(history, dict):
-        history = []
+    # Get item history (the item is known to exist, so no error branch)
+    history = search_tools.list_item_history(db, item_id)
 
-    # Get all bins for move dropdown (grouped by location)
-    all_bins = []
-    locations = locations_tools.get_locations(db)
-    for loc in locations:
-        loc_bins = bins_tools.get_bins(db, location_id=loc.id)
-        for b in loc_bins:
-            all_bins.append(
-                {
-                    "id": b.id,
-                    "name": b.name,
-                    "location_name": loc.name,
-                    "is_current": b.id == result.bin_id,
-                }
-            )
-
-    return templates.TemplateResponse(
-        request=request,
-        name="item.html",
-        context={
+    # Get all bins for move dropdown (grouped by location) from one cached query
+    bin_choices = page_cache.get_or_compute(
+        data_key(db, "bin_choices"), lambda: bins_tools.get_all_bins_with_location(db)
+    )
+    all_bins = [{**choice, "is_current": choice["id"] == result.bin_id} for choice in bin_choices]
+
+    return render_template(
+        request,
+        "item.html",
+        {
             "item": result,
             "history": history,
             "all_bins": all_bins,
@@ -133,7 +157,7 @@ async def item_detail_page(
 
 
 @router.post("/item/{item_id}/move")
-async def move_item(
+def move_item(
     request: Request,
     item_id: str,
     to_bin_id: str = Form(...),
@@ -160,7 +184,7 @@ async def move_item(
 
 
 @router.post("/item/{item_id}/add-quantity")
-async def add_quantity(
+def add_quantity(
     request: Request,
     item_id: str,
     quantity: int = Form(default=1),
@@ -169,42 +193,23 @@ async def add_quantity(
     user: User = Depends(require_auth),
 ):
     """Handle add quantity form submission."""
-    # Get current item to find current quantity
-    item = items_tools.get_item(db, item_id)
-    if isinstance(item, dict) and "error" in item:
-        return RedirectResponse(
-            url=f"/item/{item_id}?error={item['error']}",
-            status_code=303,
-        )
-
-    # Calculate new quantity
-    current_qty = item.quantity_value or 0
-    new_qty = current_qty + quantity
-
-    # Update item with new quantity
-    items_tools.update_item(
-        db=db,
-        item_id=item_id,
-        quantity_value=new_qty,
-    )
-
-    # Log the addition manually since update_item logs "updated" not "added"
-    from protea.db.models import ActivityAction
-    from protea.tools.items import _log_activity
-
-    _log_activity(
+    result = items_tools.increment_quantity(
         db=db,
         item_id=item_id,
-        action=ActivityAction.ADDED,
-        quantity_change=quantity,
+        delta=quantity,
         notes=notes if notes else None,
     )
+    if isinstance(result, dict) and "error" in result:
+        return RedirectResponse(
+            url=f"/item/{item_id}?error={result['error']}",
+            status_code=303,
+        )
 
     return RedirectResponse(url=f"/item/{item_id}", status_code=303)
 
 
 @router.post("/item/{item_id}/use")
-async def use_item(
+def use_item(
     request: Request,
     item_id: str,
     quantity: int = Form(default=1),
@@ -231,7 +236,7 @@ async def use_item(
 
 
 @router.post("/item/{item_id}/edit")
-async def edit_item(
+def edit_item(
     request: Request,
     item_id: str,
     name: str = Form(...),
@@ -266,74 +271,53 @@ async def edit_item(
     return RedirectResponse(url=f"/item/{item_id}", status_code=303)
 
 
-@router.get("/browse", response_class=HTMLResponse)
-async def browse_page(
-    request: Request,
-    db: Database = Depends(get_db),
-    user: User = Depends(require_auth),
-):
-    """Render browse page with location/bin tree."""
-    locations = locations_tools.get_locations(db)
-
-    # Count bins recursively in tree
-    def count_bins(nodes):
-        total = len(nodes)
-        for node in nodes:
-            total += count_bins(node.get("children", []))
-        return total
-
-    # Convert flat bins list to tree format (fallback for pre-migration data)
-    def bins_to_tree(bins_list):
-        return [
-            {
-                "id": b.id,
-                "name": b.name,
-                "description": b.description,
-                "parent_bin_id": getattr(b, "parent_bin_id", None),
-                "item_count": db.execute_one(
-                    "SELECT COUNT(*) as cnt FROM items WHERE bin_id = ?", (b.id,)
-                )["cnt"],
-                "child_count": 0,
-                "children": [],
-            }
-            for b in bins_list
-        ]
+def _browse_location_data(db: Database) -> list[dict]:
+    """Build per-location bin trees and bin counts for the browse page."""
+    locations = _cached_locations(db)
+    # Every location's tree and item counts come from a single query
+    trees = bins_tools.get_location_bin_trees(db)
+    bin_counts = bins_tools.count_bins_by_location(db)
 
-    # Build tree structure with bins for each location
     location_data = []
     for loc in locations:
-        # Try to get nested bin tree
-        bin_tree = bins_tools.get_bin_tree(db, location_id=loc.id)
-        bins_tree = bin_tree.get("bins", [])
-
-        # Fallback: if tree is empty, try getting bins directly
-        # This handles the case where migration hasn't run yet
-        if not bins_tree:
-            flat_bins = bins_tools.get_bins(db, location_id=loc.id)
-            if flat_bins:
-                bins_tree = bins_to_tree(flat_bins)
-
         location_data.append(
             {
                 "location": loc,
-                "bins_tree": bins_tree,
-                "bin_count": count_bins(bins_tree),
+                "bins_tree": trees.get(loc.id, []),
+                "bin_count": bin_counts.get(loc.id, 0),
             }
         )
+    return location_data
+
 
-    return templates.TemplateResponse(
-        request=request,
-        name="browse.html",
-        context={
+@router.get("/browse", response_class=HTMLResponse)
+def browse_page(
+    request: Request,
+    db: Database = Depends(get_db),
+    user: User = Depends(require_auth),
+):
+    """Render browse page with location/bin tree."""
+    key = data_key(db, "browse")
+    etag = _page_etag(request, user, key)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    location_data = page_cache.get_or_compute(key, lambda: _browse_location_data(db))
+
+    response = render_template(
+        request,
+        "browse.html",
+        {
             "locations": location_data,
             "active_nav": "browse",
             "user": user,
         },
     )
+    return _with_etag(response, etag)
 
 
 @router.post("/browse/create-location")
-async def create_location(
+def create_location(
     request: Request,
     name: str = Form(...),
     description: str = Form(default=""),
@@ -356,7 +340,7 @@ async def create_location(
 
 
 @router.get("/browse/location/{location_id}", response_class=HTMLResponse)
-async def browse_location_page(
+def browse_location_page(
     request: Request,
     location_id: str,
     error: str = None,
@@ -370,10 +354,10 @@ async def browse_location_page(
     result = locations_tools.get_location(db, location_id=location_id)
 
     if isinstance(result, dict) and "error" in result:
-        return templates.TemplateResponse(
-            request=request,
-            name="location.html",
-            context={
+        return render_template(
+            request,
+            "location.html",
+            {
                 "error": result["error"],
                 "location": None,
                 "active_nav": "browse",
@@ -382,33 +366,13 @@ async def browse_location_page(
             status_code=404,
         )
 
-    # Get bins in this location (top-level only, not nested)
-    bins = bins_tools.get_bins(db, location_id=location_id)
-
-    # Count items in each bin
-    bins_with_counts = []
-    for b in bins:
-        item_count = db.execute_one("SELECT COUNT(*) as cnt FROM items WHERE bin_id = ?", (b.id,))[
-            "cnt"
-        ]
-        # Count child bins
-        child_count = db.execute_one(
-            "SELECT COUNT(*) as cnt FROM bins WHERE parent_bin_id = ?", (b.id,)
-        )["cnt"]
-        bins_with_counts.append(
-            {
-                "id": b.id,
-                "name": b.name,
-                "description": b.description,
-                "item_count": item_count,
-                "child_count": child_count,
-            }
-        )
+    # Get bins in this location with item and child counts in one query
+    bins_with_counts = bins_tools.get_location_bin_counts(db, location_id)
 
-    return templates.TemplateResponse(
-        request=request,
-        name="location.html",
-        context={
+    return render_template(
+        request,
+        "location.html",
+        {
             "location": result,
             "bins": bins_with_counts,
             "active_nav": "browse",
@@ -419,7 +383,7 @@ async def browse_location_page(
 
 
 @router.post("/browse/location/{location_id}/edit")
-async def edit_location(
+def edit_location(
     request: Request,
     location_id: str,
     name: str = Form(...),
@@ -445,7 +409,7 @@ async def edit_location(
 
 
 @router.post("/browse/location/{location_id}/delete")
-async def delete_location(
+def delete_location(
     request: Request,
     location_id: str,
     db: Database = Depends(get_db),
@@ -465,7 +429,7 @@ async def delete_location(
 
 
 @router.post("/browse/location/{location_id}/create-bin")
-async def create_location_bin(
+def create_location_bin(
     request: Request,
     location_id: str,
     name: str = Form(...),
@@ -499,7 +463,7 @@ async def create_location_bin(
 
 
 @router.get("/browse/location/{location_id}/quick-add", response_class=HTMLResponse)
-async def quick_add_location_bins_page(
+def quick_add_location_bins_page(
     request: Request,
     location_id: str,
     name: str = "",
@@ -513,10 +477,10 @@ async def quick_add_location_bins_page(
     if isinstance(location, dict) and "error" in location:
         return RedirectResponse(url=f"/browse/location/{location_id}", status_code=303)
 
-    return templates.TemplateResponse(
-        request=request,
-        name="quick_add_location_bins.html",
-        context={
+    return render_template(
+        request,
+        "quick_add_location_bins.html",
+        {
             "location": location,
             "prefill_name": name,
             "prefill_description": description,
@@ -527,7 +491,7 @@ async def quick_add_location_bins_page(
 
 
 @router.post("/browse/location/{location_id}/quick-add/save")
-async def quick_add_location_save_bin(
+def quick_add_location_save_bin(
     request: Request,
     location_id: str,
     name: str = Form(...),
@@ -539,7 +503,7 @@ async def quick_add_location_save_bin(
     # Verify location exists
     location = locations_tools.get_location(db, location_id=location_id)
     if isinstance(location, dict) and "error" in location:
-        return JSONResponse(
+        return OrjsonResponse(
             {"success": False, "error": location["error"]},
             status_code=400,
         )
@@ -552,12 +516,12 @@ async def quick_add_location_save_bin(
     )
 
     if isinstance(result, dict) and "error" in result:
-        return JSONResponse(
+        return OrjsonResponse(
             {"success": False, "error": result["error"]},
             status_code=400,
         )
 
-    return JSONResponse(
+    return OrjsonResponse(
         {
             "success": True,
             "bin_id": result.id,
@@ -567,7 +531,7 @@ async def quick_add_location_save_bin(
 
 
 @router.post("/browse/location/{location_id}/quick-add/upload-photo/{bin_id}")
-async def quick_add_location_upload_photo(
+def quick_add_location_upload_photo(
     request: Request,
     location_id: str,
     bin_id: str,
@@ -577,31 +541,30 @@ async def quick_add_location_upload_photo(
     user: User = Depends(require_auth),
 ):
     """AJAX: Upload a photo to a bin created via quick-add."""
-    # Read and encode the image
-    contents = await image.read()
-    image_base64 = base64.b64encode(contents).decode("utf-8")
+    # Read the raw image; it is validated and re-encoded by the image store
+    contents = image.file.read()
 
     # Check if this is the first image (make it primary)
     existing_images = bins_tools.get_bin_images(db, bin_id)
     is_primary = not existing_images or len(existing_images) == 0
 
     # Add the image to the bin
-    result = bins_tools.add_bin_image(
+    result = bins_tools.add_bin_image_bytes(
         db=db,
         image_store=image_store,
         bin_id=bin_id,
-        image_base64=image_base64,
+        image_bytes=contents,
         caption=None,
         is_primary=is_primary,
     )
 
     if isinstance(result, dict) and "error" in result:
-        return JSONResponse(
+        return OrjsonResponse(
             {"success": False, "error": result["error"]},
             status_code=400,
         )
 
-    return JSONResponse(
+    return OrjsonResponse(
         {
             "success": True,
             "image_id": result.id,
@@ -611,7 +574,7 @@ async def quick_add_location_upload_photo(
 
 
 @router.post("/browse/location/{location_id}/quick-add/delete-photo/{image_id}")
-async def quick_add_location_delete_photo(
+def quick_add_location_delete_photo(
     request: Request,
     location_id: str,
     image_id: str,
@@ -621,11 +584,11 @@ async def quick_add_location_delete_photo(
 ):
     """AJAX: Delete a photo from a bin in quick-add mode."""
     bins_tools.remove_bin_image(db=db, image_store=image_store, image_id=image_id)
-    return JSONResponse({"success": True})
+    return OrjsonResponse({"success": True})
 
 
 @router.get("/browse/location/{location_id}/download-images")
-async def download_location_images(
+def download_location_images(
     request: Request,
     location_id: str,
     db: Database = Depends(get_db),
@@ -639,78 +602,30 @@ async def download_location_images(
             url=f"/browse/location/{location_id}?error=Location not found", status_code=303
         )
 
-    # Get all root bins in this location
-    root_bins = bins_tools.get_bins(db, location_id=location_id, root_only=True)
-    if isinstance(root_bins, dict) and "error" in root_bins:
-        root_bins = []
+    # Load every bin in this location once and walk the hierarchy in memory
+    rows = db.execute(
+        "SELECT id, name, parent_bin_id FROM bins WHERE location_id = ? ORDER BY name",
+        (location_id,),
+    )
+    children_by_parent: dict[str | None, list] = {}
+    for row in rows:
+        children_by_parent.setdefault(row["parent_bin_id"], []).append(row)
 
-    # Collect all bins to process (recursively)
+    # Collect all bins to process, parents before their children
     bins_to_process = []
+    stack = [(row, [location.name]) for row in reversed(children_by_parent.get(None, []))]
+    while stack:
+        row, path = stack.pop()
+        current_path = path + [row["name"]]
+        bins_to_process.append({"id": row["id"], "name": row["name"], "path": current_path})
+        for child in reversed(children_by_parent.get(row["id"], [])):
+            stack.append((child, current_path))
 
-    def add_bin_and_children(bin_id: str, bin_name: str, path: list[str]):
-        current_path = path + [bin_name]
-        bins_to_process.append({"id": bin_id, "name": bin_name, "path": current_path})
-        # Get children
-        rows = db.execute("SELECT id, name FROM bins WHERE parent_bin_id = ?", (bin_id,))
-        for row in rows:
-            add_bin_and_children(row["id"], row["name"], current_path)
-
-    # Start with root bins
-    for bin_obj in root_bins:
-        add_bin_and_children(bin_obj.id, bin_obj.name, [location.name])
-
-    # Create zip file in memory
-    zip_buffer = io.BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for bin_info in bins_to_process:
-            # Build sanitized folder path
-            folder_path = "/".join(_sanitize_name(p) for p in bin_info["path"])
-            sanitized_bin_name = _sanitize_name(bin_info["name"])
-
-            # Get images for this bin
-            images = bins_tools.get_bin_images(db, bin_info["id"])
-            if isinstance(images, dict) and "error" in images:
-                images = []
-
-            if not images:
-                # Create empty folder with placeholder
-                zip_file.writestr(f"{folder_path}/.empty", "")
-            else:
-                # Add images with proper naming
-                for idx, image in enumerate(images):
-                    image_path = Path(settings.image_base_path) / image.file_path
-
-                    if not image_path.exists():
-                        continue
-
-                    # Determine extension from file
-                    ext = image_path.suffix or ".jpg"
-
-                    # Build filename
-                    if len(images) == 1:
-                        filename = f"{sanitized_bin_name}{ext}"
-                    else:
-                        filename = f"{sanitized_bin_name}-{idx + 1}{ext}"
-
-                    # Add to zip
-                    zip_file.write(image_path, f"{folder_path}/{filename}")
-
-    # Prepare response
-    zip_buffer.seek(0)
-
-    # Generate filename for the zip
-    root_name = _sanitize_name(location.name)
-
-    return StreamingResponse(
-        zip_buffer,
-        media_type="application/zip",
-        headers={"Content-Disposition": f'attachment; filename="{root_name}-images.zip"'},
-    )
+    return _zip_response(db, bins_to_process, _sanitize_name(location.name))
 
 
 @router.get("/browse/bin/{bin_id}", response_class=HTMLResponse)
-async def browse_bin_page(
+def browse_bin_page(
     request: Request,
     bin_id: str,
     error: str = None,
@@ -724,10 +639,10 @@ async def browse_bin_page(
     result = bins_tools.get_bin(db, bin_id=bin_id, include_items=True, include_images=True)
 
     if isinstance(result, dict) and "error" in result:
-        return templates.TemplateResponse(
-            request=request,
-            name="bin.html",
-            context={
+        return render_template(
+            request,
+            "bin.html",
+            {
                 "error": result["error"],
                 "bin": None,
                 "active_nav": "browse",
@@ -736,10 +651,10 @@ async def browse_bin_page(
             status_code=404,
         )
 
-    return templates.TemplateResponse(
-        request=request,
-        name="bin.html",
-        context={
+    return render_template(
+        request,
+        "bin.html",
+        {
             "bin": result,
             "active_nav": "browse",
             "upload_error": error,
@@ -749,7 +664,7 @@ async def browse_bin_page(
 
 
 @router.post("/browse/bin/{bin_id}/add-item")
-async def add_item_to_bin(
+def add_item_to_bin(
     request: Request,
     bin_id: str,
     name: str = Form(...),
@@ -784,7 +699,7 @@ async def add_item_to_bin(
 
 
 @router.post("/browse/bin/{bin_id}/create-child")
-async def create_child_bin(
+def create_child_bin(
     request: Request,
     bin_id: str,
     name: str = Form(...),
@@ -819,7 +734,7 @@ async def create_child_bin(
 
 
 @router.post("/browse/bin/{bin_id}/delete-child/{child_id}")
-async def delete_child_bin(
+def delete_child_bin(
     request: Request,
     bin_id: str,
     child_id: str,
@@ -840,7 +755,7 @@ async def delete_child_bin(
 
 
 @router.post("/browse/bin/{bin_id}/upload-image")
-async def upload_bin_image(
+def upload_bin_image(
     request: Request,
     bin_id: str,
     image: UploadFile,
@@ -854,17 +769,16 @@ async def upload_bin_image(
     # Validate bin_id is a proper UUID
     validate_uuid(bin_id, "bin ID")
 
-    # Read and encode the image
-    contents = await image.read()
-    image_base64 = base64.b64encode(contents).decode("utf-8")
+    # Read the raw image; it is validated and re-encoded by the image store
+    contents = image.file.read()
 
     # Add the image to the bin (image validation happens in image_store)
     try:
-        result = bins_tools.add_bin_image(
+        result = bins_tools.add_bin_image_bytes(
             db=db,
             image_store=image_store,
             bin_id=bin_id,
-            image_base64=image_base64,
+            image_bytes=contents,
             caption=caption if caption else None,
             is_primary=is_primary,
         )
@@ -885,7 +799,7 @@ async def upload_bin_image(
 
 
 @router.post("/browse/bin/{bin_id}/delete-image/{image_id}")
-async def delete_bin_image(
+def delete_bin_image(
     request: Request,
     bin_id: str,
     image_id: str,
@@ -899,7 +813,7 @@ async def delete_bin_image(
 
 
 @router.post("/browse/bin/{bin_id}/set-primary-image/{image_id}")
-async def set_primary_bin_image(
+def set_primary_bin_image(
     request: Request,
     bin_id: str,
     image_id: str,
@@ -911,47 +825,182 @@ async def set_primary_bin_image(
     return RedirectResponse(url=f"/browse/bin/{bin_id}", status_code=303)
 
 
+# Spaces become dashes; characters that are problematic in filenames are dropped
+_SANITIZE_TABLE = str.maketrans({" ": "-"} | dict.fromkeys('<>:"/\\|?*'))
+
+
 def _sanitize_name(name: str) -> str:
     """Sanitize name for filesystem: replace spaces with dashes, remove special chars."""
-    # Replace spaces with dashes
-    name = name.replace(" ", "-")
-    # Remove characters that are problematic in filenames
-    name = re.sub(r'[<>:"/\\|?*]', "", name)
-    return name
-
+    return name.translate(_SANITIZE_TABLE)
 
-def _get_bin_path(db: Database, bin_id: str) -> list[str]:
-    """Get the full path of bin names from root to this bin."""
-    path = []
-    current_id = bin_id
 
-    while current_id:
-        bin_row = db.execute_one(
-            "SELECT id, name, parent_bin_id, location_id FROM bins WHERE id = ?", (current_id,)
+def _get_all_child_bins(db: Database, bin_id: str) -> list[dict]:
+    """Get all descendant bins in one recursive query, parents before children."""
+    rows = db.execute(
+        """
+        WITH RECURSIVE descendants(id, name, parent_bin_id, depth) AS (
+            SELECT id, name, parent_bin_id, 1 FROM bins WHERE parent_bin_id = ?
+            UNION ALL
+            SELECT b.id, b.name, b.parent_bin_id, d.depth + 1
+            FROM bins b
+            JOIN descendants d ON b.parent_bin_id = d.id
+            WHERE d.depth < 64
         )
-        if not bin_row:
-            break
-        path.insert(0, bin_row["name"])
-        current_id = bin_row["parent_bin_id"]
+        SELECT id, name, parent_bin_id FROM descendants ORDER BY depth
+        """,
+        (bin_id,),
+    )
+    return [dict(row) for row in rows]
 
-    return path
 
+class _ZipChunkBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink that hands zip output back in chunks."""
 
-def _get_all_child_bins(db: Database, bin_id: str) -> list[dict]:
-    """Recursively get all child bins."""
-    children = []
+    def __init__(self):
+        self._chunks: list[bytes] = []
 
-    rows = db.execute("SELECT id, name FROM bins WHERE parent_bin_id = ?", (bin_id,))
+    def writable(self) -> bool:
+        return True
 
-    for row in rows:
-        children.append({"id": row["id"], "name": row["name"]})
-        children.extend(_get_all_child_bins(db, row["id"]))
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
 
-    return children
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _zip_entries(db: Database, bins_to_process: list[dict]) -> list[tuple[str, Path | None]]:
+    """Resolve archive names for every bin's images (None marks an empty folder).
+
+    Files are not checked here; _stream_zip skips any that fail to open.
+    """
+    image_base = Path(settings.image_base_path)
+    entries = []
+    for bin_info in bins_to_process:
+        # Build sanitized folder path
+        folder_path = "/".join(_sanitize_name(p) for p in bin_info["path"])
+        sanitized_bin_name = _sanitize_name(bin_info["name"])
+
+        # Get images for this bin
+        images = bins_tools.get_bin_images(db, bin_info["id"])
+        if isinstance(images, dict) and "error" in images:
+            images = []
+
+        if not images:
+            # Create empty folder with placeholder
+            entries.append((f"{folder_path}/.empty", None))
+            continue
+
+        # Add images with proper naming
+        for idx, image in enumerate(images):
+            image_path = image_base / image.file_path
+
+            # Determine extension from file
+            ext = image_path.suffix or ".jpg"
+
+            # Build filename: bin-name.jpg or bin-name-1.jpg, bin-name-2.jpg
+            if len(images) == 1:
+                filename = f"{sanitized_bin_name}{ext}"
+            else:
+                filename = f"{sanitized_bin_name}-{idx + 1}{ext}"
+
+            entries.append((f"{folder_path}/{filename}", image_path))
+    return entries
+
+
+def _read_image(image_path: Path) -> tuple[os.stat_result, bytes | None] | None:
+    """Read an image for zipping (one open + fstat), or None if it is gone.
+
+    Files over _ZIP_PREFETCH_MAX_BYTES come back without data, to be streamed
+    by _write_zip_entry.
+    """
+    try:
+        with open(image_path, "rb") as src:
+            stat = os.fstat(src.fileno())
+            if stat.st_size > _ZIP_PREFETCH_MAX_BYTES:
+                return stat, None
+            return stat, src.read()
+    except FileNotFoundError:
+        return None
+
+
+def _write_zip_entry(
+    zip_file: zipfile.ZipFile,
+    sink: _ZipChunkBuffer,
+    arcname: str,
+    image_path: Path | None,
+    read: Future | None,
+) -> Iterator[bytes]:
+    """Write one prefetched entry and yield its output; None marks an empty folder."""
+    if read is None:
+        zip_file.writestr(arcname, "")
+        yield sink.drain()
+        return
+
+    result = read.result()
+    if result is None:
+        return
+    stat, data = result
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(stat.st_mtime)[:6])
+    zinfo.external_attr = (stat.st_mode & 0xFFFF) << 16
+    if data is not None:
+        zip_file.writestr(zinfo, data)
+        yield sink.drain()
+        return
+
+    # Large file: copy it through in chunks, yielding as it goes
+    zinfo.file_size = stat.st_size
+    try:
+        # The source opens first, so a vanished file never starts an entry
+        with open(image_path, "rb") as src, zip_file.open(zinfo, "w") as dst:
+            while chunk := src.read(_ZIP_CHUNK_BYTES):
+                dst.write(chunk)
+                yield sink.drain()
+    except FileNotFoundError:
+        return
+    yield sink.drain()
+
+
+def _stream_zip(entries: list[tuple[str, Path | None]]) -> Iterator[bytes]:
+    """Yield a zip archive of entries chunk by chunk.
+
+    Images are already compressed, so they are stored rather than deflated.
+    File reads run in a small thread pool a bounded number of entries ahead
+    of the (serial) zip writer, so disk latency overlaps with output. Large
+    files skip the prefetch and are streamed in chunks instead.
+    """
+    sink = _ZipChunkBuffer()
+    with (
+        ThreadPoolExecutor(max_workers=_ZIP_READ_WORKERS) as pool,
+        zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zip_file,
+    ):
+        pending: deque[tuple[str, Path | None, Future | None]] = deque()
+        for arcname, image_path in entries:
+            read = pool.submit(_read_image, image_path) if image_path is not None else None
+            pending.append((arcname, image_path, read))
+            if len(pending) > _ZIP_PREFETCH:
+                yield from _write_zip_entry(zip_file, sink, *pending.popleft())
+        while pending:
+            yield from _write_zip_entry(zip_file, sink, *pending.popleft())
+    # Central directory
+    yield sink.drain()
+
+
+def _zip_response(db: Database, bins_to_process: list[dict], root_name: str) -> StreamingResponse:
+    """Stream the images of bins_to_process as a zip download."""
+    entries = _zip_entries(db, bins_to_process)
+    return StreamingResponse(
+        _stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{root_name}-images.zip"'},
+    )
 
 
 @router.get("/browse/bin/{bin_id}/download-images")
-async def download_bin_images(
+def download_bin_images(
     request: Request,
     bin_id: str,
     db: Database = Depends(get_db),
@@ -964,69 +1013,19 @@ async def download_bin_images(
         return RedirectResponse(url=f"/browse/bin/{bin_id}?error=Bin not found", status_code=303)
 
     # Get the path to this bin for folder structure
-    bin_path = _get_bin_path(db, bin_id)
+    bin_path = bin_data.path + [bin_data.name]
 
     # Collect all bins to process (this bin + all children)
     bins_to_process = [{"id": bin_id, "name": bin_data.name, "path": bin_path}]
 
-    # Get all child bins recursively
-    def add_children(parent_id: str, parent_path: list[str]):
-        rows = db.execute("SELECT id, name FROM bins WHERE parent_bin_id = ?", (parent_id,))
-        for row in rows:
-            child_path = parent_path + [row["name"]]
-            bins_to_process.append({"id": row["id"], "name": row["name"], "path": child_path})
-            add_children(row["id"], child_path)
-
-    add_children(bin_id, bin_path)
-
-    # Create zip file in memory
-    zip_buffer = io.BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        for bin_info in bins_to_process:
-            # Build sanitized folder path
-            folder_path = "/".join(_sanitize_name(p) for p in bin_info["path"])
-            sanitized_bin_name = _sanitize_name(bin_info["name"])
-
-            # Get images for this bin
-            images = bins_tools.get_bin_images(db, bin_info["id"])
-            if isinstance(images, dict) and "error" in images:
-                images = []
-
-            if not images:
-                # Create empty folder with .gitkeep or similar placeholder
-                zip_file.writestr(f"{folder_path}/.empty", "")
-            else:
-                # Add images with proper naming
-                for idx, image in enumerate(images):
-                    image_path = Path(settings.image_base_path) / image.file_path
+    # Descendants arrive parents first, so each parent's path is already known
+    paths = {bin_id: bin_path}
+    for child in _get_all_child_bins(db, bin_id):
+        child_path = paths[child["parent_bin_id"]] + [child["name"]]
+        paths[child["id"]] = child_path
+        bins_to_process.append({"id": child["id"], "name": child["name"], "path": child_path})
 
-                    if not image_path.exists():
-                        continue
-
-                    # Determine extension from file
-                    ext = image_path.suffix or ".jpg"
-
-                    # Build filename: bin-name.jpg or bin-name-1.jpg, bin-name-2.jpg
-                    if len(images) == 1:
-                        filename = f"{sanitized_bin_name}{ext}"
-                    else:
-                        filename = f"{sanitized_bin_name}-{idx + 1}{ext}"
-
-                    # Add to zip
-                    zip_file.write(image_path, f"{folder_path}/{filename}")
-
-    # Prepare response
-    zip_buffer.seek(0)
-
-    # Generate filename for the zip
-    root_name = _sanitize_name(bin_data.name)
-
-    return StreamingResponse(
-        zip_buffer,
-        media_type="application/zip",
-        headers={"Content-Disposition": f'attachment; filename="{root_name}-images.zip"'},
-    )
+    return _zip_response(db, bins_to_process, _sanitize_name(bin_data.name))
 
 
 # =============================================================================
@@ -1035,7 +1034,7 @@ async def download_bin_images(
 
 
 @router.get("/browse/bin/{bin_id}/quick-add", response_class=HTMLResponse)
-async def quick_add_page(
+def quick_add_page(
     request: Request,
     bin_id: str,
     name: str = "",
@@ -1049,10 +1048,10 @@ async def quick_add_page(
     if isinstance(parent_bin, dict) and "error" in parent_bin:
         return RedirectResponse(url=f"/browse/bin/{bin_id}", status_code=303)
 
-    return templates.TemplateResponse(
-        request=request,
-        name="quick_add.html",
-        context={
+    return render_template(
+        request,
+        "quick_add.html",
+        {
             "parent_bin": parent_bin,
             "prefill_name": name,
             "prefill_description": description,
@@ -1063,7 +1062,7 @@ async def quick_add_page(
 
 
 @router.post("/browse/bin/{bin_id}/quick-add/save")
-async def quick_add_save_bin(
+def quick_add_save_bin(
     request: Request,
     bin_id: str,
     name: str = Form(...),
@@ -1075,7 +1074,7 @@ async def quick_add_save_bin(
     # Get parent bin to find location_id
     parent_bin = bins_tools.get_bin(db, bin_id=bin_id)
     if isinstance(parent_bin, dict) and "error" in parent_bin:
-        return JSONResponse(
+        return OrjsonResponse(
             {"success": False, "error": parent_bin["error"]},
             status_code=400,
         )
@@ -1089,12 +1088,12 @@ async def quick_add_save_bin(
     )
 
     if isinstance(result, dict) and "error" in result:
-        return JSONResponse(
+        return OrjsonResponse(
             {"success": False, "error": result["error"]},
             status_code=400,
         )
 
-    return JSONResponse(
+    return OrjsonResponse(
         {
             "success": True,
             "bin_id": result.id,
@@ -1104,7 +1103,7 @@ async def quick_add_save_bin(
 
 
 @router.post("/browse/bin/{bin_id}/quick-add/upload-photo/{child_bin_id}")
-async def quick_add_upload_photo(
+def quick_add_upload_photo(
     request: Request,
     bin_id: str,
     child_bin_id: str,
@@ -1114,31 +1113,30 @@ async def quick_add_upload_photo(
     user: User = Depends(require_auth),
 ):
     """AJAX: Upload a photo to a bin created via quick-add."""
-    # Read and encode the image
-    contents = await image.read()
-    image_base64 = base64.b64encode(contents).decode("utf-8")
+    # Read the raw image; it is validated and re-encoded by the image store
+    contents = image.file.read()
 
     # Check if this is the first image (make it primary)
     existing_images = bins_tools.get_bin_images(db, child_bin_id)
     is_primary = not existing_images or len(existing_images) == 0
 
     # Add the image to the bin
-    result = bins_tools.add_bin_image(
+    result = bins_tools.add_bin_image_bytes(
         db=db,
         image_store=image_store,
         bin_id=child_bin_id,
-        image_base64=image_base64,
+        image_bytes=contents,
         caption=None,
         is_primary=is_primary,
     )
 
     if isinstance(result, dict) and "error" in result:
-        return JSONResponse(
+        return OrjsonResponse(
             {"success": False, "error": result["error"]},
             status_code=400,
         )
 
-    return JSONResponse(
+    return OrjsonResponse(
         {
             "success": True,
             "image_id": result.id,
@@ -1148,7 +1146,7 @@ async def quick_add_upload_photo(
 
 
 @router.post("/browse/bin/{bin_id}/quick-add/delete-photo/{image_id}")
-async def quick_add_delete_photo(
+def quick_add_delete_photo(
     request: Request,
     bin_id: str,
     image_id: str,
@@ -1158,54 +1156,42 @@ async def quick_add_delete_photo(
 ):
     """AJAX: Delete a photo from a bin in quick-add mode."""
     bins_tools.remove_bin_image(db=db, image_store=image_store, image_id=image_id)
-    return JSONResponse({"success": True})
-
-
-@router.get("/history", response_class=HTMLResponse)
-async def history_page(
-    request: Request,
-    limit: int = 50,
-    db: Database = Depends(get_db),
-    user: User = Depends(require_auth),
-):
-    """Render activity history page."""
-    # Get recent activity with item and location details
-    rows = db.execute(
-        """
-        SELECT
-            a.id,
-            a.item_id,
-            a.action,
-            a.quantity_change,
-            a.from_bin_id,
-            a.to_bin_id,
-            a.notes,
-            a.created_at,
-            i.name as item_name,
-            i.photo_url as item_photo,
-            b.name as bin_name,
-            l.name as location_name
-        FROM activity_log a
-        LEFT JOIN items i ON a.item_id = i.id
-        LEFT JOIN bins b ON i.bin_id = b.id
-        LEFT JOIN locations l ON b.location_id = l.id
-        ORDER BY a.created_at DESC
-        LIMIT ?
-        """,
-        (limit,),
-    )
-
-    # Group by date for display
-    from collections import defaultdict
-    from datetime import datetime
-
-    history_by_date = defaultdict(list)
-    for row in rows:
-        created_at = row["created_at"]
-        if isinstance(created_at, str):
-            created_at = datetime.fromisoformat(created_at)
-        date_key = created_at.strftime("%Y-%m-%d")
-        history_by_date[date_key].append(
+    return OrjsonResponse({"success": True})
+
+
+# Recent activity with item and location details, limited to the columns the
+# history page renders; the created_at index serves the ORDER BY ... LIMIT
+_HISTORY_SQL = """
+    SELECT
+        a.id,
+        a.item_id,
+        a.action,
+        a.quantity_change,
+        a.notes,
+        a.created_at,
+        substr(a.created_at, 1, 10) as day,
+        i.name as item_name,
+        i.photo_url as item_photo,
+        b.name as bin_name,
+        l.name as location_name
+    FROM activity_log a
+    LEFT JOIN items i ON a.item_id = i.id
+    LEFT JOIN bins b ON i.bin_id = b.id
+    LEFT JOIN locations l ON b.location_id = l.id
+    ORDER BY a.created_at DESC
+    LIMIT ?
+"""
+
+
+def _history_dates(db: Database, limit: int) -> list[tuple[str, list[dict]]]:
+    """Load recent activity grouped by day, newest day first."""
+    rows = db.execute(_HISTORY_SQL, (limit,))
+
+    # Rows arrive newest first, so each day's entries are already contiguous;
+    # timestamps are formatted by template filters
+    history_dates = []
+    for day, day_rows in groupby(rows, key=lambda row: row["day"]):
+        entries = [
             {
                 "id": row["id"],
                 "item_id": row["item_id"],
@@ -1214,21 +1200,38 @@ async def history_page(
                 "action": row["action"],
                 "quantity_change": row["quantity_change"],
                 "notes": row["notes"],
-                "created_at": created_at,
+                "created_at": row["created_at"],
                 "bin_name": row["bin_name"],
                 "location_name": row["location_name"],
             }
-        )
+            for row in day_rows
+        ]
+        history_dates.append((day, entries))
+    return history_dates
 
-    # Convert to sorted list of (date, entries)
-    history_dates = sorted(history_by_date.items(), key=lambda x: x[0], reverse=True)
 
-    return templates.TemplateResponse(
-        request=request,
-        name="history.html",
-        context={
+@router.get("/history", response_class=HTMLResponse)
+def history_page(
+    request: Request,
+    limit: int = 50,
+    db: Database = Depends(get_db),
+    user: User = Depends(require_auth),
+):
+    """Render activity history page."""
+    key = data_key(db, "history", limit)
+    etag = _page_etag(request, user, key)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    history_dates = page_cache.get_or_compute(key, lambda: _history_dates(db, limit))
+
+    response = render_template(
+        request,
+        "history.html",
+        {
             "history_dates": history_dates,
             "active_nav": "history",
             "user": user,
         },
     )
+    return _with_etag(response, etag)
@@ -5,25 +5,29 @@ from fastapi.responses import HTMLResponse
 
 from protea.db.connection import Database
 from protea.tools import search as search_tools
-from protea.web.app import templates
+from protea.web.app import render_template
+from protea.web.cache import data_key, search_cache
 from protea.web.dependencies import get_db
 
 router = APIRouter()
 
 
 @router.get("/search", response_class=HTMLResponse)
-async def search_results_partial(
+def search_results_partial(
     request: Request, q: str = "", db: Database = Depends(get_db)
 ):
     """Return search results as htmx partial."""
+    query = q.strip()
     results = []
-    if q.strip():
-        results = search_tools.search_items(db, q.strip())
+    if query:
+        results = search_cache.get_or_compute(
+            data_key(db, query), lambda: search_tools.search_items(db, query)
+        )
 
-    return templates.TemplateResponse(
-        request=request,
-        name="partials/search_results.html",
-        context={
+    return render_template(
+        request,
+        "partials/search_results.html",
+        {
             "results": results,
             "query": q,
         },
@@ -37,6 +37,20 @@ def test_get_bin(test_db, sample_bin):
     assert result.name == sample_bin.name
 
 
+def test_get_bin_counts_with_and_without_lists(test_db, sample_bin):
+    """Test item/image counts agree whether or not the lists are loaded."""
+    from protea.tools import items
+
+    items.add_item(db=test_db, name="Counted A", bin_id=sample_bin.id)
+    items.add_item(db=test_db, name="Counted B", bin_id=sample_bin.id)
+
+    full = bins.get_bin(test_db, bin_id=sample_bin.id, include_items=True, include_images=True)
+    bare = bins.get_bin(test_db, bin_id=sample_bin.id, include_items=False)
+    assert full.item_count == bare.item_count == len(full.items) == 2
+    assert full.image_count == bare.image_count == 0
+    assert bare.items == []
+
+
 def test_get_bin_not_found(test_db):
     """Test getting a non-existent bin."""
     result = bins.get_bin(test_db, bin_id="nonexistent-uuid")
@@ -218,6 +232,69 @@ def test_get_bin_tree(test_db, sample_location):
     assert len(root_node["children"]) == 2
 
 
+def test_get_location_bin_trees_matches_bin_tree(test_db, sample_location):
+    """Test that the all-locations tree matches per-location get_bin_tree."""
+    from protea.tools import items, locations
+
+    other = locations.create_location(db=test_db, name="Other Place")
+    root = bins.create_bin(db=test_db, name="Shelf", location_id=sample_location.id)
+    child = bins.create_bin(
+        db=test_db, name="Box", location_id=sample_location.id, parent_bin_id=root.id
+    )
+    bins.create_bin(db=test_db, name="Crate", location_id=other.id)
+    items.add_item(db=test_db, name="Tape", bin_id=child.id)
+    items.add_item(db=test_db, name="Glue", bin_id=child.id)
+
+    trees = bins.get_location_bin_trees(test_db)
+    for loc_id in (sample_location.id, other.id):
+        assert trees[loc_id] == bins.get_bin_tree(test_db, location_id=loc_id)["bins"]
+
+    shelf = next(node for node in trees[sample_location.id] if node["id"] == root.id)
+    assert shelf["child_count"] == 1
+    assert shelf["children"][0]["item_count"] == 2
+
+
+def test_get_location_bin_trees_single_query(test_db, sample_bin, monkeypatch):
+    """Test that all trees and item counts are loaded with one query."""
+    calls = []
+    original = test_db.execute
+    monkeypatch.setattr(test_db, "execute", lambda *args: calls.append(args) or original(*args))
+
+    trees = bins.get_location_bin_trees(test_db)
+    assert [node["id"] for node in trees[sample_bin.location_id]] == [sample_bin.id]
+    assert len(calls) == 1
+
+
+def test_count_bins_by_location(test_db, sample_location, sample_bin):
+    """Test bin counts per location include nested bins."""
+    from protea.tools import locations
+
+    bins.create_bin(
+        db=test_db, name="Inner", location_id=sample_location.id, parent_bin_id=sample_bin.id
+    )
+    empty = locations.create_location(test_db, name="Empty Shed")
+
+    counts = bins.count_bins_by_location(test_db)
+    assert counts[sample_location.id] == 2
+    assert empty.id not in counts
+
+
+def test_get_location_bin_counts(test_db, sample_location, sample_bin):
+    """Test per-bin item and child counts for a location listing."""
+    from protea.tools import items
+
+    child = bins.create_bin(
+        db=test_db, name="Inner", location_id=sample_location.id, parent_bin_id=sample_bin.id
+    )
+    items.add_item(db=test_db, name="Counted", bin_id=sample_bin.id)
+
+    counts = {row["id"]: row for row in bins.get_location_bin_counts(test_db, sample_location.id)}
+    assert counts[sample_bin.id]["item_count"] == 1
+    assert counts[sample_bin.id]["child_count"] == 1
+    assert counts[child.id]["item_count"] == counts[child.id]["child_count"] == 0
+    assert set(counts) == {b.id for b in bins.get_bins(test_db, location_id=sample_location.id)}
+
+
 def test_get_bin_by_path(test_db, sample_location):
     """Test resolving bin by path."""
     # Create hierarchy
@@ -394,3 +471,42 @@ def test_get_bin_full_path(test_db, sample_location):
     result = bins.get_bin(test_db, bin_id=drawer.id)
     expected_path = f"{sample_location.name}/Big Chest/Small Drawer"
     assert result.full_path == expected_path
+
+
+def test_add_bin_image_bytes_and_base64(test_db, test_image_store, sample_bin):
+    """Test raw-byte and base64 bin image uploads produce the same records."""
+    import base64
+    import io
+
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8), "blue").save(buf, format="PNG")
+    png = buf.getvalue()
+
+    raw = bins.add_bin_image_bytes(test_db, test_image_store, sample_bin.id, png, is_primary=True)
+    encoded = bins.add_bin_image(
+        test_db, test_image_store, sample_bin.id, base64.b64encode(png).decode()
+    )
+
+    assert (raw.width, raw.height) == (encoded.width, encoded.height) == (8, 8)
+    assert test_image_store.get_absolute_path(raw.file_path).exists()
+    images = bins.get_bin_images(test_db, sample_bin.id)
+    assert {image.id for image in images} == {raw.id, encoded.id}
+
+    missing = bins.add_bin_image_bytes(test_db, test_image_store, "missing-bin", png)
+    assert missing["error_code"] == "NOT_FOUND"
+
+
+def test_get_all_bins_with_location(test_db, sample_location, sample_bin):
+    """Test the flat bin list matches get_bins ordering with location names."""
+    from protea.tools import locations
+
+    other = locations.create_location(test_db, name="Attic")
+    bins.create_bin(db=test_db, name="Box", location_id=other.id)
+    bins.create_bin(db=test_db, name="Drawer", location_id=sample_location.id)
+
+    choices = bins.get_all_bins_with_location(test_db)
+    assert [(c["id"], c["name"], c["location_name"]) for c in choices] == [
+        (b.id, b.name, b.location.name) for b in bins.get_bins(test_db)
+    ]
@@ -0,0 +1,104 @@
+"""Tests for database connection management."""
+
+import sqlite3
+import threading
+
+import pytest
+
+
+def test_connection_applies_pragmas(test_db):
+    """Test every connection runs in WAL with relaxed sync and in-memory temp storage."""
+    with test_db.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+        assert conn.execute("PRAGMA cache_size").fetchone()[0] == -16384
+
+
+def test_connection_reused_per_thread(test_db):
+    """Test each thread keeps one connection across calls."""
+    with test_db.connection() as first:
+        pass
+    with test_db.connection() as second:
+        assert second is first
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(test_db.execute_one("SELECT 1")[0]))
+    thread.start()
+    thread.join()
+    assert other == [1]
+    with test_db.connection() as conn:
+        assert conn is first
+
+
+def test_nested_connection_shares_outer_transaction(test_db, sample_location):
+    """Test nested blocks defer commit/rollback to the outermost block."""
+    with pytest.raises(RuntimeError), test_db.connection() as conn:
+        with test_db.connection() as inner:
+            inner.execute(
+                "UPDATE locations SET name = 'Renamed' WHERE id = ?", (sample_location.id,)
+            )
+        assert conn.in_transaction
+        raise RuntimeError("abort")
+
+    row = test_db.execute_one("SELECT name FROM locations WHERE id = ?", (sample_location.id,))
+    assert row["name"] == sample_location.name
+
+
+def test_caught_nested_failure_rolls_back_only_inner_block(test_db, sample_location):
+    """Test a nested block that raises discards its own writes, not the outer ones."""
+    with test_db.connection() as conn:
+        conn.execute(
+            "UPDATE locations SET description = 'outer' WHERE id = ?", (sample_location.id,)
+        )
+        try:
+            with test_db.connection() as inner:
+                inner.execute(
+                    "UPDATE locations SET name = 'Partial' WHERE id = ?", (sample_location.id,)
+                )
+                raise RuntimeError("inner failure")
+        except RuntimeError:
+            pass
+
+    row = test_db.execute_one(
+        "SELECT name, description FROM locations WHERE id = ?", (sample_location.id,)
+    )
+    assert row["name"] == sample_location.name
+    assert row["description"] == "outer"
+
+
+def test_nested_block_after_reads_stays_in_outer_transaction(test_db, sample_location):
+    """Test a nested block opened before any write is still undone by the outer block."""
+    with pytest.raises(RuntimeError), test_db.connection() as conn:
+        conn.execute("SELECT 1").fetchone()
+        with test_db.connection() as inner:
+            inner.execute(
+                "UPDATE locations SET name = 'Renamed' WHERE id = ?", (sample_location.id,)
+            )
+        raise RuntimeError("abort")
+
+    row = test_db.execute_one("SELECT name FROM locations WHERE id = ?", (sample_location.id,))
+    assert row["name"] == sample_location.name
+
+
+def test_close_closes_every_thread_connection(test_db):
+    """Test close() closes connections opened by other threads too."""
+    opened = []
+
+    def use_db():
+        with test_db.connection() as conn:
+            opened.append(conn)
+
+    thread = threading.Thread(target=use_db)
+    thread.start()
+    thread.join()
+    with test_db.connection() as own:
+        opened.append(own)
+
+    test_db.close()
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError, match="closed"):
+            conn.execute("SELECT 1")
+
+    # The next call opens a fresh connection
+    assert test_db.execute_one("SELECT 1")[0] == 1
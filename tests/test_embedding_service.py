@@ -89,6 +89,64 @@ class TestEmbeddingConversion:
 
         np.testing.assert_array_almost_equal(original, restored)
 
+    def test_quantize_embedding_size(self):
+        """Test that quantized embeddings use one byte per dimension plus header."""
+        embedding = np.random.rand(384).astype(np.float32)
+        result = embedding_service.quantize_embedding(embedding)
+
+        assert embedding_service.is_quantized(result)
+        assert len(result) == 384 + 8
+
+    def test_quantized_roundtrip_preserves_direction(self):
+        """Test that quantization keeps values close and cosine near 1."""
+        original = (np.random.rand(384).astype(np.float32) - 0.5) * 0.2
+        restored = embedding_service.bytes_to_embedding(
+            embedding_service.quantize_embedding(original)
+        )
+
+        assert restored.shape == original.shape
+        np.testing.assert_allclose(restored, original, atol=np.abs(original).max() / 127)
+        assert embedding_service.cosine_similarity(original, restored) > 0.999
+
+    def test_quantize_zero_vector(self):
+        """Test that an all-zero vector quantizes without dividing by zero."""
+        restored = embedding_service.bytes_to_embedding(
+            embedding_service.quantize_embedding(np.zeros(4, dtype=np.float32))
+        )
+        np.testing.assert_array_equal(restored, np.zeros(4, dtype=np.float32))
+
+    def test_matrix_decode_matches_per_row(self):
+        """Test that batch decoding matches decoding each blob individually."""
+        vectors = [np.random.rand(16).astype(np.float32) for _ in range(3)]
+
+        for encode in (
+            embedding_service.quantize_embedding,
+            embedding_service.embedding_to_bytes,
+        ):
+            blobs = [encode(v) for v in vectors]
+            matrix = embedding_service.bytes_to_embedding_matrix(blobs)
+
+            assert matrix.shape == (3, 16)
+            for row, blob in zip(matrix, blobs):
+                np.testing.assert_array_equal(row, embedding_service.bytes_to_embedding(blob))
+
+    def test_matrix_decode_mixed_formats(self):
+        """Test that legacy and quantized blobs can be decoded together."""
+        vector = np.random.rand(8).astype(np.float32)
+        blobs = [
+            embedding_service.embedding_to_bytes(vector),
+            embedding_service.quantize_embedding(vector),
+        ]
+        matrix = embedding_service.bytes_to_embedding_matrix(blobs)
+
+        assert matrix.shape == (2, 8)
+        np.testing.assert_allclose(matrix[0], matrix[1], atol=vector.max() / 127)
+
+    def test_legacy_float32_not_detected_as_quantized(self):
+        """Test that float32 blobs are still decoded as float32."""
+        legacy = embedding_service.embedding_to_bytes(np.array([0.5, -0.25], dtype=np.float32))
+        assert not embedding_service.is_quantized(legacy)
+
 
 class TestCosineSimilarity:
     """Tests for cosine similarity calculation."""
@@ -161,6 +219,15 @@ class TestBatchCosineSimilarity:
         assert abs(result[1]) < 0.0001  # orthogonal
         assert 0.5 < result[2] < 0.8  # partial similarity
 
+    def test_matrix_input(self):
+        """Test that a pre-stacked matrix is accepted."""
+        query = np.array([1.0, 0.0], dtype=np.float32)
+        matrix = np.array([[1.0, 0.0], [0.0, 2.0]], dtype=np.float32)
+        result = embedding_service.batch_cosine_similarity(query, matrix)
+
+        assert abs(result[0] - 1.0) < 0.0001
+        assert abs(result[1]) < 0.0001
+
     def test_ordering_preserved(self):
         """Test that result order matches input order."""
         query = np.array([1.0, 0.0], dtype=np.float32)
@@ -176,6 +243,46 @@ class TestBatchCosineSimilarity:
         assert result[1] > result[2]  # second has higher similarity than third
 
 
+class TestNormalizedSimilarity:
+    """Tests for unit-length embeddings and dot-product similarity."""
+
+    def test_normalize_unit_length(self):
+        """Test that normalize returns a unit-length vector."""
+        result = embedding_service.normalize(np.array([3.0, 4.0]))
+        np.testing.assert_array_almost_equal(result, [0.6, 0.8])
+
+    def test_normalize_zero_vector(self):
+        """Test that a zero vector is returned unchanged."""
+        result = embedding_service.normalize(np.zeros(3))
+        np.testing.assert_array_equal(result, np.zeros(3))
+
+    def test_legacy_rows_normalized_on_decode(self):
+        """Test that legacy float32 rows come back unit-length."""
+        blobs = [
+            embedding_service.embedding_to_bytes(np.array([3.0, 4.0], dtype=np.float32)),
+            embedding_service.quantize_embedding(embedding_service.normalize(np.array([1.0, 1.0]))),
+        ]
+        matrix = embedding_service.normalized_embedding_matrix(blobs)
+
+        np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), [1.0, 1.0], atol=0.01)
+
+    def test_dot_matches_cosine_for_normalized(self):
+        """Test that dot similarity equals cosine similarity on unit vectors."""
+        query = embedding_service.normalize(np.random.rand(16))
+        vectors = [np.random.rand(16).astype(np.float32) for _ in range(4)]
+        matrix = np.vstack([embedding_service.normalize(v) for v in vectors])
+
+        dot = embedding_service.batch_dot_similarity(query, matrix)
+        cosine = embedding_service.batch_cosine_similarity(query, vectors)
+
+        np.testing.assert_allclose(dot, cosine, atol=1e-5)
+
+    def test_dot_empty_matrix(self):
+        """Test with no embeddings."""
+        query = np.array([1.0, 0.0], dtype=np.float32)
+        assert embedding_service.batch_dot_similarity(query, np.empty((0, 2))) == []
+
+
 class TestGenerateEmbedding:
     """Tests for embedding generation."""
 
@@ -191,9 +298,9 @@ class TestGenerateEmbedding:
         assert isinstance(result, bytes)
 
     def test_correct_byte_size(self):
-        """Test that embedding has correct byte size (dimensions * 4 bytes)."""
+        """Test that embedding has correct byte size (8-byte header + 1 byte per dimension)."""
         result = embedding_service.generate_embedding("test text")
-        assert len(result) == settings.embedding_dimension * 4
+        assert len(result) == settings.embedding_dimension + 8
 
     def test_different_texts_different_embeddings(self):
         """Test that different texts produce different embeddings."""
@@ -264,3 +371,34 @@ class TestIsAvailable:
         result1 = embedding_service.is_available()
         result2 = embedding_service.is_available()
         assert result1 == result2
+
+
+class TestLegacyEmbeddingMigration:
+    """Tests for the one-time conversion of legacy float32 embeddings."""
+
+    def test_migration_quantizes_legacy_rows(self, test_db, sample_bin):
+        """Test migration 011 rewrites float32 blobs in the int8 format."""
+        from protea.tools import items
+
+        legacy = items.add_item(db=test_db, name="Legacy Widget", bin_id=sample_bin.id)
+        current = items.add_item(db=test_db, name="Current Widget", bin_id=sample_bin.id)
+        vector = np.array([3.0, 0.0, 4.0, 0.0], dtype=np.float32)
+        quantized = embedding_service.quantize_embedding(embedding_service.normalize(vector))
+        with test_db.connection() as conn:
+            conn.execute(
+                "UPDATE items SET embedding = ? WHERE id = ?",
+                (embedding_service.embedding_to_bytes(vector), legacy.id),
+            )
+            conn.execute("UPDATE items SET embedding = ? WHERE id = ?", (quantized, current.id))
+            conn.execute("DELETE FROM schema_version WHERE version >= 11")
+
+        test_db.run_migrations()
+
+        rows = {
+            row["id"]: row["embedding"]
+            for row in test_db.execute("SELECT id, embedding FROM items")
+        }
+        assert rows[legacy.id] == quantized
+        assert rows[current.id] == quantized
+        version = test_db.execute_one("SELECT MAX(version) AS v FROM schema_version")["v"]
+        assert version >= 11
@@ -114,6 +114,31 @@ def test_use_item_reduces_to_zero(test_db, sample_bin):
     assert result.quantity_value == 0
 
 
+def test_increment_quantity(test_db, sample_bin):
+    """Test incrementing quantity in one statement and logging one ADD entry."""
+    from protea.tools import search
+
+    item = items.add_item(
+        db=test_db,
+        name="Rivets",
+        bin_id=sample_bin.id,
+        quantity_type="exact",
+        quantity_value=10,
+    )
+
+    assert items.increment_quantity(test_db, item.id, 5, notes="restock") == 15
+    assert items.increment_quantity(test_db, item.id, 3) == 18
+    assert items.get_item(test_db, item.id).quantity_value == 18
+
+    history = search.get_item_history(test_db, item.id)
+    assert [entry.quantity_change for entry in history[:2]] == [3, 5]
+    assert history[1].notes == "restock"
+    assert {entry.action.value for entry in history} == {"added"}
+
+    missing = items.increment_quantity(test_db, "missing-item", 1)
+    assert missing["error_code"] == "NOT_FOUND"
+
+
 def test_move_item(test_db, sample_location):
     """Test moving an item to another bin."""
     from protea.tools import bins
@@ -111,6 +111,20 @@ class TestHealthEndpoint:
             assert "application/json" in response.headers["content-type"]
 
 
+    def test_health_head_and_other_methods(self, sse_db):
+        """Test HEAD gets headers only and non-GET methods still hit the route."""
+        with patch('protea.mcp_sse.db', sse_db):
+            from protea.mcp_sse import create_sse_app
+
+            client = TestClient(create_sse_app(), raise_server_exceptions=False)
+
+            head = client.head("/health")
+            assert head.status_code == 200
+            assert head.content == b""
+            assert int(head.headers["content-length"]) > 0
+            assert client.post("/health").status_code == 405
+
+
 class TestMainFunction:
     """Tests for the main entry point."""
 
@@ -159,3 +173,208 @@ class TestMainFunction:
                     call_kwargs = mock_uvicorn.run.call_args.kwargs
                     assert call_kwargs["host"] == "127.0.0.1"
                     assert call_kwargs["port"] == 8081
+
+
+class TestApiKeyCache:
+    """Tests for cached API key validation."""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        """Start each test with an empty API key cache."""
+        from protea.mcp_sse import _API_KEY_CACHE, _API_KEY_MISSES, _API_KEY_TOUCHED
+
+        for cache in (_API_KEY_CACHE, _API_KEY_MISSES, _API_KEY_TOUCHED):
+            cache.clear()
+        yield
+        for cache in (_API_KEY_CACHE, _API_KEY_MISSES, _API_KEY_TOUCHED):
+            cache.clear()
+
+    async def test_valid_and_invalid_keys_are_cached(self, sse_db):
+        """Test repeat checks of the same token skip the database."""
+        from protea.mcp_sse import _validate_api_key_cached
+        from protea.tools import auth as auth_tools
+
+        user = auth_tools.create_user(sse_db, username="sse-user", password="Password123!")
+        key = auth_tools.create_api_key(sse_db, user.id, name="cli")
+
+        with patch('protea.mcp_sse.db', sse_db), patch(
+            'protea.mcp_sse.auth_tools.lookup_api_key',
+            wraps=auth_tools.lookup_api_key,
+        ) as validate:
+            assert (await _validate_api_key_cached(key.plaintext_key)).id == user.id
+            assert (await _validate_api_key_cached(key.plaintext_key)).id == user.id
+            assert await _validate_api_key_cached("bogus") is None
+            assert await _validate_api_key_cached("bogus") is None
+
+            assert validate.call_count == 2
+
+    async def test_invalid_token_spray_keeps_valid_keys(self, sse_db, monkeypatch):
+        """Test a flood of bad tokens evicts old misses, not cached valid keys."""
+        from protea import mcp_sse
+        from protea.tools import auth as auth_tools
+
+        monkeypatch.setattr(mcp_sse, "_API_KEY_CACHE_MAX", 4)
+        user = auth_tools.create_user(sse_db, username="spray-user", password="Password123!")
+        key = auth_tools.create_api_key(sse_db, user.id, name="cli")
+
+        with patch('protea.mcp_sse.db', sse_db):
+            assert (await mcp_sse._validate_api_key_cached(key.plaintext_key)).id == user.id
+            for i in range(10):
+                assert await mcp_sse._validate_api_key_cached(f"bogus-{i}") is None
+
+            assert len(mcp_sse._API_KEY_CACHE) == 1
+            assert len(mcp_sse._API_KEY_MISSES) == 4
+            with patch('protea.mcp_sse.auth_tools.lookup_api_key') as lookup:
+                assert (await mcp_sse._validate_api_key_cached(key.plaintext_key)).id == user.id
+                lookup.assert_not_called()
+
+    async def test_key_use_recorded_in_background_once_per_interval(self, sse_db):
+        """Test last_used_at is written off the auth path and debounced."""
+        import asyncio
+
+        from protea.mcp_sse import _BACKGROUND_TASKS, _validate_api_key_cached
+        from protea.tools import auth as auth_tools
+
+        user = auth_tools.create_user(sse_db, username="sse-user", password="Password123!")
+        key = auth_tools.create_api_key(sse_db, user.id, name="cli")
+
+        with patch('protea.mcp_sse.db', sse_db), patch(
+            'protea.mcp_sse.auth_tools.touch_api_key', wraps=auth_tools.touch_api_key
+        ) as touch:
+            for _ in range(3):
+                assert (await _validate_api_key_cached(key.plaintext_key)).id == user.id
+            await asyncio.gather(*_BACKGROUND_TASKS)
+
+            touch.assert_called_once_with(sse_db, key.id)
+
+        (stored,) = auth_tools.get_user_api_keys(sse_db, user.id)
+        assert stored.last_used_at is not None
+
+    async def test_concurrent_checks_share_one_lookup(self, sse_db):
+        """Test simultaneous checks of one token run a single threaded lookup."""
+        import asyncio
+        import threading
+
+        from protea.mcp_sse import _API_KEY_INFLIGHT, _validate_api_key_cached
+
+        release = threading.Event()
+        threads = []
+
+        def slow_lookup(db, token):
+            threads.append(threading.current_thread())
+            release.wait(5)
+
+        with patch('protea.mcp_sse.auth_tools.lookup_api_key', side_effect=slow_lookup):
+            checks = [asyncio.ensure_future(_validate_api_key_cached("bogus")) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            release.set()
+            assert await asyncio.gather(*checks) == [None] * 5
+
+        assert len(threads) == 1
+        assert threads[0] is not threading.main_thread()
+        assert _API_KEY_INFLIGHT == {}
+
+    async def test_cache_disabled_with_zero_ttl(self, sse_db):
+        """Test a zero TTL validates against the database every time."""
+        from protea.config import auth_settings
+        from protea.mcp_sse import _validate_api_key_cached
+
+        with (
+            patch('protea.mcp_sse.db', sse_db),
+            patch.object(auth_settings, 'api_key_cache_seconds', 0),
+            patch('protea.mcp_sse.auth_tools.lookup_api_key', return_value=None) as validate,
+        ):
+            await _validate_api_key_cached("bogus")
+            await _validate_api_key_cached("bogus")
+
+            assert validate.call_count == 2
+
+
+class TestSseAuth:
+    """Tests for SSE endpoint authentication."""
+
+    def test_missing_bearer_rejected(self, sse_db):
+        """Test requests without a bearer token get a 401."""
+        with patch('protea.mcp_sse.db', sse_db):
+            from protea.mcp_sse import create_sse_app
+
+            client = TestClient(create_sse_app(), raise_server_exceptions=False)
+            response = client.get("/sse")
+
+            assert response.status_code == 401
+            assert "Bearer" in response.json()["error"]
+            assert response.headers["content-type"] == "application/json"
+
+    def test_wrong_legacy_key_falls_back_to_database(self, sse_db):
+        """Test a token that does not match the legacy key is checked as an API key."""
+        from protea.config import auth_settings
+
+        with (
+            patch('protea.mcp_sse.db', sse_db),
+            patch.object(auth_settings, 'api_key', 'legacy-secret'),
+        ):
+            from protea.mcp_sse import create_sse_app
+
+            client = TestClient(create_sse_app(), raise_server_exceptions=False)
+            with patch('protea.mcp_sse._validate_api_key_cached', return_value=None) as validate:
+                response = client.get("/sse", headers={"Authorization": "Bearer legacy-secreT"})
+
+            assert response.status_code == 401
+            assert response.json() == {"error": "Invalid API key"}
+            validate.assert_called_once_with("legacy-secreT")
+
+    def test_legacy_key_reaches_wrapped_app(self):
+        """Test the middleware passes requests with the legacy key through."""
+        from starlette.responses import PlainTextResponse
+
+        from protea.mcp_sse import BearerAuthMiddleware
+
+        app = BearerAuthMiddleware(PlainTextResponse("streaming"), legacy_key=b"legacy-secret")
+        client = TestClient(app, raise_server_exceptions=False)
+
+        response = client.get("/sse", headers={"Authorization": "Bearer legacy-secret"})
+        assert response.status_code == 200
+        assert response.text == "streaming"
+
+    def test_auth_middleware_only_when_required(self, sse_db):
+        """Test /sse is wrapped in BearerAuthMiddleware only when auth is required."""
+        from protea.config import auth_settings
+        from protea.mcp_sse import BearerAuthMiddleware, create_sse_app
+
+        def sse_route_app():
+            with patch('protea.mcp_sse.db', sse_db):
+                app = create_sse_app()
+            return next(route.app for route in app.routes if getattr(route, 'path', '') == "/sse")
+
+        with patch.object(auth_settings, 'auth_required', True):
+            assert isinstance(sse_route_app(), BearerAuthMiddleware)
+        with patch.object(auth_settings, 'auth_required', False):
+            assert not isinstance(sse_route_app(), BearerAuthMiddleware)
+
+    def test_sse_endpoint_is_raw_asgi(self, sse_db):
+        """Test /sse is served by an ASGI endpoint that reports connection errors."""
+        from contextlib import asynccontextmanager
+
+        from protea.config import auth_settings
+        from protea.mcp_sse import SseEndpoint, create_sse_app
+
+        with (
+            patch.object(auth_settings, 'auth_required', False),
+            patch('protea.mcp_sse.db', sse_db),
+        ):
+            app = create_sse_app()
+        route = next(route for route in app.routes if getattr(route, 'path', '') == "/sse")
+        assert isinstance(route.endpoint, SseEndpoint)
+        assert route.app is route.endpoint
+        assert route.methods == {"GET", "HEAD"}
+
+        class BrokenTransport:
+            @asynccontextmanager
+            async def connect_sse(self, scope, receive, send):
+                raise RuntimeError("boom")
+                yield
+
+        client = TestClient(SseEndpoint(BrokenTransport()), raise_server_exceptions=False)
+        response = client.get("/sse")
+        assert response.status_code == 500
+        assert response.json() == {"error": "SSE connection error: boom"}
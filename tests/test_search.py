@@ -1,5 +1,8 @@
 """Tests for search tools."""
 
+from unittest.mock import patch
+
+import pytest
 
 from protea.tools import items, search
 
@@ -82,6 +85,16 @@ def test_search_items_filter_by_location(test_db, sample_bin, sample_location):
     assert all(r.location.id == sample_location.id for r in results)
 
 
+def test_search_items_treats_fts_syntax_as_text(test_db, sample_bin):
+    """Test punctuation and FTS5 keywords in queries do not raise syntax errors."""
+    items.add_item(db=test_db, name="O-ring Kit", bin_id=sample_bin.id)
+
+    assert search._build_fts_query('o-ring "kit') == '"o-ring"* "kit"*'
+    for query in ["o-ring", '"kit', "NOT", "x:y", "(o", "o'ring", '"']:
+        search.search_items(test_db, query)
+    assert any(r.item.name == "O-ring Kit" for r in search.search_items(test_db, "o-ring"))
+
+
 def test_find_item(test_db, sample_bin):
     """Test find_item convenience function."""
     items.add_item(
@@ -103,6 +116,25 @@ def test_list_items(test_db, sample_bin):
     assert len(results) >= 2
 
 
+def test_list_items_uses_thread_connection(test_db, sample_bin):
+    """Test that list_items reads through the shared connection, not iterate."""
+    items.add_item(db=test_db, name="Shared Conn Item", bin_id=sample_bin.id)
+
+    with patch.object(test_db, "iterate", side_effect=AssertionError("iterate")):
+        results = search.list_items(test_db, bin_id=sample_bin.id)
+    assert [item.name for item in results] == ["Shared Conn Item"]
+
+
+def test_list_items_iter_streams(test_db, sample_bin):
+    """Test that list_items_iter yields the same items lazily."""
+    items.add_item(db=test_db, name="Stream A", bin_id=sample_bin.id)
+    items.add_item(db=test_db, name="Stream B", bin_id=sample_bin.id)
+
+    stream = search.list_items_iter(test_db, bin_id=sample_bin.id)
+    assert not isinstance(stream, list)
+    assert [item.name for item in stream] == ["Stream A", "Stream B"]
+
+
 def test_list_items_by_bin(test_db, sample_bin):
     """Test listing items filtered by bin."""
     items.add_item(db=test_db, name="Bin Filter Test", bin_id=sample_bin.id)
@@ -139,3 +171,113 @@ def test_get_item_history(test_db, sample_bin):
 
     history = search.get_item_history(test_db, item.id)
     assert len(history) >= 2  # ADD + USE
+    assert history[0].created_at >= history[-1].created_at
+
+
+def test_get_item_history_not_found(test_db):
+    """Test that an unknown item with no history returns an error."""
+    result = search.get_item_history(test_db, "nonexistent-id")
+    assert result["error_code"] == "NOT_FOUND"
+
+
+def test_list_item_history_skips_existence_check(test_db, sample_bin):
+    """Test list_item_history returns plain lists, empty for unknown items."""
+    item = items.add_item(db=test_db, name="Listed History", bin_id=sample_bin.id)
+
+    assert search.list_item_history(test_db, "nonexistent-id") == []
+    entries = search.list_item_history(test_db, item.id)
+    assert [entry.id for entry in entries] == [
+        entry.id for entry in search.get_item_history(test_db, item.id)
+    ]
+
+
+def test_list_items_by_category_includes_subcategories(test_db, sample_bin, sample_category):
+    """Test that category filtering includes items in nested subcategories."""
+    from protea.tools import categories
+
+    child = categories.create_category(test_db, name="Child", parent_id=sample_category.id)
+    grandchild = categories.create_category(test_db, name="Grandchild", parent_id=child.id)
+    items.add_item(
+        db=test_db, name="Top Level", bin_id=sample_bin.id, category_id=sample_category.id
+    )
+    items.add_item(db=test_db, name="Deep Item", bin_id=sample_bin.id, category_id=grandchild.id)
+    items.add_item(db=test_db, name="Uncategorized", bin_id=sample_bin.id)
+
+    results = search.list_items(test_db, category_id=sample_category.id)
+    assert {item.name for item in results} == {"Top Level", "Deep Item"}
+
+    results = search.list_items(test_db, category_id=sample_category.id, include_children=False)
+    assert [item.name for item in results] == ["Top Level"]
+
+
+def test_search_results_keep_typed_fields(test_db, sample_bin):
+    """Test that unvalidated result models still expose parsed field types."""
+    from datetime import datetime
+
+    from protea.db.models import QuantityType
+
+    items.add_item(
+        db=test_db,
+        name="Typed Field Washer",
+        bin_id=sample_bin.id,
+        quantity_type="exact",
+        quantity_value=5,
+    )
+
+    result = search.search_items(test_db, "Washer")[0]
+    assert result.item.quantity_type == QuantityType.EXACT
+    assert isinstance(result.item.created_at, datetime)
+    assert isinstance(result.location.updated_at, datetime)
+
+    listed = search.list_items(test_db, bin_id=sample_bin.id)[0]
+    assert isinstance(listed.bin.created_at, datetime)
+    assert listed.bin_path == ""
+
+
+def test_list_items_by_bin_includes_nested_bins(test_db, sample_bin, sample_location):
+    """Test that bin filtering includes items in nested child bins."""
+    from protea.tools import bins
+
+    drawer = bins.create_bin(
+        db=test_db, name="Drawer", location_id=sample_location.id, parent_bin_id=sample_bin.id
+    )
+    items.add_item(db=test_db, name="Outer Item", bin_id=sample_bin.id)
+    items.add_item(db=test_db, name="Drawer Item", bin_id=drawer.id)
+
+    results = search.list_items(test_db, bin_id=sample_bin.id)
+    assert {item.name for item in results} == {"Outer Item", "Drawer Item"}
+
+    results = search.list_items(test_db, bin_id=sample_bin.id, include_children=False)
+    assert [item.name for item in results] == ["Outer Item"]
+
+
+def test_server_uses_hybrid_search_module():
+    """Test that the MCP server dispatches to the single hybrid search module."""
+    import inspect
+
+    from protea import server
+
+    assert server.search is search
+    assert hasattr(search, "_vector_search")
+    params = inspect.signature(search.search_items).parameters
+    assert list(params) == ["db", "query", "location_id", "bin_id", "category_id"]
+
+
+def test_combine_scores_weights_and_thresholds():
+    """Test hybrid score merging, vector-only threshold and ordering."""
+    from protea.config import settings
+
+    fts = {"a": ("row-a", 5.0)}
+    alias = {"a": ("row-a-alias", 9.0), "b": ("row-b", 20.0)}
+    vector = {"a": ("row-a", 0.8), "c": ("row-c", 0.3), "d": ("row-d", 0.1)}
+
+    top = search._combine_scores(fts, alias, vector, limit=50)
+    scores = {row: score for row, score in top}
+
+    wf, wv = settings.fts_search_weight, settings.vector_search_weight
+    assert scores["row-a"] == pytest.approx(0.5 * wf + 0.8 * wv)
+    assert scores["row-b"] == pytest.approx(1.0 * wf)
+    assert scores["row-c"] == pytest.approx(0.3 * wv)
+    assert "row-d" not in scores  # vector-only below threshold
+    assert [score for _, score in top] == sorted(scores.values(), reverse=True)
+    assert len(search._combine_scores(fts, alias, vector, limit=1)) == 1
@@ -1,7 +1,8 @@
 """Tests for session workflow tools."""
 
+import pytest
 
-from protea.db.models import SessionStatus
+from protea.db.models import Session, SessionStatus
 from protea.tools import sessions
 
 
@@ -199,3 +200,457 @@ def test_session_history(test_db, sample_bin, test_image_store):
     history = sessions.get_session_history(test_db)
     assert len(history) >= 1
     assert any(s.id == session.id for s in history)
+
+
+def test_get_active_sessions_staleness(test_db, sample_bin):
+    """Test that sessions idle past the threshold are flagged stale."""
+    from datetime import UTC, datetime, timedelta
+
+    from protea.config import settings
+
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    sessions.add_pending_item(db=test_db, session_id=session.id, name="Idle Item")
+    assert sessions._get_stale_sessions(test_db) == []
+
+    # Half a minute of slack keeps SQL (ms) and Python (us) clocks on the same minute
+    idle = datetime.now(UTC) - timedelta(minutes=settings.session_stale_minutes + 5, seconds=30)
+    with test_db.connection() as conn:
+        conn.execute(
+            "UPDATE sessions SET updated_at = ? WHERE id = ?",
+            (idle.isoformat(), session.id),
+        )
+
+    info = next(s for s in sessions.get_active_sessions(test_db) if s.session.id == session.id)
+    assert info.is_stale
+    assert info.stale_duration_minutes >= settings.session_stale_minutes
+    assert info.pending_item_count == 1
+    assert info.image_count == 0
+
+    blocked = sessions.create_session(db=test_db)
+    assert blocked["error_code"] == "SESSION_BLOCKED"
+    assert blocked["stale_sessions"][0]["id"] == session.id
+    assert blocked["stale_sessions"][0]["pending_items"] == 1
+    assert blocked["stale_sessions"][0]["created_at"] == session.created_at.isoformat()
+    assert blocked["stale_sessions"][0]["stale_minutes"] == info.stale_duration_minutes
+
+
+def _png_base64() -> str:
+    """Build a small base64-encoded PNG for image tests."""
+    import base64
+    import io
+
+    from PIL import Image
+
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 8), "red").save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def test_commit_session_batch_inserts(test_db, sample_bin, sample_category, test_image_store):
+    """Test committing items, photo URLs, activity log and skipped categories."""
+    from protea.tools import categories, items
+
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    image = sessions.add_image_to_session(
+        test_db, test_image_store, session.id, _png_base64(), "shelf.png"
+    )["session_image"]
+    doomed = categories.create_category(test_db, name="Doomed")
+
+    sessions.add_pending_item(
+        db=test_db,
+        session_id=session.id,
+        name="Photo Item",
+        quantity_type="exact",
+        quantity_value=3,
+        category_id=sample_category.id,
+        source_image_id=image.id,
+        source="vision",
+    )
+    sessions.add_pending_item(db=test_db, session_id=session.id, name="Plain Item")
+    sessions.add_pending_item(
+        db=test_db, session_id=session.id, name="Orphan Item", category_id=doomed.id
+    )
+    with test_db.connection() as conn:
+        conn.execute("DELETE FROM categories WHERE id = ?", (doomed.id,))
+
+    result = sessions.commit_session(test_db, test_image_store, session.id)
+    assert result["success"] is True
+    added = {item.name: item for item in result["items_added"]}
+    assert set(added) == {"Photo Item", "Plain Item"}
+    assert len(result["images_saved"]) == 1
+
+    stored = items.get_item(test_db, added["Photo Item"].id)
+    assert stored.photo_url == image.file_path
+    assert stored.quantity_value == 3
+    assert stored.source.value == "vision"
+    assert stored.source_reference == session.id
+    assert items.get_item(test_db, added["Plain Item"].id).quantity_value == 1
+
+    from protea.tools import search
+
+    history = search.get_item_history(test_db, added["Photo Item"].id)
+    assert [h.action.value for h in history] == ["added"]
+    assert history[0].quantity_change == 3
+
+
+def test_commit_session_missing_bin(test_db, sample_bin, test_image_store):
+    """Test that committing to an unknown bin fails without closing the session."""
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    sessions.add_pending_item(db=test_db, session_id=session.id, name="Lost Item")
+
+    result = sessions.commit_session(test_db, test_image_store, session.id, bin_id="missing-bin")
+    assert result["error_code"] == "NOT_FOUND"
+    assert sessions.get_session(test_db, session.id).status == SessionStatus.PENDING
+
+
+def test_create_session_target_validation(test_db, sample_bin, sample_location):
+    """Test bin/location validation and the one-pending-session-per-bin rule."""
+    result = sessions.create_session(db=test_db, bin_id="missing-bin")
+    assert result["error_code"] == "NOT_FOUND"
+    assert result["details"] == {"bin_id": "missing-bin"}
+
+    result = sessions.create_session(db=test_db, location_id="missing-location")
+    assert result["error_code"] == "NOT_FOUND"
+    assert result["details"] == {"location_id": "missing-location"}
+
+    first = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    result = sessions.create_session(
+        db=test_db, bin_id=sample_bin.id, location_id=sample_location.id
+    )
+    assert result["error_code"] == "SESSION_BLOCKED"
+    assert result["details"] == {"existing_session_id": first.id}
+
+    assert sessions.set_session_target(test_db, first.id, bin_id="missing-bin")["error_code"] == (
+        "NOT_FOUND"
+    )
+    moved = sessions.set_session_target(test_db, first.id, location_id=sample_location.id)
+    assert moved.target_location_id == sample_location.id
+
+
+def test_session_history_commit_summary(test_db, sample_bin, test_image_store):
+    """Test that commit and cancel summaries round-trip through storage."""
+    committed = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    sessions.add_pending_item(db=test_db, session_id=committed.id, name="Summary Item")
+    sessions.commit_session(test_db, test_image_store, committed.id)
+
+    cancelled = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    sessions.cancel_session(test_db, test_image_store, cancelled.id, reason="wrong shelf")
+
+    history = {s.id: s for s in sessions.get_session_history(test_db)}
+    assert history[committed.id].commit_summary == {
+        "items_added": 1,
+        "images_saved": 0,
+        "target_bin_id": sample_bin.id,
+    }
+    assert history[cancelled.id].commit_summary == {"reason": "wrong shelf"}
+
+
+def test_add_image_to_session_too_large(test_db, sample_bin, test_image_store, monkeypatch):
+    """Test that base64 payloads over the size limit are rejected up front."""
+    from protea.config import settings
+
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+
+    oversized = "A" * ((settings.max_image_size_bytes + 2) // 3 * 4 + 4)
+    result = sessions.add_image_to_session(test_db, test_image_store, session.id, oversized)
+    assert result["error_code"] == "IMAGE_TOO_LARGE"
+
+    result = sessions.add_image_to_session(test_db, test_image_store, "missing", oversized)
+    assert result["error_code"] == "IMAGE_TOO_LARGE"
+
+    # The limit follows runtime changes to the setting
+    monkeypatch.setattr(settings, "max_image_size_bytes", 10)
+    result = sessions.add_image_to_session(test_db, test_image_store, session.id, _png_base64())
+    assert result["error_code"] == "IMAGE_TOO_LARGE"
+
+
+def test_stale_threshold_follows_settings(test_db, sample_bin, monkeypatch):
+    """Test that the stale threshold is read from settings at call time."""
+    from datetime import UTC, datetime, timedelta
+
+    from protea.config import settings
+
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    idle = datetime.now(UTC) - timedelta(minutes=30, seconds=30)
+    with test_db.connection() as conn:
+        conn.execute(
+            "UPDATE sessions SET updated_at = ? WHERE id = ?",
+            (idle.isoformat(), session.id),
+        )
+
+    monkeypatch.setattr(settings, "session_stale_minutes", 60)
+    assert sessions._get_stale_sessions(test_db) == []
+
+    monkeypatch.setattr(settings, "session_stale_minutes", 10)
+    assert [row["id"] for row in sessions._get_stale_sessions(test_db)] == [session.id]
+    info = next(s for s in sessions.get_active_sessions(test_db) if s.session.id == session.id)
+    assert info.is_stale
+
+
+def test_session_updates_return_stored_rows(test_db, sample_bin, sample_location, test_image_store):
+    """Test that target, commit and cancel return the session as stored."""
+    from protea.tools import bins
+
+    other = bins.create_bin(db=test_db, name="Override", location_id=sample_location.id)
+
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    retargeted = sessions.set_session_target(test_db, session.id, location_id=sample_location.id)
+    assert retargeted.target_bin_id is None
+    assert retargeted.created_at == session.created_at
+    assert retargeted.updated_at > session.updated_at
+
+    sessions.set_session_target(test_db, session.id, bin_id=sample_bin.id)
+    result = sessions.commit_session(test_db, test_image_store, session.id, bin_id=other.id)
+    committed = result["session"]
+    assert committed.status == SessionStatus.COMMITTED
+    assert committed.target_bin_id == other.id
+    assert committed.committed_at is not None
+    assert committed == sessions.get_session_history(test_db, bin_id=other.id)[0]
+
+    cancelled = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    result = sessions.cancel_session(test_db, test_image_store, cancelled.id, reason="duplicate")
+    assert result.status == SessionStatus.CANCELLED
+    assert result.commit_summary == {"reason": "duplicate"}
+    assert result.cancelled_at is not None
+
+
+def test_session_detail_images_by_id(test_db, sample_bin, test_image_store):
+    """Test the image index on SessionDetail and that it stays out of dumps."""
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    added = sessions.add_image_to_session(test_db, test_image_store, session.id, _png_base64())
+    image = added["session_image"]
+
+    detail = sessions.get_session(test_db, session.id)
+    assert detail.images_by_id[image.id].file_path == image.file_path
+    assert detail.images_by_id is detail.images_by_id
+    assert "images_by_id" not in detail.model_dump()
+
+
+def test_commit_session_is_atomic(test_db, sample_bin, test_image_store, monkeypatch):
+    """Test that a failure mid-commit leaves no items and the session pending."""
+    from protea.tools import search
+
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    sessions.add_pending_item(db=test_db, session_id=session.id, name="Atomic Widget")
+
+    def fail_sync(*args, **kwargs):
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(sessions.vector_index, "sync", fail_sync)
+    with pytest.raises(RuntimeError):
+        sessions.commit_session(test_db, test_image_store, session.id)
+
+    assert search.list_items(test_db, bin_id=sample_bin.id) == []
+    assert sessions.get_session(test_db, session.id).status == SessionStatus.PENDING
+
+
+def test_commit_session_saves_bin_images(test_db, sample_bin, test_image_store):
+    """Test that copied images are recorded and failed copies are skipped."""
+    from protea.tools import bins
+
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    added = [
+        sessions.add_image_to_session(test_db, test_image_store, session.id, _png_base64())[
+            "session_image"
+        ]
+        for _ in range(3)
+    ]
+    (test_image_store.base_path / added[1].file_path).unlink()
+
+    result = sessions.commit_session(test_db, test_image_store, session.id)
+    assert [img.source_session_image_id for img in result["images_saved"]] == [
+        added[0].id,
+        added[2].id,
+    ]
+    assert result["session"].commit_summary["images_saved"] == 2
+
+    stored = bins.get_bin_images(test_db, sample_bin.id)
+    assert {img.id for img in stored} == {img.id for img in result["images_saved"]}
+
+
+def test_commit_session_lost_claim_discards_copies(test_db, sample_bin, test_image_store):
+    """Test a commit that loses the pending claim deletes the images it copied."""
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    sessions.add_image_to_session(test_db, test_image_store, session.id, _png_base64())
+    copy_to_bin = test_image_store.copy_to_bin
+    copied = []
+
+    def copy_then_lose_claim(*args):
+        # A concurrent commit claims the session while this one copies
+        test_db.execute(
+            "UPDATE sessions SET status = ? WHERE id = ?",
+            (SessionStatus.COMMITTED.value, session.id),
+        )
+        metadata = copy_to_bin(*args)
+        copied.append(test_image_store.base_path / metadata["file_path"])
+        return metadata
+
+    test_image_store.copy_to_bin = copy_then_lose_claim
+    result = sessions.commit_session(test_db, test_image_store, session.id)
+
+    assert result["error"] == "Session is not pending"
+    assert len(copied) == 1
+    assert not copied[0].exists()
+
+
+def test_session_history_filters(test_db, sample_bin, sample_location, test_image_store):
+    """Test history filtering by bin, status and limit."""
+    from protea.tools import bins
+
+    other = bins.create_bin(db=test_db, name="History Other", location_id=sample_location.id)
+
+    committed = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    sessions.commit_session(test_db, test_image_store, committed.id)
+    cancelled = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    sessions.cancel_session(test_db, test_image_store, cancelled.id)
+    elsewhere = sessions.create_session(db=test_db, bin_id=other.id)
+    sessions.cancel_session(test_db, test_image_store, elsewhere.id)
+    sessions.create_session(db=test_db, bin_id=sample_bin.id)  # still pending
+
+    def ids(**filters):
+        return [s.id for s in sessions.get_session_history(test_db, **filters)]
+
+    assert ids() == [elsewhere.id, cancelled.id, committed.id]
+    assert ids(status="committed") == [committed.id]
+    assert ids(bin_id=sample_bin.id) == [cancelled.id, committed.id]
+    assert ids(bin_id=sample_bin.id, status="cancelled") == [cancelled.id]
+    assert ids(limit=1) == [elsewhere.id]
+
+
+def test_get_session_builds_typed_children(test_db, sample_bin, test_image_store):
+    """Test that row-factory built images and pending items keep parsed types."""
+    from datetime import datetime
+
+    from protea.db.models import PendingItemSource, QuantityType
+
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    image = sessions.add_image_to_session(
+        test_db, test_image_store, session.id, _png_base64(), "bench.png"
+    )["session_image"]
+    with test_db.connection() as conn:
+        conn.execute(
+            "UPDATE session_images SET extracted_data = ? WHERE id = ?",
+            ('{"items": 2}', image.id),
+        )
+    pending = sessions.add_pending_item(
+        db=test_db,
+        session_id=session.id,
+        name="Typed Pending",
+        quantity_type="approximate",
+        quantity_value=40,
+        source_image_id=image.id,
+        confidence=0.9,
+        source="vision",
+    )
+
+    detail = sessions.get_session(test_db, session.id)
+    loaded_image = detail.images[0]
+    assert loaded_image.original_filename == "bench.png"
+    assert loaded_image.extracted_data == {"items": 2}
+    assert loaded_image.created_at == image.created_at
+
+    loaded = detail.pending_items[0]
+    assert loaded == pending
+    assert loaded.quantity_type == QuantityType.APPROXIMATE
+    assert loaded.source == PendingItemSource.VISION
+    assert isinstance(loaded.updated_at, datetime)
+
+
+def test_update_pending_item_partial(test_db, sample_bin, sample_category):
+    """Test that omitted fields keep their values and bad targets are rejected."""
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    other = sessions.create_session(db=test_db)
+    item = sessions.add_pending_item(
+        db=test_db,
+        session_id=session.id,
+        name="Partial",
+        quantity_type="exact",
+        quantity_value=7,
+        category_id=sample_category.id,
+    )
+
+    result = sessions.update_pending_item(test_db, session.id, item.id, quantity_label="box")
+    assert result.name == "Partial"
+    assert result.quantity_value == 7
+    assert result.category_id == sample_category.id
+    assert result.quantity_label == "box"
+    assert result.created_at == item.created_at
+    assert result.updated_at > item.updated_at
+    assert sessions.get_session(test_db, session.id).pending_items[0] == result
+
+    missing = sessions.update_pending_item(test_db, other.id, item.id, name="Wrong Session")
+    assert missing["error_code"] == "NOT_FOUND"
+
+    invalid = sessions.update_pending_item(test_db, session.id, item.id, quantity_type="lots")
+    assert invalid["error_code"] == "INVALID_INPUT"
+    assert sessions.get_session(test_db, session.id).pending_items[0].name == "Partial"
+
+
+def test_session_queries_use_ordered_indexes(test_db):
+    """Test that session child and pending listings avoid a separate sort."""
+    queries = [
+        sessions._SESSION_IMAGES_SQL,
+        sessions._PENDING_ITEMS_SQL,
+        "SELECT * FROM sessions WHERE status = ? ORDER BY created_at",
+    ]
+    for query in queries:
+        rows = test_db.execute(f"EXPLAIN QUERY PLAN {query}", ("x",))
+        plan = " ".join(row["detail"] for row in rows)
+        assert "USING INDEX" in plan or "USING COVERING INDEX" in plan
+        assert "TEMP B-TREE" not in plan
+
+
+def test_create_session_skips_stale_scan_without_pending(test_db, sample_bin, monkeypatch):
+    """Test that the stale-session query only runs when a session is pending."""
+    calls = []
+    original = sessions._get_stale_sessions
+
+    def tracking(db):
+        calls.append(db)
+        return original(db)
+
+    monkeypatch.setattr(sessions, "_get_stale_sessions", tracking)
+
+    first = sessions.create_session(db=test_db)
+    assert first.status == SessionStatus.PENDING
+    assert calls == []
+
+    sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    assert len(calls) == 1
+
+
+def test_get_active_sessions_single_query(test_db, sample_location, monkeypatch):
+    """Test that counts for every active session come from one query."""
+    from protea.tools import bins
+
+    expected = {}
+    for n in range(3):
+        target = bins.create_bin(db=test_db, name=f"Count {n}", location_id=sample_location.id)
+        session = sessions.create_session(db=test_db, bin_id=target.id)
+        for i in range(n):
+            sessions.add_pending_item(db=test_db, session_id=session.id, name=f"Item {i}")
+        expected[session.id] = n
+
+    calls = []
+    for method in ("execute", "execute_one"):
+        original = getattr(test_db, method)
+        monkeypatch.setattr(
+            test_db, method, lambda *a, _orig=original, **kw: calls.append(a) or _orig(*a, **kw)
+        )
+
+    result = sessions.get_active_sessions(test_db)
+    assert len(calls) == 1
+    assert {info.session.id: info.pending_item_count for info in result} == expected
+
+
+def test_commit_summary_round_trips(test_db, sample_bin, test_image_store):
+    """Test stored summaries decode on load and the field stays constructible."""
+    session = sessions.create_session(db=test_db, bin_id=sample_bin.id)
+    sessions.cancel_session(test_db, test_image_store, session.id, reason="decoded")
+
+    loaded = sessions.get_session_history(test_db)[0]
+    assert loaded.commit_summary == {"reason": "decoded"}
+    assert loaded.model_dump()["commit_summary"] == {"reason": "decoded"}
+
+    built = Session(commit_summary={"items_added": 1})
+    assert built.commit_summary == {"items_added": 1}
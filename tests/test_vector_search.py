@@ -1,5 +1,7 @@
 """Tests for vector/semantic search functionality."""
 
+from unittest.mock import patch
+
 import pytest
 
 from protea.config import settings
@@ -34,8 +36,8 @@ class TestEmbeddingStorage:
 
         assert row is not None
         assert row["embedding"] is not None
-        # dimensions * 4 bytes per float
-        assert len(row["embedding"]) == settings.embedding_dimension * 4
+        # 8-byte header + 1 byte per int8 dimension
+        assert len(row["embedding"]) == settings.embedding_dimension + 8
 
     def test_item_embedding_updates_on_name_change(self, test_db, sample_bin, embedding_available):
         """Test that embedding updates when item name changes."""
@@ -449,6 +451,155 @@ class TestSearchWithoutEmbeddings:
         assert results[0].item.id == item.id
 
 
+class TestVectorIndex:
+    """Tests for the optional sqlite-vec KNN index."""
+
+    def test_index_unavailable_falls_back(self, test_db, sample_bin):
+        """Test that index helpers are no-ops when sqlite-vec is not loaded."""
+        from protea.services import vector_index
+
+        test_db.vec_enabled = False
+        items.add_item(db=test_db, name="Fallback Widget", bin_id=sample_bin.id)
+
+        assert vector_index.ensure_index(test_db, 4) is None
+        with test_db.connection() as conn:
+            vector_index.sync(test_db, conn)
+
+    @pytest.fixture
+    def stub_vec0(self, test_db, monkeypatch):
+        """Back the index with a plain table so sync logic runs without sqlite-vec."""
+        from protea.services import vector_index
+
+        def create_table(conn, table, dimension):
+            conn.execute(f"CREATE TABLE {table} (rowid INTEGER PRIMARY KEY, embedding BLOB)")
+
+        monkeypatch.setattr(vector_index, "_create_table", create_table)
+        monkeypatch.setattr(test_db, "vec_enabled", True)
+        return vector_index
+
+    @staticmethod
+    def _set_embedding(db, item_id, values):
+        import numpy as np
+
+        blob = embedding_service.quantize_embedding(np.array(values, dtype=np.float32))
+        with db.connection() as conn:
+            conn.execute("UPDATE items SET embedding = ? WHERE id = ?", (blob, item_id))
+
+    @staticmethod
+    def _indexed_rowids(db, table):
+        return {row["rowid"] for row in db.execute(f"SELECT rowid FROM {table}")}
+
+    def test_index_built_once_then_synced_by_writes(self, test_db, sample_bin, stub_vec0):
+        """Test that the index is built once and writes keep it in sync."""
+        first = items.add_item(db=test_db, name="Indexed Widget", bin_id=sample_bin.id)
+        self._set_embedding(test_db, first.id, [1.0, 0.0, 0.0, 0.0])
+
+        table = stub_vec0.ensure_index(test_db, 4)
+        assert table == "vec_items_4"
+        assert test_db.execute_one(f"SELECT COUNT(*) AS cnt FROM {table}")["cnt"] == 1
+
+        # Later searches reuse the index instead of rebuilding it
+        with patch.object(stub_vec0, "_rebuild", side_effect=AssertionError("rebuilt")):
+            assert stub_vec0.ensure_index(test_db, 4) == table
+
+        second = items.add_item(db=test_db, name="Second Widget", bin_id=sample_bin.id)
+        self._set_embedding(test_db, second.id, [0.0, 1.0, 0.0, 0.0])
+        with test_db.connection() as conn:
+            stub_vec0.sync(test_db, conn)
+        assert test_db.execute_one(f"SELECT COUNT(*) AS cnt FROM {table}")["cnt"] == 2
+        assert test_db.execute_one("SELECT COUNT(*) AS cnt FROM vec_index_pending")["cnt"] == 0
+
+        items.remove_item(test_db, first.id)
+        assert test_db.execute_one(f"SELECT COUNT(*) AS cnt FROM {table}")["cnt"] == 1
+
+    def test_index_catches_up_on_writes_made_elsewhere(self, test_db, sample_bin, stub_vec0):
+        """Test that changes queued without the extension reach the index."""
+        item = items.add_item(db=test_db, name="Changed Widget", bin_id=sample_bin.id)
+        self._set_embedding(test_db, item.id, [1.0, 0.0, 0.0, 0.0])
+        table = stub_vec0.ensure_index(test_db, 4)
+        before = test_db.execute_one(f"SELECT embedding FROM {table}")["embedding"]
+
+        # Same row count, different embedding, written without syncing
+        self._set_embedding(test_db, item.id, [0.0, 0.0, 1.0, 0.0])
+        assert test_db.execute_one("SELECT COUNT(*) AS cnt FROM vec_index_pending")["cnt"] == 1
+
+        assert stub_vec0.ensure_index(test_db, 4) == table
+        assert test_db.execute_one(f"SELECT embedding FROM {table}")["embedding"] != before
+        assert test_db.execute_one("SELECT COUNT(*) AS cnt FROM vec_index_pending")["cnt"] == 0
+
+    def test_index_rebuilt_for_new_version_or_dimension(self, test_db, sample_bin, stub_vec0):
+        """Test that a marker mismatch triggers a single rebuild."""
+        item = items.add_item(db=test_db, name="Versioned Widget", bin_id=sample_bin.id)
+        self._set_embedding(test_db, item.id, [1.0, 0.0, 0.0, 0.0])
+        stub_vec0.ensure_index(test_db, 4)
+
+        with patch.object(stub_vec0, "INDEX_VERSION", stub_vec0.INDEX_VERSION + 1):
+            assert stub_vec0.ensure_index(test_db, 4) == "vec_items_4"
+            marker = test_db.execute_one(
+                "SELECT value FROM system_settings WHERE key = ?", (stub_vec0.MARKER_KEY,)
+            )["value"]
+            assert marker == f"{stub_vec0.INDEX_VERSION}:4"
+
+        assert stub_vec0.ensure_index(test_db, 3) == "vec_items_3"
+        rows = test_db.execute("SELECT name FROM sqlite_master WHERE name GLOB 'vec_items_*'")
+        assert {row["name"] for row in rows} == {"vec_items_3"}
+
+    def test_filtered_search_finds_match_outside_global_top_k(
+        self, test_db, sample_bin, stub_vec0, monkeypatch
+    ):
+        """Test that a filtered search is not limited to the global nearest neighbours."""
+        import numpy as np
+
+        from protea.tools import bins, locations
+
+        other_location = locations.create_location(db=test_db, name="Other Shed")
+        other_bin = bins.create_bin(db=test_db, name="Other Bin", location_id=other_location.id)
+        nearest = items.add_item(db=test_db, name="Nearest Widget", bin_id=other_bin.id)
+        local = items.add_item(db=test_db, name="Local Widget", bin_id=sample_bin.id)
+        self._set_embedding(test_db, nearest.id, [1.0, 0.0, 0.0, 0.0])
+        self._set_embedding(test_db, local.id, [0.6, 0.8, 0.0, 0.0])
+
+        monkeypatch.setattr(search, "VECTOR_KNN_LIMIT", 1)
+        monkeypatch.setattr(embedding_service, "is_available", lambda: True)
+        monkeypatch.setattr(
+            embedding_service,
+            "generate_query_embedding",
+            lambda query: np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32),
+        )
+
+        with patch.object(search, "_vector_knn_search", side_effect=AssertionError("knn")):
+            results = search.search_items(test_db, "qqq", location_id=sample_bin.location_id)
+
+        assert [result.item.id for result in results] == [local.id]
+
+    def test_index_mirrors_item_embeddings(self, test_db, sample_bin):
+        """Test the real sqlite-vec index is built from and kept in sync with items."""
+        import numpy as np
+
+        from protea.services import vector_index
+
+        if not test_db.vec_enabled:
+            pytest.skip("sqlite-vec extension not available")
+
+        item = items.add_item(db=test_db, name="Indexed Widget", bin_id=sample_bin.id)
+        blob = embedding_service.quantize_embedding(np.array([1.0, 0.0, 0.0, 0.0]))
+        with test_db.connection() as conn:
+            conn.execute("UPDATE items SET embedding = ? WHERE id = ?", (blob, item.id))
+
+        table = vector_index.ensure_index(test_db, 4)
+        assert table == "vec_items_4"
+        assert test_db.execute_one(f"SELECT COUNT(*) AS cnt FROM {table}")["cnt"] == 1
+
+        # Exercise the real vec0 KNN statement
+        query = np.array([1.0, 0.0, 0.0, 0.0], dtype=np.float32)
+        results = search._vector_knn_search(test_db, table, query)
+        assert list(results) == [item.id]
+        assert results[item.id][1] > 0.9
+
+        items.remove_item(test_db, item.id)
+        assert test_db.execute_one(f"SELECT COUNT(*) AS cnt FROM {table}")["cnt"] == 0
+
+
 class TestSearchScoreRange:
     """Tests for score value ranges."""
 
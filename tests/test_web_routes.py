@@ -1,5 +1,6 @@
 """Tests for web UI routes."""
 
+import os
 import tempfile
 from pathlib import Path
 
@@ -41,8 +42,11 @@ def disable_auth():
 def web_app(web_settings):
     """Create a test FastAPI app with test database."""
     from protea.web.app import create_app
+    from protea.web.cache import page_cache, search_cache
 
     app = create_app()
+    page_cache.clear()
+    search_cache.clear()
 
     # Override the lifespan-created resources with test resources
     db = Database(web_settings.database_path)
@@ -176,6 +180,40 @@ class TestSearchPage:
         assert response.status_code == 200
         assert "Test Item" in response.text
 
+    def test_repeated_search_served_from_cache(self, client, web_item, monkeypatch):
+        """Test repeated queries reuse results until a web write clears them."""
+        from protea.tools import search as search_tools
+
+        calls = []
+        original = search_tools.search_items
+        monkeypatch.setattr(
+            search_tools, "search_items", lambda *args: calls.append(args) or original(*args)
+        )
+
+        assert "Test Item" in client.get("/partials/search?q=Test").text
+        assert "Test Item" in client.get("/search?q=Test ").text
+        assert len(calls) == 1
+
+        client.post("/browse/create-location", data={"name": "Shed"})
+        client.get("/partials/search?q=Test")
+        assert len(calls) == 2
+
+    def test_search_paths_share_one_handler(self):
+        """Test that "/" and "/search" are served by the same endpoint."""
+        from protea.web.routes.pages import router, search_page
+
+        endpoints = {route.path: route.endpoint for route in router.routes}
+        assert endpoints["/"] is endpoints["/search"] is search_page
+
+    def test_page_handlers_run_off_event_loop(self):
+        """Test page handlers are sync so their DB work runs in the threadpool."""
+        import inspect
+
+        from protea.web.routes.pages import router
+
+        for route in router.routes:
+            assert not inspect.iscoroutinefunction(route.endpoint), route.path
+
 
 # =============================================================================
 # Browse Page Tests
@@ -202,6 +240,79 @@ class TestBrowsePage:
         assert response.status_code == 200
         assert "Test Bin" in response.text
 
+    def test_browse_page_etag_revalidation(self, client, web_location):
+        """Test unchanged browse data answers 304 until a web write changes it."""
+        first = client.get("/browse")
+        etag = first.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert first.headers["Cache-Control"] == "private, no-cache"
+
+        cached = client.get("/browse", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+
+        client.post("/browse/create-location", data={"name": "Loft"})
+        refreshed = client.get("/browse", headers={"If-None-Match": etag})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["ETag"] != etag
+        assert "Loft" in refreshed.text
+
+    def test_browse_page_etag_not_reused_after_restart(self, client, web_location, web_app):
+        """Test a fresh app does not answer 304 to a tag from a previous process."""
+        from protea.web.app import create_app
+
+        etag = client.get("/browse").headers["ETag"]
+
+        restarted = create_app()
+        restarted.state.db = web_app.state.db
+        restarted.state.image_store = web_app.state.image_store
+        new_client = CSRFTestClient(restarted, raise_server_exceptions=False)
+        new_client.cookies = client.cookies
+
+        response = new_client.get("/browse", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_browse_page_counts_nested_bins(self, client, web_bin, web_db):
+        """Test the per-location bin count includes nested bins."""
+        drawer = bins_tools.create_bin(
+            db=web_db, name="Drawer", location_id=web_bin.location_id, parent_bin_id=web_bin.id
+        )
+        bins_tools.create_bin(
+            db=web_db, name="Tray", location_id=web_bin.location_id, parent_bin_id=drawer.id
+        )
+
+        response = client.get("/browse")
+        assert response.status_code == 200
+        assert "3 bins" in response.text
+
+    def test_browse_page_cache_follows_database_writes(self, client, web_location, web_db):
+        """Test cached browse data and ETags change with writes from any process."""
+        first = client.get("/browse")
+        assert "Cached Shelf" not in first.text
+        etag = first.headers["ETag"]
+
+        # Direct tool writes bypass the web app (as MCP servers do)
+        bins_tools.create_bin(db=web_db, name="Cached Shelf", location_id=web_location.id)
+        response = client.get("/browse", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert "Cached Shelf" in response.text
+
+    def test_page_cache_key_read_before_compute(self, web_db):
+        """Test data computed during a write is not stored under the new key."""
+        from protea.web.cache import PageCache, data_key
+
+        cache = PageCache(ttl=60)
+        key = data_key(web_db, "browse")
+
+        def compute_during_write():
+            locations_tools.create_location(db=web_db, name="Racing Write")
+            return "pre-write data"
+
+        assert cache.get_or_compute(key, compute_during_write) == "pre-write data"
+        assert cache.get_or_compute(data_key(web_db, "browse"), lambda: "fresh") == "fresh"
+
 
 # =============================================================================
 # Location Page Tests
@@ -436,6 +547,22 @@ class TestItemPage:
         assert "10" in response.text  # quantity_value
         assert "pieces" in response.text  # quantity_label
 
+    def test_item_page_reuses_cached_bin_choices(self, client, web_item, web_db, monkeypatch):
+        """Test item pages reuse the move-dropdown bins until a web write clears them."""
+        calls = []
+        original = bins_tools.get_all_bins_with_location
+        monkeypatch.setattr(
+            bins_tools, "get_all_bins_with_location", lambda db: calls.append(db) or original(db)
+        )
+
+        client.get(f"/item/{web_item.id}")
+        client.get(f"/item/{web_item.id}")
+        assert len(calls) == 1
+
+        client.post("/browse/create-location", data={"name": "Attic"})
+        client.get(f"/item/{web_item.id}")
+        assert len(calls) == 2
+
     def test_edit_item(self, client, web_item):
         """Test editing an item."""
         response = client.post(
@@ -507,6 +634,53 @@ class TestHistoryPage:
         assert response.status_code == 200
         # Check that the page rendered (activity may or may not be shown depending on implementation)
 
+    def test_history_page_groups_by_day(self, client, web_item, web_db):
+        """Test history entries are grouped under a formatted day heading."""
+        from datetime import datetime
+
+        created_at = web_db.execute_one(
+            "SELECT created_at FROM activity_log WHERE item_id = ?", (web_item.id,)
+        )["created_at"]
+        response = client.get("/history")
+        assert response.status_code == 200
+        parsed = datetime.fromisoformat(created_at)
+        assert parsed.strftime("%A, %B %d, %Y") in response.text
+        assert parsed.strftime("%I:%M %p") in response.text
+
+    def test_history_page_etag_varies_by_limit(self, client, web_item):
+        """Test history ETags are tied to the cached data for each limit."""
+        etag = client.get("/history").headers["ETag"]
+        assert client.get("/history", headers={"If-None-Match": etag}).status_code == 304
+        other = client.get("/history?limit=10", headers={"If-None-Match": etag})
+        assert other.status_code == 200
+
+    def test_history_dates_grouped_newest_day_first(self, web_item, web_db):
+        """Test history rows are grouped into contiguous days, newest first."""
+        from protea.web.routes.pages import _history_dates
+
+        web_db.execute("DELETE FROM activity_log")
+        for i, created_at in enumerate(
+            ["2026-01-04T09:00:00+00:00", "2026-01-05T08:00:00+00:00", "2026-01-05T18:30:00+00:00"]
+        ):
+            web_db.execute(
+                "INSERT INTO activity_log (id, item_id, action, created_at) VALUES (?, ?, ?, ?)",
+                (f"log-{i}", web_item.id, "used", created_at),
+            )
+
+        history = _history_dates(web_db, limit=50)
+        assert [day for day, _ in history] == ["2026-01-05", "2026-01-04"]
+        assert [entry["id"] for entry in history[0][1]] == ["log-2", "log-1"]
+
+    def test_history_query_reads_created_at_index(self, web_db):
+        """Test the history query walks the created_at index instead of sorting."""
+        from protea.web.routes.pages import _HISTORY_SQL
+
+        plan = [
+            row["detail"] for row in web_db.execute(f"EXPLAIN QUERY PLAN {_HISTORY_SQL}", (50,))
+        ]
+        assert any("idx_activity_log_created" in detail for detail in plan)
+        assert not any("TEMP B-TREE" in detail for detail in plan)
+
 
 # =============================================================================
 # Delete Operations Tests
@@ -589,3 +763,212 @@ class TestErrorHandling:
         )
         # Should return 400 for invalid UUID format
         assert response.status_code == 400
+
+
+# =============================================================================
+# Image Download Tests
+# =============================================================================
+
+
+class TestImageDownloads:
+    """Tests for zip downloads of bin images."""
+
+    @staticmethod
+    def _zip_names(response) -> list[str]:
+        import io
+        import zipfile
+
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            return archive.namelist()
+
+    def test_download_bin_images_nested_paths(self, client, web_bin, web_db):
+        """Test bin downloads mirror the nested bin hierarchy as folders."""
+        drawer = bins_tools.create_bin(
+            db=web_db, name="Drawer", location_id=web_bin.location_id, parent_bin_id=web_bin.id
+        )
+        bins_tools.create_bin(
+            db=web_db, name="Tray", location_id=web_bin.location_id, parent_bin_id=drawer.id
+        )
+
+        response = client.get(f"/browse/bin/{drawer.id}/download-images")
+        assert response.status_code == 200
+        assert self._zip_names(response) == [
+            "Test-Bin/Drawer/.empty",
+            "Test-Bin/Drawer/Tray/.empty",
+        ]
+
+    def test_download_location_images_nested_paths(self, client, web_bin, web_db):
+        """Test location downloads include every bin under the location name."""
+        drawer = bins_tools.create_bin(
+            db=web_db, name="Drawer", location_id=web_bin.location_id, parent_bin_id=web_bin.id
+        )
+        bins_tools.create_bin(
+            db=web_db, name="Tray", location_id=web_bin.location_id, parent_bin_id=drawer.id
+        )
+
+        response = client.get(f"/browse/location/{web_bin.location_id}/download-images")
+        assert response.status_code == 200
+        assert self._zip_names(response) == [
+            "Test-Garage/Test-Bin/.empty",
+            "Test-Garage/Test-Bin/Drawer/.empty",
+            "Test-Garage/Test-Bin/Drawer/Tray/.empty",
+        ]
+
+    def test_sanitize_name(self):
+        """Test zip path components swap spaces for dashes and drop unsafe characters."""
+        from protea.web.routes.pages import _sanitize_name
+
+        assert _sanitize_name('My <Bin>: a/b\\c|d?e*"f') == "My-Bin-abcdef"
+        assert _sanitize_name("Plain") == "Plain"
+
+    def test_download_streams_stored_images(
+        self, client, web_app, web_bin, web_db, web_settings, monkeypatch
+    ):
+        """Test image files are streamed into the zip uncompressed and intact."""
+        import io
+        import zipfile
+
+        from PIL import Image
+
+        from protea.config import settings
+
+        monkeypatch.setattr(settings, "image_base_path", web_settings.image_base_path)
+        buf = io.BytesIO()
+        Image.new("RGB", (8, 8), "green").save(buf, format="PNG")
+        image = bins_tools.add_bin_image_bytes(
+            web_db, web_app.state.image_store, web_bin.id, buf.getvalue()
+        )
+        stored = (web_settings.image_base_path / image.file_path).read_bytes()
+
+        response = client.get(f"/browse/bin/{web_bin.id}/download-images")
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            (info,) = archive.infolist()
+            assert info.compress_type == zipfile.ZIP_STORED
+            assert archive.read(info) == stored
+
+    def test_download_streams_large_images_in_chunks(self, tmp_path, monkeypatch):
+        """Test files over the prefetch limit are streamed intact in several chunks."""
+        import io
+        import zipfile
+
+        from protea.web.routes import pages
+
+        monkeypatch.setattr(pages, "_ZIP_PREFETCH_MAX_BYTES", 1000)
+        monkeypatch.setattr(pages, "_ZIP_CHUNK_BYTES", 256)
+        large = tmp_path / "large.jpg"
+        large.write_bytes(os.urandom(2000))
+        small = tmp_path / "small.jpg"
+        small.write_bytes(b"small")
+
+        chunks = list(pages._stream_zip([("bin/large.jpg", large), ("bin/small.jpg", small)]))
+        assert len([chunk for chunk in chunks if chunk]) > 8
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            assert archive.read("bin/large.jpg") == large.read_bytes()
+            assert archive.read("bin/small.jpg") == b"small"
+
+    def test_download_skips_missing_image_files(
+        self, client, web_app, web_bin, web_db, web_settings, monkeypatch
+    ):
+        """Test image records whose files are gone are left out of the zip."""
+        import io
+
+        from PIL import Image
+
+        from protea.config import settings
+
+        monkeypatch.setattr(settings, "image_base_path", web_settings.image_base_path)
+        buf = io.BytesIO()
+        Image.new("RGB", (8, 8), "green").save(buf, format="PNG")
+        image = bins_tools.add_bin_image_bytes(
+            web_db, web_app.state.image_store, web_bin.id, buf.getvalue()
+        )
+        (web_settings.image_base_path / image.file_path).unlink()
+
+        response = client.get(f"/browse/bin/{web_bin.id}/download-images")
+        assert response.status_code == 200
+        assert self._zip_names(response) == []
+
+
+# =============================================================================
+# Template Environment Tests
+# =============================================================================
+
+
+class TestTemplateEnvironment:
+    """Tests for the shared Jinja2 environment."""
+
+    def test_templates_skip_reload_and_cache_bytecode(self):
+        """Test templates are not re-stat'd per render outside debug mode."""
+        from jinja2 import FileSystemBytecodeCache
+
+        from protea.web.app import templates
+
+        assert templates.env.auto_reload is False
+        assert isinstance(templates.env.bytecode_cache, FileSystemBytecodeCache)
+
+    def test_iso_timestamp_filters(self):
+        """Test ISO timestamp filters match the strftime formats they replace."""
+        from datetime import datetime
+
+        from protea.web.app import iso_clock_time, iso_date_label
+
+        for value in ["2026-01-05T00:07:00+00:00", "2026-01-05 12:30:00", "2026-01-05T23:59:59.5"]:
+            parsed = datetime.fromisoformat(value)
+            assert iso_clock_time(value) == parsed.strftime("%I:%M %p")
+            assert iso_date_label(value) == parsed.strftime("%A, %B %d, %Y")
+
+    def test_render_template_returns_html(self, client):
+        """Test pages rendered via render_template keep status and content type."""
+        response = client.get("/item/00000000-0000-0000-0000-000000000000")
+        assert response.status_code == 404
+        assert response.headers["content-type"].startswith("text/html")
+        assert "<html" in response.text
+
+
+# =============================================================================
+# JSON Response Tests
+# =============================================================================
+
+
+class TestJsonResponses:
+    """Tests for AJAX JSON endpoints."""
+
+    def test_quick_add_delete_photo_returns_json(self, client, web_bin):
+        """Test AJAX endpoints return compact orjson-encoded JSON."""
+        response = client.post(
+            f"/browse/bin/{web_bin.id}/quick-add/delete-photo/00000000-0000-0000-0000-000000000000"
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == b'{"success":true}'
+
+
+# =============================================================================
+# Static File Tests
+# =============================================================================
+
+
+class TestStaticFiles:
+    """Tests for the /static mount."""
+
+    def test_static_file_served_directly(self, client):
+        """Test static files are served by the app when no accel prefix is set."""
+        response = client.get("/static/app.js")
+        assert response.status_code == 200
+        assert "X-Accel-Redirect" not in response.headers
+        assert response.content
+
+    def test_static_file_accel_redirect(self, monkeypatch):
+        """Test static files are handed to nginx when an accel prefix is set."""
+        from protea.config import settings
+        from protea.web.app import create_app
+
+        monkeypatch.setattr(settings, "web_static_accel_prefix", "/_static/")
+        accel_client = TestClient(create_app())
+        response = accel_client.get("/static/app.js")
+        assert response.status_code == 200
+        assert response.headers["X-Accel-Redirect"] == "/_static/app.js"
+        assert response.content == b""
+
+        assert accel_client.get("/static/missing.js").status_code == 404